@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+import sys
+
+from benchmarks.suite import main
+
+
+sys.exit(main())
@@ -0,0 +1,51 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Time to transcribe a corpus into several alphabets with one analysis
+against one transcription per alphabet
+
+    python -m benchmarks.alphabets --paragraphs 2000
+"""
+import argparse
+from timeit import default_timer
+
+from stevens.languages.es import castillian
+
+from benchmarks.corpus import paragraphs
+
+
+ALPHABETS = ("ipa", "xsampa", "sampa")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    args = parser.parse_args()
+    texts = list(paragraphs(args.paragraphs))
+    transcriptor = castillian.Transcriptor()
+    for text in texts[:100]:
+        single = transcriptor.transcribe(text, alphabet=ALPHABETS)
+        assert single == tuple(transcriptor.transcribe(text, alphabet=name)
+                               for name in ALPHABETS)
+    start = default_timer()
+    for text in texts:
+        transcriptor.transcribe(text)
+    ipa = default_timer() - start
+    start = default_timer()
+    for text in texts:
+        for name in ALPHABETS:
+            transcriptor.transcribe(text, alphabet=name)
+    separate = default_timer() - start
+    start = default_timer()
+    for text in texts:
+        transcriptor.transcribe(text, alphabet=ALPHABETS)
+    single = default_timer() - start
+    print("{:28} {:8.3f} s".format("IPA only", ipa))
+    print("{:28} {:8.3f} s".format(
+        "{} transcriptions".format(len(ALPHABETS)), separate))
+    print("{:28} {:8.3f} s".format("one analysis, {} renderings".format(
+        len(ALPHABETS)), single))
+
+
+if __name__ == "__main__":
+    main()
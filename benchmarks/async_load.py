@@ -0,0 +1,76 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+In-process load generator for the asyncio facade
+
+    python -m benchmarks.async_load --clients 200 --requests 20000
+
+Concurrent clients await `AsyncTranscriber.transcribe` with utterances drawn
+from a Zipf-like distribution, so some texts repeat while in flight. Reports
+throughput and latency percentiles for every batch size given.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from stevens.aio import AsyncTranscriber
+
+from benchmarks.corpus import utterances
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def client(transcriber, texts, latencies):
+    for text in texts:
+        start = time.perf_counter()
+        await transcriber.transcribe(text)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(args, batch_size):
+    generator = random.Random(0)
+    pool = utterances(1000)
+    weights = [1.0 / (rank + 1) for rank in range(len(pool))]
+    per_client = args.requests // args.clients
+    latencies = []
+    transcriber = AsyncTranscriber(workers=args.workers,
+                                   batch_size=batch_size,
+                                   max_wait=args.max_wait,
+                                   executor=args.executor)
+    async with transcriber:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            client(transcriber,
+                   generator.choices(pool, weights, k=per_client),
+                   latencies)
+            for _ in range(args.clients)])
+        elapsed = time.perf_counter() - start
+    stats = transcriber.stats()
+    print("batch {:4d}: {:8.0f} req/s  p50 {:7.2f} ms  p99 {:7.2f} ms  "
+          "{} batches, {} deduplicated".format(
+              batch_size, len(latencies) / elapsed,
+              1000 * percentile(latencies, 0.5),
+              1000 * percentile(latencies, 0.99),
+              stats["batches"], stats["deduplicated"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--executor", default="thread")
+    parser.add_argument("--max-wait", type=float, default=0.002)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 16, 64, 256])
+    args = parser.parse_args()
+    for batch_size in args.batch_sizes:
+        asyncio.run(run(args, batch_size))
+
+
+if __name__ == "__main__":
+    main()
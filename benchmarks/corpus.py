@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic Spanish corpora generated from a frequency-ranked word list
+"""
+import bisect
+import itertools
+import random
+
+
+WORDS = (u"de la que el en y a los se del las un por con no una su para "
+         u"es al lo como más o pero sus le ha me si sin sobre este ya "
+         u"entre cuando todo esta ser son dos también fue había era muy "
+         u"años hasta desde está mi porque qué sólo han yo hay vez puede "
+         u"todos así nos ni parte tiene él uno donde bien tiempo mismo "
+         u"ese ahora cada e vida otro después te otros aunque esa eso "
+         u"hace otra gobierno tan durante siempre día tanto ella tres sí "
+         u"dijo sido gran país según menos mundo año antes estado contra "
+         u"sino forma caso nada hacer general estaba poco estos presidente "
+         u"mayor ante unos les algo hacia casa ellos ayer hecho primera "
+         u"mucho mientras además quien momento millones esto españa hombre "
+         u"están pues hoy lugar madrid nacional trabajo otras mejor nuevo "
+         u"decir algunos entonces todas días debe política cómo casi toda "
+         u"tal luego pasado medio estas sea tenía nunca poder aquí ver "
+         u"veces embargo partido personas grupo cuenta pueden tienen misma "
+         u"nueva cual fueron mujer frente josé tras cosas fin ciudad he "
+         u"social manera tener sistema será historia muchos juan tipo "
+         u"cuatro dentro nuestro punto dice ello cualquier noche aún agua "
+         u"parece haber situación fueron ejemplo desarrollo guerra "
+         u"perro calle muchacho chorizo llamar barrio quiero pingüino "
+         u"cigüeña zapato extraordinario construcción instante transporte "
+         u"atlántico deshacer creer teatro ciudad huevo iglesia jardín "
+         u"ladrón mañana náufrago obligación pájaro periódico planta río "
+         u"siglo sobre también tigre verdad viejo acción absurdo obstáculo "
+         u"perspectiva ciencia león poeta océano maíz reír tío caída "
+         u"estructura inglés camino ahí búho país leer averiguáis").split()
+
+PUNCTUATION = [u".", u",", u"?", u"!"]
+
+
+class Zipf(object):
+    """Draw words with a probability inversely proportional to their rank"""
+
+    def __init__(self, words=WORDS, seed=0):
+        self._words = words
+        self._random = random.Random(seed)
+        total = 0.0
+        self._cumulative = []
+        for rank in range(len(words)):
+            total += 1.0 / (rank + 1)
+            self._cumulative.append(total)
+        self._total = total
+
+    def word(self):
+        value = self._random.random() * self._total
+        return self._words[bisect.bisect(self._cumulative, value)]
+
+    def words(self, count):
+        return [self.word() for _ in range(count)]
+
+    def randint(self, low, high):
+        return self._random.randint(low, high)
+
+    def choice(self, items):
+        return self._random.choice(items)
+
+
+def sentence(zipf, low=3, high=14):
+    words = zipf.words(zipf.randint(low, high))
+    words[0] = words[0].capitalize()
+    return u" ".join(words) + zipf.choice(PUNCTUATION)
+
+
+def utterances(count, seed=0):
+    """Return `count` short utterances such as ASR transcripts"""
+    zipf = Zipf(seed=seed)
+    return [u" ".join(zipf.words(zipf.randint(3, 12)))
+            for _ in range(count)]
+
+
+def paragraphs(count, seed=0):
+    """Return `count` long paragraphs of punctuated sentences"""
+    zipf = Zipf(seed=seed)
+    return [u" ".join(sentence(zipf) for _ in range(zipf.randint(5, 15)))
+            for _ in range(count)]
+
+
+def subtitles(count, seed=0, distinct=200):
+    """Return `count` subtitle lines drawn from a few `distinct` ones"""
+    zipf = Zipf(seed=seed)
+    lines = [sentence(zipf, 1, 8) for _ in range(distinct)]
+    return Zipf(lines, seed=seed).words(count)
+
+
+CORPORA = {
+    "utterances": utterances,
+    "paragraphs": paragraphs,
+    "subtitles": subtitles,
+}
+
+
+def get_corpus(name, count, seed=0):
+    return CORPORA[name](count, seed=seed)
+
+
+def vocabulary(count):
+    """Return `count` distinct words, the word list extended with compounds"""
+    words = []
+    seen = set()
+    for length in itertools.count(1):
+        for parts in itertools.product(WORDS, repeat=length):
+            word = u"".join(parts)
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+                if len(words) >= count:
+                    return words
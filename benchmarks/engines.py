@@ -0,0 +1,51 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Throughput of the castillian transcription engines
+
+    python -m benchmarks.engines --size 2000
+
+Compares the rule-by-rule path, the precompiled syllable table and the
+single-pass transducer on every generated corpus, after checking that they
+agree.
+"""
+import argparse
+from timeit import default_timer
+
+from stevens.languages.es import castillian
+
+from benchmarks.corpus import CORPORA, get_corpus
+
+
+ENGINES = [
+    ("rules", dict()),
+    ("syllable table", dict(syllable_table=True)),
+    ("fst", dict(engine="fst")),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--size", type=int, default=2000)
+    args = parser.parse_args()
+    transcriptors = [(name, castillian.Transcriptor(**options))
+                     for name, options in ENGINES]
+    for corpus in sorted(CORPORA):
+        texts = get_corpus(corpus, args.size)
+        tokens = sum(len(text.split()) for text in texts)
+        expected = None
+        for name, transcriptor in transcriptors:
+            # Warm up lazily compiled tables
+            transcriptor.transcribe(texts[0])
+            start = default_timer()
+            results = [transcriptor.transcribe(text) for text in texts]
+            elapsed = default_timer() - start
+            if expected is None:
+                expected = results
+            assert results == expected, name
+            print("{:12} {:16} {:10.0f} tokens/s".format(
+                corpus, name, tokens / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Build time, size and query latency of the phonetic index on a large
+lexicon, against scanning the whole lexicon for every query
+
+    python -m benchmarks.search --words 500000 --queries 200
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+from timeit import default_timer
+
+from stevens.languages.es import castillian
+from stevens.search import PhoneticIndex, edit_distance
+
+from benchmarks.corpus import vocabulary
+from benchmarks.suite import percentile, timings
+
+
+def latency(name, durations):
+    print("{:24} p50 {:8.3f} ms  p99 {:8.3f} ms".format(
+        name, 1e3 * percentile(durations, 0.5),
+        1e3 * percentile(durations, 0.99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--words", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scans", type=int, default=5,
+                        help="queries answered by a linear scan")
+    args = parser.parse_args()
+    words = vocabulary(args.words)
+    queries = [(word, ) for word in
+               random.Random(0).sample(words, args.queries)]
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "index.sqlite")
+        index = PhoneticIndex(path, castillian.Transcriptor())
+        start = default_timer()
+        index.add(words)
+        print("{:24} {:8.1f} s for {} words".format(
+            "build", default_timer() - start, len(index)))
+        print("{:24} {:8.1f} MiB".format("size", sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)) / 2.0 ** 20))
+        latency("rhymes", timings(index.rhymes, queries))
+        latency("homophones", timings(index.homophones, queries))
+        latency("similar, distance 1",
+                timings(lambda word: index.similar(word, 1), queries))
+        latency("similar, distance 2",
+                timings(lambda word: index.similar(word, 2), queries))
+        # What the index replaces: every entry compared with the query
+        entries = [index.get(word) for word in words]
+        scans = [(index.get(word), ) for word, in queries[:args.scans]]
+        latency("scan, rhymes", timings(
+            lambda query: [entry.word for entry in entries
+                           if entry.rhyme == query.rhyme], scans))
+        latency("scan, distance 1", timings(
+            lambda query: [entry.word for entry in entries
+                           if edit_distance(query.phones, entry.phones,
+                                            1) <= 1], scans))
+        index.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Memory of forked workers that build their own transcriptor against workers
+that share the one built by `stevens.shared.prefork`
+
+    python -m benchmarks.shared --workers 4 --texts 2000 --words 20000
+
+Reports the private memory of every worker after transcribing the corpus,
+i.e. what each extra worker adds to the RSS of the server. Linux only.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+from stevens import transcriber
+from stevens.shared import prefork
+
+from benchmarks.corpus import utterances, vocabulary
+
+
+def private_memory():
+    """Return the KiB of memory only mapped by the calling process"""
+    total = 0
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+
+def fork_workers(count, texts, lang):
+    """Fork `count` workers that transcribe `texts` and return the private
+    memory of each one"""
+    pipes = []
+    for _ in range(count):
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            transcriptor = transcriber.get_transcriptor(lang)
+            for text in texts:
+                transcriptor.transcribe(text)
+            os.write(write, str(private_memory()).encode("ascii"))
+            os._exit(0)
+        os.close(write)
+        pipes.append((pid, read))
+    sizes = []
+    for pid, read in pipes:
+        with os.fdopen(read, "rb") as result:
+            sizes.append(int(result.read()))
+        os.waitpid(pid, 0)
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--lang", default="es_ES")
+    args = parser.parse_args()
+    texts = utterances(args.texts)
+    results = {"cold": fork_workers(args.workers, texts, args.lang)}
+    directory = tempfile.mkdtemp()
+    try:
+        prefork([args.lang], words=vocabulary(args.words),
+                directory=directory, identification=False)
+        results["prefork"] = fork_workers(args.workers, texts, args.lang)
+    finally:
+        shutil.rmtree(directory)
+    for mode, sizes in sorted(results.items()):
+        print("{:8} {:10.0f} KiB private per worker".format(
+            mode, sum(sizes) / float(len(sizes))))
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the transcription pipeline
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare baseline.json --threshold 0.1
+
+Reports tokens/sec and per-call latency percentiles for every corpus and
+pipeline stage, the time to `import stevens`, the cold-start time of
+`get_transcriptor` and the peak memory of a run. With `--compare`, metrics
+worse than the baseline by more than the threshold are reported and the
+exit status is 1.
+"""
+import argparse
+import gc
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from timeit import default_timer
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from stevens.transcriber import get_transcriptor
+
+from benchmarks.corpus import CORPORA, get_corpus
+
+
+COLD_START = ("from timeit import default_timer; start = default_timer(); "
+              "from stevens import get_transcriptor; "
+              "get_transcriptor('{lang}').transcribe(u'hola'); "
+              "print(default_timer() - start)")
+
+IMPORT = ("from timeit import default_timer; start = default_timer(); "
+          "import stevens; print(default_timer() - start)")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def timings(function, calls):
+    """Return the seconds each of the argument tuples in `calls` took"""
+    durations = []
+    for args in calls:
+        start = default_timer()
+        function(*args)
+        durations.append(default_timer() - start)
+    return durations
+
+
+UNITS = {"ms": 1e3, "us": 1e6}
+
+
+def summary(durations, tokens, unit="ms"):
+    total = sum(durations) or 1e-9
+    return {
+        "calls": len(durations),
+        "tokens_per_second": tokens / total,
+        "p50_" + unit: UNITS[unit] * percentile(durations, 0.5),
+        "p99_" + unit: UNITS[unit] * percentile(durations, 0.99),
+    }
+
+
+def peak_memory(function):
+    """Return the peak memory in KiB allocated while running `function`"""
+    if tracemalloc is None:
+        import resource
+        function()
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def bench_corpus(transcriptor, texts):
+    tokens = sum(len(transcriptor.get_words(phrase)) for text in texts
+                 for phrase in transcriptor.get_phrases(text))
+    result = summary(timings(transcriptor.transcribe,
+                             [(text, ) for text in texts]), tokens)
+    result["tokens"] = tokens
+    result["peak_memory_kb"] = peak_memory(
+        lambda: [transcriptor.transcribe(text) for text in texts])
+    return result
+
+
+def bench_stages(transcriptor, texts):
+    phrases = [(text, ) for text in texts]
+    words = [(word, ) for text in texts
+             for phrase in transcriptor.get_phrases(text)
+             for word in transcriptor.get_words(phrase)]
+    syllable_lists = [transcriptor.get_syllables(word) for word, in words]
+    syllables = []
+    for word_syllables in syllable_lists:
+        length = len(word_syllables)
+        for index, syllable in enumerate(word_syllables):
+            previous, next = transcriptor.get_surroundings(
+                index, syllable, word_syllables, length)
+            syllables.append((syllable, previous, next))
+    stresses = [([transcriptor.transcribe_syllable(syllable)
+                  for syllable in word_syllables], )
+                for word_syllables in syllable_lists]
+    stages = {
+        "get_phrases": (transcriptor.get_phrases, phrases),
+        "get_syllables": (transcriptor.get_syllables, words),
+        "transcribe_syllable": (transcriptor.transcribe_syllable, syllables),
+        "find_stress": (transcriptor.find_stress, stresses),
+    }
+    return dict((name, summary(timings(function, calls), len(calls),
+                               unit="us"))
+                for name, (function, calls) in stages.items())
+
+
+def cold_start(code, repeat):
+    durations = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", code])
+        durations.append(float(output.strip()))
+    return 1e3 * min(durations)
+
+
+def run(lang="es_ES", size=2000, repeat=3, seed=0):
+    transcriptor = get_transcriptor(lang)
+    # Compile lazily built tables before measuring
+    transcriptor.transcribe(u" ".join(get_corpus("utterances", 10)))
+    results = {
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "lang": lang,
+        "size": size,
+        "import_ms": cold_start(IMPORT, repeat),
+        "cold_start_ms": cold_start(COLD_START.format(lang=lang), repeat),
+        "corpora": {},
+    }
+    for name in sorted(CORPORA):
+        texts = get_corpus(name, size, seed=seed)
+        results["corpora"][name] = bench_corpus(transcriptor, texts)
+    texts = get_corpus("paragraphs", max(1, size // 20), seed=seed)
+    results["stages"] = bench_stages(transcriptor, texts)
+    return results
+
+
+def flatten(results, prefix=u""):
+    metrics = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, prefix + key + u"."))
+        elif key.endswith(("_ms", "_us", "_kb", "_per_second")):
+            metrics[prefix + key] = value
+    return metrics
+
+
+def regressions(results, baseline, threshold):
+    """Return (metric, baseline, current) for every regressed metric"""
+    current = flatten(results)
+    found = []
+    for metric, old in sorted(flatten(baseline).items()):
+        new = current.get(metric)
+        if new is None or not old:
+            continue
+        change = (new - old) / float(old)
+        if metric.endswith("_per_second"):
+            change = -change
+        if change > threshold:
+            found.append((metric, old, new))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     prog="python -m benchmarks")
+    parser.add_argument("--lang", default="es_ES")
+    parser.add_argument("--size", type=int, default=2000,
+                        help="number of texts in every corpus")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="cold starts measured, the fastest is kept")
+    parser.add_argument("--output", help="JSON file to store the results")
+    parser.add_argument("--compare", help="JSON file with baseline results")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change flagged as a regression")
+    args = parser.parse_args(argv)
+    results = run(args.lang, args.size, args.repeat)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with io.open(args.output, "w", encoding="utf-8") as output:
+            output.write(type(u"")(text))
+    else:
+        print(text)
+    if args.compare:
+        with io.open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        found = regressions(results, baseline, args.threshold)
+        for metric, old, new in found:
+            print("REGRESSION {}: {:.3f} -> {:.3f}".format(metric, old, new))
+        if found:
+            return 1
+    return 0
@@ -0,0 +1,73 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Accuracy and speed of the syllabification backends
+
+    python -m benchmarks.syllabification --words 200000
+
+Accuracy is measured against a hand-syllabified gold list, speed on a word
+list built by repeating and recombining it. PyHyphen is only measured if it
+is installed.
+"""
+import argparse
+import random
+import time
+
+from stevens.hyphenation import get_hyphenator
+
+
+GOLD = u"""
+a-mor ca-sa pe-rro ca-lle mu-cha-cho hom-bre ha-blar prue-ba es-to u-na
+ins-tan-te trans-por-te cons-truc-ción ex-tra-or-di-na-rio pa-ís le-er
+bú-ho a-hí pin-güi-no at-lán-ti-co des-ha-cer hoy muy cre-er gue-rra
+quie-ro a-é-re-o ba-úl o-ír te-a-tro dí-a ciu-dad a-yer rey chi-i-ta
+a-ve-ri-guáis buey hue-vo a-gua a-ho-ra cie-lo cua-tro e-llos fe-o
+fe-li-ci-dad flo-res gra-cias hie-lo i-gle-sia jar-dín la-drón ma-ña-na
+náu-fra-go o-bli-ga-ción pá-ja-ro pe-rió-di-co plan-ta rí-o ro-sa
+si-glo so-bre tam-bién ti-gre ver-dad vie-jo za-pa-to ac-ción
+ab-sur-do obs-tá-cu-lo pers-pec-ti-va cien-cia le-ón po-e-ta o-cé-a-no
+ma-íz re-ír tí-o ca-í-da es-truc-tu-ra in-glés siem-pre ca-mi-no
+""".split()
+
+
+def measure(hyphenator, words):
+    start = time.time()
+    for word in words:
+        hyphenator.syllables(word)
+    return len(words) / (time.time() - start)
+
+
+def accuracy(hyphenator):
+    correct = 0
+    for entry in GOLD:
+        syllables = entry.split(u"-")
+        if hyphenator.syllables(u"".join(syllables)) == syllables:
+            correct += 1
+    return correct / float(len(GOLD))
+
+
+def word_list(count, seed=0):
+    generator = random.Random(seed)
+    syllables = [syllable for entry in GOLD for syllable in entry.split(u"-")]
+    return [u"".join(generator.choice(syllables)
+                     for _ in range(generator.randint(1, 4)))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--words", type=int, default=200000)
+    args = parser.parse_args()
+    words = word_list(args.words)
+    for backend in ("rules", "liang", "pyhyphen"):
+        try:
+            hyphenator = get_hyphenator("es_ES", backend=backend)
+        except ImportError:
+            print("{:10} not installed".format(backend))
+            continue
+        print("{:10} accuracy {:6.1%}  {:10.0f} words/s".format(
+            backend, accuracy(hyphenator), measure(hyphenator, words)))
+
+
+if __name__ == "__main__":
+    main()
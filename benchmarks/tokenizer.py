@@ -0,0 +1,74 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Throughput and peak memory of the single-pass tokenizer against lowercasing
+the whole text and splitting it into phrases and then words
+
+    python -m benchmarks.tokenizer --paragraphs 20000
+"""
+import argparse
+import re
+from timeit import default_timer
+
+from stevens.languages.es import castillian
+
+from benchmarks.corpus import paragraphs
+from benchmarks.suite import peak_memory
+
+
+def split_words(text, punctuation):
+    """The tokenization done before `stevens.tokenizer`"""
+    words = []
+    for phrase in re.split(punctuation, text.lower()):
+        if phrase:
+            words.extend(phrase.split())
+    return words
+
+
+def tokenize_words(text, tokenizer):
+    return [token.word for token in tokenizer.tokens(text)]
+
+
+def phrase_words(text, tokenizer):
+    return [word for words in tokenizer.phrase_words(text)
+            for word in words]
+
+
+def measure(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        function()
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    args = parser.parse_args()
+    text = u"\n".join(paragraphs(args.paragraphs))
+    transcriptor = castillian.Transcriptor()
+    punctuation = transcriptor._punctuation
+    tokenizer = transcriptor.tokenizer
+    # Both agree on plain lowercase text without digits
+    assert split_words(text, punctuation) == tokenize_words(text, tokenizer)
+    assert split_words(text, punctuation) == phrase_words(text, tokenizer)
+    megabytes = len(text.encode("utf-8")) / 1e6
+    for name, function in [
+            ("split", lambda: split_words(text, punctuation)),
+            ("tokenizer", lambda: tokenize_words(text, tokenizer)),
+            ("tokenizer (lazy)",
+             lambda: sum(1 for _ in tokenizer.tokens(text))),
+            ("phrase words", lambda: phrase_words(text, tokenizer))]:
+        seconds = measure(function)
+        print("{:17} {:8.2f} MB/s {:10.0f} KiB peak".format(
+            name, megabytes / seconds, peak_memory(function)))
+    # Tokenizing is a small share of transcribing the same text
+    seconds = measure(lambda: transcriptor.transcribe(text), repeat=1)
+    print("{:17} {:8.2f} MB/s".format("transcribe", megabytes / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Throughput of `transcribe_many` against a plain loop over `transcribe`
+
+    python -m benchmarks.transcribe_many --texts 20000 --workers 4
+"""
+import argparse
+import multiprocessing
+import time
+
+from stevens import get_transcriptor, transcribe_many
+
+from benchmarks.corpus import utterances
+
+
+def measure(function):
+    start = time.time()
+    results = function()
+    return time.time() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=256)
+    args = parser.parse_args()
+    texts = utterances(args.texts)
+    transcriptor = get_transcriptor("es_ES")
+    loop_time, expected = measure(
+        lambda: [transcriptor.transcribe(text) for text in texts])
+    pool_time, results = measure(
+        lambda: list(transcribe_many(texts, lang="es_ES",
+                                     workers=args.workers,
+                                     chunksize=args.chunksize)))
+    assert results == expected
+    print("loop:            {:10.0f} texts/s".format(len(texts) / loop_time))
+    print("transcribe_many: {:10.0f} texts/s ({} workers)".format(
+        len(texts) / pool_time, args.workers))
+    print("speedup:         {:10.2f}x".format(loop_time / pool_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Throughput of the NumPy batch path on a vocabulary list
+
+    python -m benchmarks.vectorized --words 100000 --batch 20000
+"""
+import argparse
+from timeit import default_timer
+
+from stevens.languages.es import castillian
+
+from benchmarks.corpus import vocabulary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--words", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=20000)
+    args = parser.parse_args()
+    words = vocabulary(args.words)
+    transcriptor = castillian.Transcriptor()
+    transcriptor.transcribe_words(words[:args.batch])
+    start = default_timer()
+    expected = [transcriptor.transcribe_word(word) for word in words]
+    loop_time = default_timer() - start
+    fst = castillian.Transcriptor(engine="fst")
+    start = default_timer()
+    assert [fst.transcribe_word(word) for word in words] == expected
+    fst_time = default_timer() - start
+    start = default_timer()
+    results = []
+    for offset in range(0, len(words), args.batch):
+        results.extend(
+            transcriptor.transcribe_words(words[offset:offset + args.batch]))
+    batch_time = default_timer() - start
+    assert results == expected
+    print("transcribe_word:  {:10.0f} words/s".format(len(words) / loop_time))
+    print("fst engine:       {:10.0f} words/s".format(len(words) / fst_time))
+    print("transcribe_words: {:10.0f} words/s".format(
+        len(words) / batch_time))
+    print("speedup:          {:10.2f}x".format(loop_time / batch_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,69 @@
 # -*- coding: utf-8 -*-
-from stevens.transcriber import get_transcriptor, transcribe
-get_transcriptor, transcribe
+"""
+Importing the package only defines these entry points; the transcriber,
+hyphenation and language modules are imported on first call, so short-lived
+processes only pay for what they use. Long-running servers can call
+`preload` to pay it up front.
+"""
+
+__version__ = "0.2.0"
+
+
+def cache_info():
+    """See `stevens.transcriber.cache_info`"""
+    from stevens.transcriber import cache_info
+    return cache_info()
+
+
+def clear_cache():
+    """See `stevens.transcriber.clear_cache`"""
+    from stevens.transcriber import clear_cache
+    return clear_cache()
+
+
+def get_transcriptor(*args, **kwargs):
+    """See `stevens.transcriber.get_transcriptor`"""
+    from stevens.transcriber import get_transcriptor
+    return get_transcriptor(*args, **kwargs)
+
+
+def identify(text):
+    """See `stevens.transcriber.identify`"""
+    from stevens.transcriber import identify
+    return identify(text)
+
+
+def pin_language(lang):
+    """See `stevens.identification.pin_language`"""
+    from stevens.identification import pin_language
+    return pin_language(lang)
+
+
+def preload(*args, **kwargs):
+    """See `stevens.transcriber.preload`"""
+    from stevens.transcriber import preload
+    return preload(*args, **kwargs)
+
+
+def set_cache_size(maxsize):
+    """See `stevens.transcriber.set_cache_size`"""
+    from stevens.transcriber import set_cache_size
+    return set_cache_size(maxsize)
+
+
+def transcribe(*args, **kwargs):
+    """See `stevens.transcriber.transcribe`"""
+    from stevens.transcriber import transcribe
+    return transcribe(*args, **kwargs)
+
+
+def transcribe_many(*args, **kwargs):
+    """See `stevens.transcriber.transcribe_many`"""
+    from stevens.transcriber import transcribe_many
+    return transcribe_many(*args, **kwargs)
+
+
+def warm_up(*args, **kwargs):
+    """See `stevens.transcriber.warm_up`"""
+    from stevens.transcriber import warm_up
+    return warm_up(*args, **kwargs)
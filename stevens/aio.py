@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio facade gathering concurrent requests into micro-batches
+
+Requires Python 3.7 or newer.
+"""
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from stevens.transcriber import (_init_worker, _transcribe_batch,
+                                 _transcribe_with, get_transcriptor)
+
+
+class AsyncTranscriber(object):
+    """Transcribe from coroutines without blocking the event loop
+
+    Texts awaited at about the same time are sent together to an executor
+    whose workers hold a warm `Transcriptor`. A batch is flushed when it
+    reaches `batch_size` texts or `max_wait` seconds after its first text,
+    whichever comes first. Identical texts already waiting for a result
+    share it instead of being transcribed again.
+    """
+
+    def __init__(self, lang="es_ES", workers=1, batch_size=64, max_wait=0.002,
+                 executor="thread", **options):
+        """
+        :param lang: string with the ISO 639-1 code or IETF language tag
+        :param workers: number of threads or processes transcribing batches
+        :param batch_size: maximum number of texts sent at once
+        :param max_wait: maximum seconds a text waits for its batch to fill
+        :param executor: "thread" or "process"
+        :param options: any other argument accepted by `get_transcriptor`
+        """
+        options["lang"] = lang
+        # Building it here raises errors early and warms forked workers
+        self._transcriptor = get_transcriptor(**options)
+        if executor == "thread":
+            # Threads share the transcriptor of this instance, other
+            # instances in the process may use other options
+            self._executor = ThreadPoolExecutor(workers)
+            self._transcribe_batch = functools.partial(_transcribe_with,
+                                                       self._transcriptor)
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(options, ))
+            self._transcribe_batch = _transcribe_batch
+        else:
+            raise ValueError("Unknown executor '{}'".format(executor))
+        self._batch_size = batch_size
+        self._max_wait = max_wait
+        self._pending = []
+        self._in_flight = {}
+        self._flush_handle = None
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+
+    async def transcribe(self, text):
+        """Return the phonetic transcription of `text`"""
+        self.requests += 1
+        future = self._in_flight.get(text)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._in_flight[text] = future
+            self._pending.append(text)
+            if len(self._pending) >= self._batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._max_wait,
+                                                     self._flush)
+        # A cancelled caller must not cancel the result other callers share
+        return await asyncio.shield(future)
+
+    async def transcribe_all(self, texts):
+        """Return the phonetic transcriptions of `texts`, in order"""
+        return await asyncio.gather(*[self.transcribe(text)
+                                      for text in texts])
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        result = loop.run_in_executor(self._executor,
+                                      self._transcribe_batch, batch)
+        result.add_done_callback(lambda result: self._resolve(batch, result))
+
+    def _resolve(self, batch, result):
+        exception = result.exception()
+        transcriptions = None if exception else result.result()
+        for index, text in enumerate(batch):
+            future = self._in_flight.pop(text)
+            if future.done():
+                continue
+            if exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(transcriptions[index])
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+        }
+
+    async def close(self):
+        """Transcribe the texts still waiting and shut the executor down"""
+        self._flush()
+        pending = list(self._in_flight.values())
+        if pending:
+            await asyncio.wait(pending)
+        self._executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Phonetic alphabets transcriptions are rendered into
+
+The rules emit IPA phones. Any other alphabet is a table mapping IPA
+symbols to its own, applied to every distinct phone once: translations are
+memoized per phone, and a `PhoneInventory` keeps the translation of each of
+its phones by index, so rendering an analysis into several alphabets costs
+one lookup per phone and alphabet. Separators and stress marks are never
+translated, they are the ones given to every call.
+"""
+from stevens.exceptions import NotAlphabetSupported
+
+
+# Names that render the phones emitted by the rules unchanged, checked
+# before looking the alphabet up
+IPA_NAMES = frozenset([None, "IPA", "ipa", u"IPA", u"ipa"])
+
+X_SAMPA = {
+    u"ɡ": u"g",
+    u"β": u"B",
+    u"ð": u"D",
+    u"ɣ": u"G",
+    u"θ": u"T",
+    u"ʃ": u"S",
+    u"ʒ": u"Z",
+    u"χ": u"X",
+    u"ʧ": u"tS",
+    u"ʤ": u"dZ",
+    u"ɾ": u"4",
+    u"ɲ": u"J",
+    u"ŋ": u"N",
+    u"ɱ": u"F",
+    u"ɴ": u"N\\",
+    u"ʎ": u"L",
+    u"ʝ": u"j\\",
+    u"ʑ": u"z\\",
+    u"ɟ": u"J\\",
+    u"ʔ": u"?",
+    u"ɛ": u"E",
+    u"ɔ": u"O",
+    u"ə": u"@",
+    u"ˈ": u"\"",
+    u"ˌ": u"%",
+}
+
+# Spanish SAMPA, which has no symbols for the palatal fricatives nor for
+# the allophones of "n" before labiodentals and uvulars
+SAMPA = dict(X_SAMPA)
+SAMPA.update({
+    u"r": u"rr",
+    u"ɾ": u"r",
+    u"ɴ": u"N",
+    u"ʝ": u"jj",
+    u"ʑ": u"jj",
+    u"ɟ": u"jj",
+})
+
+ALPHABETS = {
+    "ipa": {},
+    "xsampa": X_SAMPA,
+    "sampa": SAMPA,
+}
+
+_alphabets = {}
+
+
+def alphabet_name(name):
+    """Return the canonical name of an alphabet, e.g. "xsampa" for
+    "X-SAMPA" """
+    return name.lower().replace("-", "").replace("_", "")
+
+
+class Alphabet(object):
+    """Translation of IPA phones into the symbols of another alphabet"""
+
+    def __init__(self, name, symbols):
+        """
+        :param name: string with the name of the alphabet
+        :param symbols: dictionary mapping IPA symbols to the ones of the
+                        alphabet, symbols missing from it are kept
+        """
+        self._name = name
+        self._symbols = dict(symbols)
+        self._longest = max([len(symbol) for symbol in self._symbols] or [0])
+        self._phones = {}
+
+    def _get_name(self):
+        return self._name
+    name = property(fget=_get_name)
+
+    def _get_symbols(self):
+        return self._symbols
+    symbols = property(fget=_get_symbols)
+
+    def translate(self, phone):
+        """
+        Return `phone` in this alphabet
+
+        Phones made of several symbols, like the syllables of lexicon
+        entries, are translated by their longest known symbols.
+        """
+        translation = self._phones.get(phone)
+        if translation is None:
+            translation = self._phones.setdefault(phone,
+                                                  self._translate(phone))
+        return translation
+
+    def _translate(self, phone):
+        symbols = self._symbols
+        translation = []
+        index = 0
+        while index < len(phone):
+            for length in range(min(self._longest, len(phone) - index), 0,
+                                -1):
+                symbol = symbols.get(phone[index:index + length])
+                if symbol is not None:
+                    translation.append(symbol)
+                    index += length
+                    break
+            else:
+                translation.append(phone[index])
+                index += 1
+        return u"".join(translation)
+
+    def __repr__(self):
+        return "<Alphabet {!r}>".format(self._name)
+
+
+def register_alphabet(name, symbols):
+    """
+    Make a custom phone set available by name, e.g. the one of a TTS voice
+
+    :param name: string with the name of the alphabet
+    :param symbols: dictionary mapping IPA symbols to the ones of the
+                    alphabet
+    :return: the `Alphabet` object
+    """
+    name = alphabet_name(name)
+    ALPHABETS[name] = symbols
+    alphabet = _alphabets[name] = Alphabet(name, symbols)
+    return alphabet
+
+
+def get_alphabet(alphabet):
+    """
+    Return the `Alphabet` object of a name
+
+    :param alphabet: string with the name of the alphabet, case, "-" and
+                     "_" aside, or an `Alphabet` object, returned as is
+    :raises NotAlphabetSupported: if there is no alphabet with that name
+    """
+    if isinstance(alphabet, Alphabet):
+        return alphabet
+    if alphabet is None:
+        alphabet = "ipa"
+    if not isinstance(alphabet, (str, type(u""))):
+        raise ValueError("Expected the name of one alphabet, got "
+                         "{!r}".format(alphabet))
+    name = alphabet_name(alphabet)
+    instance = _alphabets.get(name)
+    if instance is None:
+        if name not in ALPHABETS:
+            raise NotAlphabetSupported(alphabet)
+        instance = _alphabets.setdefault(name,
+                                         Alphabet(name, ALPHABETS[name]))
+    return instance
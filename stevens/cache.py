@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Bounded, thread-safe mapping that evicts the least recently used item"""
+
+    def __init__(self, maxsize=128):
+        """
+        :param maxsize: maximum number of items to keep, `None` for unbounded
+        """
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_maxsize(self):
+        return self._maxsize
+
+    def _set_maxsize(self, maxsize):
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+    maxsize = property(fget=_get_maxsize, fset=_set_maxsize)
+
+    def _evict(self):
+        if self._maxsize is None:
+            return
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            self._evict()
+
+    def get_or_create(self, key, factory):
+        """Return the item for `key`, building it with `factory()` if missing
+
+        The lock is held while `factory` runs, so concurrent callers asking
+        for the same key never build it twice.
+        """
+        with self._lock:
+            missing = object()
+            value = self.get(key, missing)
+            if value is missing:
+                value = factory()
+                self.put(key, value)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self._maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Transcribe files or the standard input, writing one line per input line
+"""
+import argparse
+import io
+import sys
+
+from stevens.transcriber import get_transcriptor, transcribe_many
+
+
+def _open_input(path, encoding):
+    if path == "-":
+        return io.open(sys.stdin.fileno(), encoding=encoding, closefd=False)
+    return io.open(path, encoding=encoding)
+
+
+def _open_output(path, encoding):
+    if path == "-":
+        return io.open(sys.stdout.fileno(), "w", encoding=encoding,
+                       closefd=False)
+    return io.open(path, "w", encoding=encoding)
+
+
+def _read_line(stream, size, chunk):
+    while True:
+        yield chunk
+        if chunk.endswith(u"\n"):
+            return
+        chunk = stream.readline(size)
+        if not chunk:
+            return
+
+
+def read_lines(stream, size):
+    """Yield every line of `stream` as an iterator of chunks of `size` chars
+
+    Each line must be consumed before asking for the next one.
+    """
+    while True:
+        chunk = stream.readline(size)
+        if not chunk:
+            return
+        yield _read_line(stream, size, chunk)
+
+
+def transcribe_stream(transcriptor, stream, output, buffer_size):
+    separator = transcriptor.phrase_separator
+    for chunks in read_lines(stream, buffer_size):
+        phrases = transcriptor.transcribe_chunks(chunks)
+        for index, phrase in enumerate(phrases):
+            if index:
+                output.write(separator)
+            output.write(phrase)
+        output.write(u"\n")
+
+
+def transcribe_stream_many(stream, output, options, workers, chunksize):
+    lines = (line.rstrip(u"\n") for line in stream)
+    for transcription in transcribe_many(lines, workers=workers,
+                                         chunksize=chunksize, **options):
+        output.write(transcription)
+        output.write(u"\n")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="stevens",
+                                     description=__doc__.strip())
+    parser.add_argument("files", nargs="*", default=["-"],
+                        help="files to transcribe, '-' for the standard input")
+    parser.add_argument("-l", "--lang", default="es_ES",
+                        help="ISO 639-1 code or IETF language tag")
+    parser.add_argument("-a", "--alphabet", default="IPA",
+                        help="name of the phonetic alphabet to use")
+    parser.add_argument("-s", "--syllabic-separator", default=u".",
+                        help="string between the syllables of a word")
+    parser.add_argument("-w", "--word-separator", default=u"|",
+                        help="string between the words of a phrase")
+    parser.add_argument("-m", "--stress-mark", default=u"'",
+                        help="string before the stressed syllable")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes, 0 for one per CPU")
+    parser.add_argument("--chunksize", type=int, default=256,
+                        help="lines sent to a worker at once")
+    parser.add_argument("--buffer-size", type=int, default=64 * 1024,
+                        help="maximum characters read at once")
+    parser.add_argument("--store",
+                        help="SQLite file persisting transcribed words")
+    parser.add_argument("-e", "--encoding", default="utf-8",
+                        help="encoding of the input and the output")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, '-' for the standard output")
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    options = dict(
+        lang=args.lang,
+        alphabet=args.alphabet,
+        syllabic_separator=_decode(args.syllabic_separator),
+        word_separator=_decode(args.word_separator),
+        stress_mark=_decode(args.stress_mark),
+        store=args.store,
+    )
+    output = _open_output(args.output, args.encoding)
+    try:
+        for path in args.files:
+            stream = _open_input(path, args.encoding)
+            try:
+                if args.workers == 1:
+                    transcribe_stream(get_transcriptor(**options), stream,
+                                      output, args.buffer_size)
+                else:
+                    transcribe_stream_many(stream, output, options,
+                                           args.workers or None,
+                                           args.chunksize)
+            finally:
+                stream.close()
+    finally:
+        output.close()
+    return 0
+
+
+def _decode(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
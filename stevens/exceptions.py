@@ -6,3 +6,10 @@ class NotLanguageSupported(Exception):
     def __init__(self, lang):
         message = "Unsupported language code '{}'".format(lang)
         super(NotLanguageSupported, self).__init__(message)
+
+
+class NotAlphabetSupported(Exception):
+
+    def __init__(self, alphabet):
+        message = "Unsupported phonetic alphabet '{}'".format(alphabet)
+        super(NotAlphabetSupported, self).__init__(message)
@@ -1,13 +1,162 @@
 # -*- coding: utf-8 -*-
-from urllib2 import HTTPError
-
-from hyphen import Hyphenator
-from hyphen.dictools import install, is_installed
+import io
+import os
+import threading
+from importlib import import_module
 
+from stevens.cache import LRUCache
 from stevens.exceptions import NotLanguageSupported
+from stevens.packed import PackedTrie, pack_trie, save_trie
+
+
+PATTERNS_PATH = os.path.join(os.path.dirname(__file__), "patterns")
+
+_hyphenators = LRUCache(maxsize=8)
+
+
+def parse_patterns(lines):
+    """
+    Yield (letters, points) for every Liang pattern in `lines`
+
+    `points` holds one digit per gap around `letters`, so it is always one
+    character longer. Lines starting with `%` are comments.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(u"%"):
+            continue
+        letters = []
+        points = [u"0"]
+        for char in line:
+            if char.isdigit():
+                points[-1] = char
+            else:
+                letters.append(char)
+                points.append(u"0")
+        yield u"".join(letters), u"".join(points)
+
+
+def compile_patterns(source, target=None):
+    """
+    Compile the Liang patterns in the file `source` into a packed trie
+
+    :param source: path to a text file with one pattern per line
+    :param target: path where the packed trie is saved, `None` to only
+                   return it
+    :return: `bytes` with the packed trie
+    """
+    patterns = {}
+    with io.open(source, encoding="utf-8") as patterns_file:
+        for letters, points in parse_patterns(patterns_file):
+            if letters in patterns:
+                points = u"".join(max(old, new) for old, new
+                                  in zip(patterns[letters], points))
+            patterns[letters] = points
+    if target:
+        save_trie(patterns.items(), target)
+    return pack_trie(patterns.items())
+
+
+class LiangHyphenator(object):
+    """Hyphenator applying Liang patterns from a memory-mapped packed trie"""
+
+    def __init__(self, patterns, left_min=1, right_min=1):
+        """
+        :param patterns: `PackedTrie` object mapping pattern letters to points
+        :param left_min: minimum number of letters before the first break
+        :param right_min: minimum number of letters after the last break
+        """
+        self._patterns = patterns
+        self._left_min = left_min
+        self._right_min = right_min
+
+    def _get_patterns(self):
+        return self._patterns
+    patterns = property(fget=_get_patterns)
+
+    def _get_left_min(self):
+        return self._left_min
+    left_min = property(fget=_get_left_min)
+
+    def _get_right_min(self):
+        return self._right_min
+    right_min = property(fget=_get_right_min)
+
+    def fingerprint(self):
+        """Return a digest of the patterns and options of the hyphenator"""
+        return u"{}:{}:{}".format(self._patterns.digest(), self._left_min,
+                                  self._right_min)
+
+    def positions(self, word):
+        """Return the list of indexes of `word` a new syllable starts at"""
+        patterns = self._patterns
+        dotted = u"." + word + u"."
+        points = [0] * (len(dotted) + 1)
+        for start in range(len(dotted)):
+            for _, values in patterns.prefixes(dotted, start):
+                for offset, value in enumerate(values):
+                    value = int(value)
+                    if value > points[start + offset]:
+                        points[start + offset] = value
+        return [index for index in range(self._left_min,
+                                         len(word) - self._right_min + 1)
+                if points[index + 1] % 2]
+
+    def syllables(self, word):
+        if not word:
+            return []
+        syllables = []
+        start = 0
+        for index in self.positions(word):
+            syllables.append(word[start:index])
+            start = index
+        syllables.append(word[start:])
+        return syllables
+
+
+def load_patterns(lang):
+    language = lang.split(u"_")[0].lower()
+    path = os.path.join(PATTERNS_PATH, language + ".trie")
+    if os.path.exists(path):
+        return LiangHyphenator(PackedTrie.load(path))
+    source = os.path.join(PATTERNS_PATH, language + ".pat")
+    if os.path.exists(source):
+        return LiangHyphenator(PackedTrie(compile_patterns(source)))
+    raise NotLanguageSupported(lang)
 
 
-def get_hyphenator(lang):
+class SerializedHyphenator(object):
+    """Hyphenator whose calls are serialized with a lock
+
+    PyHyphen wraps the C library of Hunspell, which keeps no promises about
+    being called from several threads at once.
+    """
+
+    def __init__(self, hyphenator):
+        self._hyphenator = hyphenator
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        """Return the language of the wrapped PyHyphen dictionary"""
+        return u"{}".format(getattr(self._hyphenator, "language", u""))
+
+    def syllables(self, word):
+        with self._lock:
+            return self._hyphenator.syllables(word)
+
+
+def load_hyphenator(lang):
+    # PyHyphen and urllib are only imported when the backend is used, since
+    # together they take longer to import than the rest of the package
+    try:
+        from hyphen import Hyphenator
+        from hyphen.dictools import install, is_installed
+    except ImportError:
+        raise ImportError("Please, install PyHyphen")
+    try:
+        from urllib2 import HTTPError
+    except ImportError:
+        from urllib.error import HTTPError
     try:
         hyphenator = Hyphenator(lang)
     except IOError:
@@ -17,4 +166,48 @@ def get_hyphenator(lang):
                 hyphenator = Hyphenator(lang)
         except HTTPError:
             raise NotLanguageSupported(lang)
-    return hyphenator
+    return SerializedHyphenator(hyphenator)
+
+
+def load_syllabifier(lang):
+    language = lang.split(u"_")[0].lower()
+    try:
+        module = import_module(
+            "stevens.languages.{}.syllabification".format(language))
+    except ImportError:
+        raise NotLanguageSupported(lang)
+    return module.Syllabifier()
+
+
+BACKENDS = {
+    "liang": load_patterns,
+    "pyhyphen": load_hyphenator,
+    "rules": load_syllabifier,
+}
+
+
+def get_hyphenator(lang, backend="liang", cached=True):
+    """
+    Return a hyphenator for `lang`, reusing a loaded one if possible
+
+    The default "liang" backend reads the bundled patterns and never touches
+    the network; "rules" applies the syllabification rules of the language
+    itself; "pyhyphen" uses PyHyphen dictionaries, downloading them if they
+    are not installed.
+
+    :param lang: string with the IETF language tag of the dictionary
+    :param backend: string with the name of the hyphenation backend
+    :param cached: boolean to look up and store the hyphenator in the registry
+    :return: an object with a `syllables(word)` method
+    """
+    try:
+        load = BACKENDS[backend]
+    except KeyError:
+        raise ValueError("Unknown hyphenation backend '{}'".format(backend))
+    if not cached:
+        return load(lang)
+    return _hyphenators.get_or_create((lang, backend), lambda: load(lang))
+
+
+def clear_hyphenators():
+    _hyphenators.clear()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Language identification restricted to the languages stevens transcribes
+
+A cheap character trigram prefilter scores the text against small profiles
+of the supported languages and of the languages most often mistaken for
+them. Only texts the prefilter can not tell apart are sent to langid, whose
+model is loaded on first use and restricted to the same languages. Results
+are cached by text digest, and a language can be pinned to skip
+identification altogether.
+"""
+import hashlib
+import re
+import threading
+
+from stevens.cache import LRUCache
+from stevens.exceptions import NotLanguageSupported
+
+
+SUPPORTED = ("es", )
+
+# Code of texts written in none of the profiled languages
+UNDETERMINED = "und"
+
+# Most frequent character trigrams, words padded with spaces
+PROFILES = {
+    "es": (u" de|de | la|la |os | qu|que|ue | el|el |es |as | co|ent| en|"
+           u"en |ión|ció|ado|nte| lo|los| se|ien|aci|ara|par| pa|ero|est|"
+           u" es|res|con|ida| po|por|or |del| un|una|do |to |ta |s d|o d|"
+           u"a d|e l"),
+    "ca": (u" de|de |es | la|la | el|el |que| qu|ue |ent|ció|ls |els| le|"
+           u"les|nt | co| pe|per|a d|ra |aci| i |amb| am|mb |tat|at | un|"
+           u"una|par|est|ons|men|ica| en|en |ixe|aqu"),
+    "de": (u"en |er |der|ich|die| di|ie |ein| de|ch |sch|che| ei|und| un|"
+           u"nd |den|in |ung|gen|cht| zu|ten|ist|nde|te |es | da|das|ber|"
+           u"eit|auf| au|mit| mi|nic|sie| si|ine|lic"),
+    "en": (u" th|the|he |ing|ng | an|and|nd | of|of |ion| to|to |ed |er |"
+           u"is | in|in |ent|tio| wh|hat|at |tha| is| be|for| fo|or |re |"
+           u"es |on | it|it |his|ere|ver|all|wit|ith"),
+    "fr": (u" de|de |es | le|le |ent|nt | la|la |les|ion| et|et | qu|que|"
+           u"ue |ais|ait| un|une| pa|our|ou |eur|re |des| du|du |est| co|"
+           u"men|ans| da|dan|tio| po| en|en | pr|son|ons|e d|e l"),
+    "it": (u" di|di |che|he | ch|la | la|to |ell|lla|del| de|ion|one|re |"
+           u" co|per| pe|ent|nte|are| il|il |er |zio|ato|no |lo |sta|ere|"
+           u" un|una|con| e |gli| in|in |ess|ità|tti|o d"),
+    "pt": (u" de|de |os |que| qu|ue |ão |ção| co|do | do|da | da|ent|as |"
+           u" a | o |es | e |nte|com|em | em| pa|ara|par|men|est|uma| um|"
+           u"um |ões|nto|ado|não| nã|por| po|ica|res|o d"),
+}
+
+# Characters only written in one of the profiled languages
+MARKERS = {
+    "es": u"ñ¿¡",
+}
+
+# Letters of the orthography of the supported languages, texts with more
+# than a few letters outside of it are not in that language
+ALPHABETS = {
+    "es": u"abcdefghijklmnopqrstuvwxyzáéíóúüñ",
+}
+
+_non_letters = re.compile(r"[\W\d_]+", re.UNICODE)
+
+
+def _code(lang):
+    # ISO 639-1 code of a language tag, e.g. "es" for "es_ES" or "es-mx"
+    return lang.replace("-", "_").split("_")[0].lower()
+
+
+class Identifier(object):
+    """Language identification session
+
+    Every session has its own cache and pinned language, so e.g. a server
+    can keep one per client.
+    """
+
+    def __init__(self, languages=SUPPORTED, candidates=None,
+                 cache_size=4096, min_letters=12, sample_size=1000,
+                 margin=1.25, foreign=0.02):
+        """
+        :param languages: tuple of supported ISO 639-1 codes or dialect
+                          tags, returned instead of the code of their
+                          language
+        :param candidates: tuple of ISO 639-1 codes to tell apart from the
+                           supported ones, by default every profiled language
+        :param cache_size: maximum number of texts whose language is cached
+        :param min_letters: texts with fewer letters are too short to
+                            identify and get the default language
+        :param sample_size: number of characters of every text looked at
+        :param margin: ratio between the two best prefilter scores needed to
+                       decide without langid
+        :param foreign: share of letters outside the alphabet of a supported
+                        language above which it is ruled out
+        """
+        self._languages = tuple(languages)
+        # The first tag given for a language is the one identified
+        self._tags = dict((_code(lang), lang)
+                          for lang in reversed(self._languages))
+        if candidates is None:
+            candidates = sorted(PROFILES)
+        self._candidates = tuple(sorted(set(candidates) | set(self._tags)))
+        self._profiles = dict(
+            (language, frozenset(PROFILES[language].split(u"|")))
+            for language in self._candidates if language in PROFILES)
+        self._cache = LRUCache(maxsize=cache_size)
+        self._min_letters = min_letters
+        self._sample_size = sample_size
+        self._margin = margin
+        self._foreign = foreign
+        self._pinned = None
+        self._classifier = None
+        self._lock = threading.Lock()
+
+    def _get_languages(self):
+        return self._languages
+    languages = property(fget=_get_languages)
+
+    def _get_pinned(self):
+        return self._pinned
+    pinned = property(fget=_get_pinned)
+
+    def pin(self, lang):
+        """
+        Make every identification return `lang`, `None` to identify again
+
+        :param lang: ISO 639-1 code or dialect tag, e.g. "es_ES", of one of
+                     the supported languages
+        """
+        if lang is not None and _code(lang) not in self._tags:
+            raise NotLanguageSupported(lang)
+        self._pinned = lang
+
+    def _get_default(self):
+        return self._pinned or self._languages[0]
+    default = property(fget=_get_default)
+
+    def cache_info(self):
+        return self._cache.stats()
+
+    def scores(self, text):
+        """Return the share of trigrams of `text` in every profile"""
+        sample = text[:self._sample_size].lower()
+        excluded = set()
+        letters = _non_letters.sub(u"", sample)
+        for language, alphabet in ALPHABETS.items():
+            foreign = sum(letter not in alphabet for letter in letters)
+            if foreign > self._foreign * len(letters):
+                excluded.add(language)
+        letters = _non_letters.sub(u" ", sample)
+        padded = u" " + u" ".join(letters.split()) + u" "
+        trigrams = [padded[index:index + 3]
+                    for index in range(len(padded) - 2)]
+        total = float(len(trigrams)) or 1.0
+        return dict((language, sum(trigram in profile
+                                   for trigram in trigrams) / total)
+                    for language, profile in self._profiles.items()
+                    if language not in excluded)
+
+    def prefilter(self, text):
+        """
+        Return the language of `text` if it is obvious from its characters,
+        `None` otherwise
+
+        Texts too short to identify get the default language, texts without
+        a single trigram of any profile are `UNDETERMINED`.
+        """
+        sample = text[:self._sample_size].lower()
+        for language, markers in MARKERS.items():
+            if language in self._tags and \
+                    any(marker in sample for marker in markers):
+                return language
+        letters = _non_letters.sub(u"", sample)
+        if len(letters) < self._min_letters:
+            return _code(self.default)
+        scores = sorted(((score, language)
+                         for language, score in self.scores(text).items()),
+                        reverse=True)
+        if not scores or not scores[0][0]:
+            return UNDETERMINED
+        if len(scores) == 1 or \
+                scores[0][0] >= self._margin * scores[1][0]:
+            return scores[0][1]
+        return None
+
+    def load(self):
+        """Load the langid model restricted to the candidate languages,
+        `None` if langid is not installed"""
+        if self._classifier is None:
+            try:
+                from langid.langid import LanguageIdentifier, model
+            except ImportError:
+                return None
+            # Loaded once even if several threads miss the cache at once
+            with self._lock:
+                if self._classifier is None:
+                    classifier = LanguageIdentifier.from_modelstring(model)
+                    classifier.set_languages(list(self._candidates))
+                    self._classifier = classifier
+        return self._classifier
+
+    def classify(self, text):
+        """Return the language of `text`, without looking at the cache"""
+        language = self.prefilter(text)
+        if language is None:
+            classifier = self.load()
+            if classifier is not None:
+                language = classifier.classify(text)[0]
+            else:
+                scores = self.scores(text)
+                language = max(sorted(scores), key=scores.get)
+        return language
+
+    def _key(self, text):
+        return hashlib.sha1(text.encode("utf-8")).digest()
+
+    def _identify(self, key, text):
+        # Texts are classified outside the lock of the cache, so threads
+        # missing it run in parallel; racing misses classify twice
+        language = self._cache.get(key)
+        if language is None:
+            language = self.classify(text)
+            self._cache.put(key, language)
+        return language
+
+    def identify(self, text):
+        """
+        Return the ISO 639-1 code of the language of `text`, or the tag it
+        was given as when supported or pinned
+
+        :raises NotLanguageSupported: if `text` is in another language
+        """
+        if self._pinned is not None:
+            return self._pinned
+        language = self._identify(self._key(text), text)
+        if language not in self._tags:
+            raise NotLanguageSupported(language)
+        return self._tags[language]
+
+    def identify_many(self, texts):
+        """
+        Return the language of every text in `texts`, or `None` for texts in
+        unsupported languages
+
+        Repeated texts are only identified once.
+        """
+        if self._pinned is not None:
+            return [self._pinned for _ in texts]
+        languages = {}
+        results = []
+        for text in texts:
+            key = self._key(text)
+            language = languages.get(key)
+            if language is None:
+                language = languages[key] = self._identify(key, text)
+            results.append(self._tags.get(language))
+        return results
+
+
+_identifier = None
+
+
+def get_identifier():
+    """Return the identification session shared by the process"""
+    global _identifier
+    if _identifier is None:
+        _identifier = Identifier()
+    return _identifier
+
+
+def identify(text):
+    return get_identifier().identify(text)
+
+
+def identify_many(texts):
+    return get_identifier().identify_many(texts)
+
+
+def pin_language(lang):
+    """Make `transcribe` skip identification and use `lang`, `None` to undo
+    """
+    get_identifier().pin(lang)
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental transcription of documents that are edited in place
+
+Phrases are transcribed independently of each other and the words of a
+phrase only look at their own syllables, so an edit can only change the
+phrases it touches. `IncrementalTranscription` keeps the phrase segmentation
+of the document with the transcription of every word, and on each edit
+re-splits and re-transcribes the touched phrases alone, reusing the words
+that did not change.
+
+The document is kept as a rope of one block of text per phrase, and the
+offsets of the phrases are shifted lazily, so an edit near the previous one
+costs as much as the phrases it touches whatever the size of the document.
+"""
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+
+# Phrases `start` to `stop` of the previous transcription replaced by the
+# list of transcribed `phrases`
+Patch = namedtuple("Patch", ["start", "stop", "phrases"])
+
+
+# Characters compared at once when looking for the edited region
+CHUNK_SIZE = 64
+
+
+def _common_length(first, second, limit, step):
+    """
+    Return the length of the common prefix of two strings, or of their
+    common suffix if `step` is -1, up to `limit` characters
+
+    Chunks are compared in C and double in size while they match, starting
+    over from `CHUNK_SIZE` after a mismatch, so every character of the
+    common part is compared a bounded number of times.
+    """
+    length = 0
+    size = CHUNK_SIZE
+    while length < limit:
+        end = min(length + size, limit)
+        if step > 0:
+            matches = first[length:end] == second[length:end]
+        else:
+            matches = (first[len(first) - end:len(first) - length] ==
+                       second[len(second) - end:len(second) - length])
+        if matches:
+            length = end
+            size *= 2
+        elif size > CHUNK_SIZE:
+            size = CHUNK_SIZE
+        else:
+            index = length if step > 0 else -1 - length
+            while first[index] == second[index]:
+                length += 1
+                index += step
+            return length
+    return length
+
+
+class _Offsets(object):
+    """
+    Ascending offsets of the phrases of a document, shifted lazily by edits
+
+    Offsets from `pivot` on are stored `delta` short of their value, so an
+    edit only rewrites the offsets between the previous edit and its own.
+    """
+
+    def __init__(self):
+        self._values = []
+        self._pivot = 0
+        self._delta = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if index >= self._pivot:
+            return self._values[index] + self._delta
+        return self._values[index]
+
+    def values(self):
+        return [self[index] for index in range(len(self._values))]
+
+    def bisect_left(self, value):
+        index = bisect_left(self._values, value, 0, self._pivot)
+        if index < self._pivot:
+            return index
+        return bisect_left(self._values, value - self._delta, self._pivot)
+
+    def bisect_right(self, value):
+        index = bisect_right(self._values, value, 0, self._pivot)
+        if index < self._pivot:
+            return index
+        return bisect_right(self._values, value - self._delta, self._pivot)
+
+    def replace(self, first, stop, values, delta):
+        """
+        Replace the offsets from `first` to `stop` with `values` and shift
+        the following ones by `delta`
+        """
+        pivot = self._pivot
+        offsets = self._values
+        if pivot < stop:
+            offsets[pivot:stop] = [offset + self._delta
+                                   for offset in offsets[pivot:stop]]
+        elif stop < pivot:
+            offsets[stop:pivot] = [offset - self._delta
+                                   for offset in offsets[stop:pivot]]
+        offsets[first:stop] = values
+        self._pivot = first + len(values)
+        self._delta += delta
+
+
+class IncrementalTranscription(object):
+    """Transcription of a document kept up to date edit by edit"""
+
+    def __init__(self, transcriptor, text=u""):
+        """
+        :param transcriptor: `BaseTranscriptor` object to transcribe with
+        :param text: unicode string with the initial document
+        """
+        self._transcriptor = transcriptor
+        # Text before the first phrase, then the text of every phrase up to
+        # the next one
+        self._blocks = [u""]
+        self._length = 0
+        self._text = u""
+        self._starts = _Offsets()
+        self._ends = _Offsets()
+        # Tuples of (word, transcription) pairs of every phrase
+        self._words = []
+        self._phrases = []
+        # Offsets of every phrase in the transcription, which is only joined
+        # when asked for and then patched by every edit
+        self._positions = _Offsets()
+        self._transcription = None
+        self._transcription_length = 0
+        if text:
+            self.edit(0, 0, text)
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def _get_text(self):
+        if self._text is None:
+            self._text = u"".join(self._blocks)
+        return self._text
+    text = property(fget=_get_text)
+
+    def _get_phrases(self):
+        return list(self._phrases)
+    phrases = property(fget=_get_phrases)
+
+    def _get_transcription(self):
+        if self._transcription is None:
+            self._transcription = self._transcriptor.phrase_separator.join(
+                self._phrases)
+        return self._transcription
+    transcription = property(fget=_get_transcription)
+
+    def spans(self):
+        """Return the (start, end) offsets of every phrase in `text`"""
+        return list(zip(self._starts.values(), self._ends.values()))
+
+    def _touched(self, start, end):
+        """Return the range of phrases an edit from `start` to `end` can
+        change, including those on both sides of a gap it touches, since
+        removing the pause in the gap joins them"""
+        starts = self._starts
+        ends = self._ends
+        first = ends.bisect_left(start)
+        if 0 < first and (first == len(starts) or start < starts[first]):
+            first -= 1
+        stop = starts.bisect_right(end)
+        if stop < len(starts) and (stop == 0 or ends[stop - 1] < end):
+            stop += 1
+        return first, max(first, stop)
+
+    def _transcribe_words(self, words, known):
+        transcriptor = self._transcriptor
+        transcriptions = []
+        length = len(words)
+        for index, word in enumerate(words):
+            transcription = known.get(word)
+            if transcription is None:
+                previous, next = transcriptor.get_surroundings(
+                    index, word, words, length)
+                transcription = known[word] = transcriptor.transcribe_word(
+                    word, previous=previous, next=next)
+            transcriptions.append(transcription)
+        return transcriptions
+
+    def edit(self, start, end, text):
+        """
+        Replace the characters from `start` to `end` with `text`
+
+        :param start: offset of the first replaced character
+        :param end: offset past the last replaced character
+        :param text: unicode string inserted in their place
+        :return: `Patch` with the phrases that changed
+        """
+        if not 0 <= start <= end <= self._length:
+            raise IndexError("Edit out of the document")
+        delta = len(text) - (end - start)
+        first, stop = self._touched(start, end)
+        starts = self._starts
+        region_start = start
+        region_end = end
+        if first < stop:
+            region_start = min(start, starts[first])
+            region_end = max(end, self._ends[stop - 1])
+        # Only the blocks of the touched phrases are edited, and the one
+        # before the first phrase if the edit starts there
+        if first < stop and starts[first] <= start:
+            low = first + 1
+            offset = starts[first]
+        else:
+            low = offset = 0
+        old = u"".join(self._blocks[low:stop + 1])
+        new = old[:start - offset] + text + old[end - offset:]
+        known = {}
+        for index in range(first, stop):
+            known.update(self._words[index])
+        # Phrases are split by the tokenizer, like `transcribe` does, and
+        # span their first and last words
+        word_separator = self._transcriptor.word_separator
+        tokenizer = self._transcriptor.tokenizer
+        spans = []
+        words = []
+        phrases = []
+        for tokens in tokenizer.phrases(new, region_start - offset,
+                                        region_end + delta - offset):
+            spans.append((tokens[0].start, tokens[-1].end))
+            phrase_words = [token.word for token in tokens]
+            transcriptions = self._transcribe_words(phrase_words, known)
+            words.append(tuple(zip(phrase_words, transcriptions)))
+            phrases.append(word_separator.join(transcriptions))
+        # The text before the first phrase goes to the previous block
+        cuts = [span[0] for span in spans] + [len(new)]
+        blocks = [new[cuts[index]:cuts[index + 1]]
+                  for index in range(len(spans))]
+        if low:
+            self._blocks[first] += new[:cuts[0]]
+        else:
+            blocks.insert(0, new[:cuts[0]])
+        self._blocks[low:stop + 1] = blocks
+        self._length += delta
+        self._text = None
+        self._patch_transcription(first, stop, phrases)
+        starts.replace(first, stop, [span[0] + offset for span in spans],
+                       delta)
+        self._ends.replace(first, stop, [span[1] + offset for span in spans],
+                           delta)
+        self._words[first:stop] = words
+        self._phrases[first:stop] = phrases
+        return Patch(first, stop, phrases)
+
+    def _patch_transcription(self, first, stop, phrases):
+        """Replace the transcription of phrases `first` to `stop` with
+        `phrases`, in the joined transcription if it was asked for"""
+        separator = self._transcriptor.phrase_separator
+        positions = self._positions
+        before = first > 0
+        after = stop < len(self._phrases)
+        head = 0
+        if before:
+            head = positions[first - 1] + len(self._phrases[first - 1])
+        tail = positions[stop] if after else self._transcription_length
+        lead = separator if before and (phrases or after) else u""
+        trail = separator if phrases and after else u""
+        middle = lead + separator.join(phrases) + trail
+        offsets = []
+        offset = head + len(lead)
+        for phrase in phrases:
+            offsets.append(offset)
+            offset += len(phrase) + len(separator)
+        shift = len(middle) - (tail - head)
+        positions.replace(first, stop, offsets, shift)
+        self._transcription_length += shift
+        if self._transcription is not None:
+            self._transcription = (self._transcription[:head] + middle +
+                                   self._transcription[tail:])
+
+    def update(self, text):
+        """
+        Replace the document with `text`, re-transcribing only the span
+        between the common prefix and suffix of both versions
+
+        Finding them costs as much as comparing the unchanged characters
+        once; the touched phrases are then found by bisecting their spans.
+
+        :return: `Patch` with the phrases that changed
+        """
+        old = self.text
+        limit = min(len(old), len(text))
+        prefix = _common_length(old, text, limit, 1)
+        suffix = _common_length(old, text, limit - prefix, -1)
+        return self.edit(prefix, len(old) - suffix,
+                         text[prefix:len(text) - suffix])
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+from functools import wraps
+from timeit import default_timer
+
+
+STAGES = ("transcribe", "transcribe_phrase", "transcribe_word",
+          "get_syllables", "transcribe_syllable")
+
+
+class StageStats(object):
+    """Call count, cumulative time and a bounded sample of call durations"""
+
+    def __init__(self, max_samples=10000, seed=0):
+        self.calls = 0
+        self.total = 0.0
+        self.samples = []
+        self._max_samples = max_samples
+        self._random = random.Random(seed)
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        if len(self.samples) < self._max_samples:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling keeps every call equally likely to be kept
+            index = self._random.randint(0, self.calls - 1)
+            if index < self._max_samples:
+                self.samples[index] = seconds
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.total / self.calls if self.calls else 0.0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+        }
+
+
+class Stats(object):
+    """Timings per pipeline stage and hit counts per rule of a transcriptor"""
+
+    def __init__(self, max_samples=10000, callback=None):
+        """
+        :param max_samples: maximum number of durations kept per stage to
+                            compute percentiles
+        :param callback: function called with (stage, seconds) after every
+                         instrumented call
+        """
+        self._max_samples = max_samples
+        self._callback = callback
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.rule_hits = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self._max_samples)
+            stats.add(seconds)
+        if self._callback is not None:
+            self._callback(stage, seconds)
+
+    def hit(self, chunk):
+        with self._lock:
+            self.rule_hits[chunk] = self.rule_hits.get(chunk, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.rule_hits = {}
+
+    def summary(self):
+        with self._lock:
+            return {
+                "stages": dict((stage, stats.summary())
+                               for stage, stats in self.stages.items()),
+                "rule_hits": dict(self.rule_hits),
+            }
+
+
+def timed(stats, stage, function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = default_timer()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(stage, default_timer() - start)
+    return wrapper
+
+
+def counted(stats, chunk, rule):
+    @wraps(rule)
+    def wrapper(previous, next, index):
+        stats.hit(chunk)
+        return rule(previous, next, index)
+    return wrapper
@@ -1,22 +1,60 @@
 # -*- coding: utf-8 -*-
-import re
+import threading
+from collections import namedtuple
+
+from stevens.alphabets import IPA_NAMES, get_alphabet
+from stevens.cache import LRUCache
+from stevens.instrumentation import STAGES, Stats, counted, timed
+from stevens.result import PhoneInventory, Transcription
+from stevens.tokenizer import Tokenizer
+
+
+# Formatting of the transcription of one call, see `BaseTranscriptor.options`
+Options = namedtuple("Options", ["syllabic_separator", "word_separator",
+                                 "phrase_separator", "stress_mark",
+                                 "alphabet"])
 
 
 class BaseTranscriptor(object):
+    """Transcriptor of the text of a language
+
+    Transcriptors are not changed by transcribing, so a single instance can
+    be shared by any number of threads. The formatting options given to a
+    call only apply to that call: they are gathered in an `Options` tuple
+    passed down the pipeline instead of being stored on the instance. The
+    tables built on first use are built once under a lock, and the word
+    cache and store are thread-safe. Only `instrument`, `uninstrument` and
+    `set_word_table` change a transcriptor, and they must be called before
+    sharing it.
+    """
 
     def __init__(self, text=None, hyphenator=None, lang="es_ES",
                  alphabet="IPA", syllabic_separator=u".", word_separator=u"|",
                  phrase_separator=u"/", flattern=True,
-                 stress_mark=u"'"):
+                 stress_mark=u"'", word_cache_size=0, store=None,
+                 lexicon=None):
         """
         :param text: unicode string to transcribe
         :param hyphenator: Hyphenator object
         :param lang: string with the ISO 639-1 or IETF language tag of `text`
-        :param alphabet: string with the name of the phonetic alphabet to use
+        :param alphabet: string with the name of the phonetic alphabet to use,
+                         see `stevens.alphabets`, or a tuple of names to get
+                         a tuple of transcriptions from `transcribe`
         :param syllabic_separator: string with the syllabic separator character
         :param word_separator: string with the word separator character
         :param stress_mark: string to mark the stress in words
+        :param word_cache_size: maximum number of transcribed words to memoize,
+                                0 to disable the word cache
+        :param store: `TranscriptionStore` object or path to a SQLite file to
+                      persist transcribed words across runs and processes
+        :param lexicon: `stevens.lexicon.Lexicon` object or path to a lexicon
+                        file whose words are looked up before applying the
+                        rules, `True` for the lexicon bundled for the
+                        dialect `lang`
         """
+        for name in (alphabet if isinstance(alphabet, (tuple, list))
+                     else [alphabet]):
+            get_alphabet(name)
         self._hyphenator = hyphenator
         self._text = text
         self._lang = lang
@@ -25,7 +63,30 @@ class BaseTranscriptor(object):
         self._word_separator = word_separator
         self._stress_mark = stress_mark
         self._phrase_separator = phrase_separator
+        self._options = Options(syllabic_separator, word_separator,
+                                phrase_separator, stress_mark, alphabet)
+        self._lock = threading.RLock()
         self._rules = {}
+        self._stats = None
+        self._word_cache = None
+        self._inventory = PhoneInventory()
+        if isinstance(store, (str, type(u""))):
+            # SQLite is only imported by transcriptors that use a store
+            from stevens.store import TranscriptionStore
+            store = TranscriptionStore(store)
+        self._store = store
+        if lexicon is True or isinstance(lexicon, (str, type(u""))):
+            from stevens.lexicon import Lexicon, get_lexicon
+            if lexicon is True:
+                lexicon = get_lexicon(lang)
+            else:
+                lexicon = Lexicon.load(lexicon)
+        self._lexicon = lexicon
+        self._fingerprint = None
+        self._word_table = None
+        self._tokenizer = Tokenizer()
+        if word_cache_size:
+            self._word_cache = LRUCache(maxsize=word_cache_size)
         self._transcription_rules()
 
     def rule(self, chunk):
@@ -38,6 +99,133 @@ class BaseTranscriptor(object):
         return self._rules
     rules = property(fget=_get_rules)
 
+    def _get_lang(self):
+        return self._lang
+    lang = property(fget=_get_lang)
+
+    def _get_stats(self):
+        return self._stats
+    stats = property(fget=_get_stats)
+
+    def instrument(self, stats=None, callback=None):
+        """Time every pipeline stage and count the calls to every rule
+
+        Instrumented methods and rules are wrapped on this instance only, so
+        a transcriptor that is not instrumented pays nothing. Syllables
+        resolved without applying the rules are not counted as rule hits.
+
+        :param stats: `Stats` object to record into, a new one if `None`
+        :param callback: function called with (stage, seconds) after every
+                         instrumented call, ignored if `stats` is given
+        :return: the `Stats` object
+        """
+        self.uninstrument()
+        if stats is None:
+            stats = Stats(callback=callback)
+        for stage in STAGES:
+            method = getattr(self, stage, None)
+            if method is not None:
+                setattr(self, stage, timed(stats, stage, method))
+        self._uninstrumented_rules = self._rules
+        self._rules = dict((chunk, counted(stats, chunk, rule))
+                           for chunk, rule in self._rules.items())
+        self._stats = stats
+        return stats
+
+    def uninstrument(self):
+        """Remove the wrappers installed by `instrument`"""
+        if self._stats is None:
+            return
+        for stage in STAGES:
+            self.__dict__.pop(stage, None)
+        self._rules = self._uninstrumented_rules
+        del self._uninstrumented_rules
+        self._stats = None
+
+    def _get_inventory(self):
+        return self._inventory
+    inventory = property(fget=_get_inventory)
+
+    def _get_lexicon(self):
+        return self._lexicon
+    lexicon = property(fget=_get_lexicon)
+
+    def _get_store(self):
+        return self._store
+    store = property(fget=_get_store)
+
+    def fingerprint(self):
+        """Return a digest of the rules and options of the transcriptor"""
+        if self._fingerprint is None:
+            from stevens.store import fingerprint
+            with self._lock:
+                if self._fingerprint is None:
+                    self._fingerprint = fingerprint(self)
+        return self._fingerprint
+
+    def _get_default_options(self):
+        return self._options
+    default_options = property(fget=_get_default_options)
+
+    def options(self, options=None, syllabic_separator=None,
+                word_separator=None, phrase_separator=None,
+                stress_mark=None, alphabet=None):
+        """
+        Return the `Options` of a call
+
+        :param options: `Options` tuple, the defaults of the transcriptor if
+                        `None`
+        :param syllabic_separator: overrides the syllabic separator if given,
+                                   and likewise for the other arguments
+        """
+        if options is None:
+            options = self._options
+        if syllabic_separator or word_separator or phrase_separator or \
+                stress_mark or alphabet:
+            options = Options(syllabic_separator or options[0],
+                              word_separator or options[1],
+                              phrase_separator or options[2],
+                              stress_mark or options[3],
+                              alphabet or options[4])
+        return options
+
+    def _get_word_table(self):
+        return self._word_table
+    word_table = property(fget=_get_word_table)
+
+    def set_word_table(self, table):
+        """
+        Look words up in a read-only table before transcribing them
+
+        :param table: `stevens.shared.WordTable` built by a transcriptor with
+                      the same rules and options, `None` to detach it
+        :raises ValueError: if `table` was built with other rules or options
+        """
+        if table is not None and table.fingerprint != self.fingerprint():
+            raise ValueError("Word table built by another transcriptor")
+        self._word_table = table
+
+    def _get_word_cache(self):
+        return self._word_cache
+    word_cache = property(fget=_get_word_cache)
+
+    def word_cache_info(self):
+        """Return a dictionary with the statistics of the word cache"""
+        if self._word_cache is None:
+            return None
+        return self._word_cache.stats()
+
+    def word_cache_key(self, word, previous=None, next=None,
+                       syllabic_separator=None, alphabet=None,
+                       stress_mark=None):
+        """Return the key under which the transcription of `word` is cached
+
+        Letter rules only look at the syllables of the word itself, so the
+        neighbouring words are left out of the key. Transcriptors whose rules
+        reach across word boundaries must add them here.
+        """
+        return (word, syllabic_separator, alphabet, stress_mark)
+
     def get_syllables(self, word):
         h = self._hyphenator
         syllables = h.syllables(word)
@@ -55,36 +243,163 @@ class BaseTranscriptor(object):
                 next = items[index + 1]
         return previous, next
 
+    def _get_word_separator(self):
+        return self._word_separator
+    word_separator = property(fget=_get_word_separator)
+
+    def _get_phrase_separator(self):
+        return self._phrase_separator
+    phrase_separator = property(fget=_get_phrase_separator)
+
+    def _get_tokenizer(self):
+        return self._tokenizer
+    tokenizer = property(fget=_get_tokenizer)
+
+    def _get_hyphenator(self):
+        return self._hyphenator
+    hyphenator = property(fget=_get_hyphenator)
+
+    def iter_phrase_words(self, chunks):
+        """Lazily yield the list of normalized words of every phrase found
+        in an iterable of text chunks
+
+        The text after the last pause of a chunk is carried over and
+        completed with the beginning of the next one.
+        """
+        tokenizer = self._tokenizer
+        tail = u""
+        for chunk in chunks:
+            pieces = tokenizer.pauses.split(tail + chunk)
+            tail = pieces.pop()
+            for piece in pieces:
+                words = tokenizer.words(piece)
+                if words:
+                    yield words
+        words = tokenizer.words(tail)
+        if words:
+            yield words
+
+    def iter_phrases(self, chunks):
+        """Lazily yield the phrases found in an iterable of text chunks,
+        every one as its normalized words joined by spaces"""
+        for words in self.iter_phrase_words(chunks):
+            yield u" ".join(words)
+
     def get_phrases(self, text):
-        text = (text or self._text).lower()
-        return [w for w in re.split(self._punctuation, text) if len(w) > 0]
+        if text is None:
+            text = self._text or u""
+        return list(self.iter_phrases([text]))
 
     def get_words(self, phrase):
+        # Phrases from `iter_phrase_words` are already split
+        if isinstance(phrase, list):
+            return phrase
         return phrase.split()
 
-    def transcribe(self, text=None, syllabic_separator=None, alphabet=None,
-                   stress_mark=None, word_separator=None,
-                   phrase_separator=None):
-        phrases = self.get_phrases(text)
+    def iter_phrase_spans(self, text):
+        """Yield the (start, end) offsets in `text` of the words of every
+        phrase, as split by `iter_phrases`"""
+        for tokens in self._tokenizer.phrases(text):
+            yield [(token.start, token.end) for token in tokens]
+
+    def word_phones(self, word):
+        """
+        Return the phones of every syllable of `word` and the index of the
+        stressed syllable
+
+        Transcriptors that can not tell phones apart return every syllable
+        as a single phone, and so do words found in the lexicon.
+        """
+        if self._lexicon is not None:
+            entry = self._lexicon.syllables(word)
+            if entry is not None:
+                return [[syllable] for syllable in entry[0]], entry[1]
+        syllables = self.get_syllables(word)
         transcription = []
-        phrases_length = len(phrases)
-        for i, phrase in enumerate(phrases):
-            previous, next = self.get_surroundings(i, phrase, phrases,
-                                                   phrases_length)
-            transcribed_phrase = self.transcribe_phrase(
+        syllables_len = len(syllables)
+        for i, syllable in enumerate(syllables):
+            previous, next = self.get_surroundings(i, syllable, syllables,
+                                                   syllables_len)
+            transcription.append(self.transcribe_syllable(
+                syllable, previous=previous, next=next))
+        return [[syllable] for syllable in transcription], \
+            self.find_stress(transcription)
+
+    def analyze(self, text=None):
+        """
+        Return the structured `Transcription` of `text`
+
+        Rendering the result gives the same string as `transcribe`.
+        """
+        if text is None:
+            text = self._text or u""
+        transcription = Transcription(text, self._inventory, (
+            self._syllabic_separator, self._word_separator,
+            self._phrase_separator, self._stress_mark))
+        for tokens in self._tokenizer.phrases(text):
+            for token in tokens:
+                syllables, stress_index = self.word_phones(token.word)
+                transcription.add_word(token.start, token.end, syllables,
+                                       stress_index)
+            transcription.end_phrase()
+        return transcription
+
+    def transcribe_chunks(self, chunks, syllabic_separator=None,
+                          alphabet=None, stress_mark=None,
+                          word_separator=None, options=None):
+        """Lazily yield the transcription of every phrase in `chunks`
+
+        :param chunks: iterable of unicode strings, read one at a time
+        """
+        options = self.options(options, syllabic_separator, word_separator,
+                               None, stress_mark, alphabet)
+        phrases = self.iter_phrase_words(chunks)
+        previous = None
+        phrase = next(phrases, None)
+        while phrase is not None:
+            following = next(phrases, None)
+            yield self.transcribe_phrase(
                 phrase,
                 previous=previous,
-                next=next,
-                syllabic_separator=syllabic_separator,
-                alphabet=alphabet,
-                stress_mark=stress_mark
+                next=following,
+                options=options
             )
-            transcription.append(transcribed_phrase)
-        return self._phrase_separator.join(transcription)
+            previous, phrase = phrase, following
+
+    def transcribe(self, text=None, syllabic_separator=None, alphabet=None,
+                   stress_mark=None, word_separator=None,
+                   phrase_separator=None, options=None):
+        """
+        Return the transcription of `text`
+
+        :param text: unicode string, the text given when building the
+                     transcriptor if `None`
+        :param alphabet: name of the phonetic alphabet, or tuple of names to
+                         return a tuple with the transcription in each one
+        :param options: `Options` tuple with the formatting of this call,
+                        overridden by any of the other arguments given
+        """
+        if text is None:
+            text = self._text or u""
+        options = self.options(options, syllabic_separator, word_separator,
+                               phrase_separator, stress_mark, alphabet)
+        if isinstance(options.alphabet, (tuple, list)):
+            # Every alphabet is rendered from the phones of one analysis
+            transcription = self.analyze(text)
+            return tuple(transcription.render(options.syllabic_separator,
+                                              options.word_separator,
+                                              options.phrase_separator,
+                                              options.stress_mark, alphabet)
+                         for alphabet in options.alphabet)
+        transcription = self.transcribe_chunks([text], options=options)
+        return options.phrase_separator.join(transcription)
 
     def transcribe_phrase(self, phrase, previous=None, next=None,
                           syllabic_separator=None, alphabet=None,
-                          word_separator=None, stress_mark=None):
+                          word_separator=None, stress_mark=None,
+                          options=None):
+        options = self.options(options, syllabic_separator, word_separator,
+                               None, stress_mark, alphabet)
         words = self.get_words(phrase)
         transcription = []
         words_length = len(words)
@@ -95,18 +410,57 @@ class BaseTranscriptor(object):
                 word,
                 previous=previous,
                 next=next,
-                syllabic_separator=syllabic_separator,
-                alphabet=alphabet,
-                stress_mark=stress_mark
+                options=options
             )
             transcription.append(transcribed_word)
-        return self._word_separator.join(transcription)
+        return options.word_separator.join(transcription)
 
     def transcribe_word(self, word, previous=None, next=None,
                         syllabic_separator=None, alphabet=None,
-                        stress_mark=None):
-        if not stress_mark:
-            stress_mark = self._stress_mark
+                        stress_mark=None, options=None):
+        # Calls from `transcribe_phrase` pass their options ready
+        if options is None or syllabic_separator or stress_mark or alphabet:
+            options = self.options(options, syllabic_separator, None, None,
+                                   stress_mark, alphabet)
+        table = self._word_table
+        if table is not None and \
+                options.stress_mark == self._stress_mark and \
+                options.syllabic_separator == self._syllabic_separator and \
+                options.alphabet == self._alphabet:
+            transcription = table.get(word)
+            if transcription is not None:
+                return transcription
+        cache = self._word_cache
+        store = self._store
+        if cache is None and store is None:
+            return self._transcribe_word(word, previous, next, options)
+        key = self.word_cache_key(word, previous, next,
+                                  options.syllabic_separator,
+                                  options.alphabet, options.stress_mark)
+        transcription = None
+        if cache is not None:
+            transcription = cache.get(key)
+            if transcription is not None:
+                return transcription
+        if store is not None:
+            transcription = store.get(self.fingerprint(), key)
+        if transcription is None:
+            transcription = self._transcribe_word(word, previous, next,
+                                                  options)
+            if store is not None:
+                store.put(self.fingerprint(), key, transcription)
+        if cache is not None:
+            cache.put(key, transcription)
+        return transcription
+
+    def _transcribe_word(self, word, previous, next, options):
+        if options.alphabet not in IPA_NAMES:
+            return self._render_word(word, options)
+        if self._lexicon is not None:
+            transcription = self._lexicon.transcribe(
+                word, options.stress_mark, options.syllabic_separator)
+            if transcription is not None:
+                return transcription
         syllables = self.get_syllables(word)
         transcription = []
         syllables_len = len(syllables)
@@ -117,12 +471,23 @@ class BaseTranscriptor(object):
                 syllable,
                 previous=previous,
                 next=next,
-                alphabet=alphabet,
-                stress_mark=stress_mark
+                alphabet=options.alphabet,
+                stress_mark=options.stress_mark
             )
             transcription.append(transcribed_syllable)
         stress_index = self.find_stress(transcription)
         if stress_index != None:
             transcription[stress_index] = \
-                stress_mark + transcription[stress_index]
-        return self._syllabic_separator.join(transcription)
+                options.stress_mark + transcription[stress_index]
+        return options.syllabic_separator.join(transcription)
+
+    def _render_word(self, word, options):
+        """Transcribe `word` into the alphabet of `options` from its phones"""
+        translate = get_alphabet(options.alphabet).translate
+        syllables, stress_index = self.word_phones(word)
+        transcription = [u"".join(translate(phone) for phone in phones)
+                         for phones in syllables]
+        if stress_index is not None:
+            transcription[stress_index] = \
+                options.stress_mark + transcription[stress_index]
+        return options.syllabic_separator.join(transcription)
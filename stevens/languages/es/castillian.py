@@ -1,37 +1,321 @@
 # -*- coding: utf-8 -*-
+import io
+import os
 import re
+import threading
 
-from stevens.languages import BaseTranscriptor
+from stevens.alphabets import IPA_NAMES
+from stevens.exceptions import NotLanguageSupported
 from stevens.hyphenation import get_hyphenator
+from stevens.languages import BaseTranscriptor
+from stevens.languages.es.numbers import spell_number
+from stevens.languages.es.transducer import Transducer
+from stevens.languages.tables import SyllableTable, compile_syllable_table
+from stevens.rules import EDGE, Rule, compile_rules, letters
+from stevens.tokenizer import Tokenizer
+
+
+SYLLABLES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "syllables.txt"
+)
+
+NASALS = u"mnñ"
+LATERALS = u"l"
+VOWELS = u"aeiouáéíóú"
+FRONT_VOWELS = u"eiéí"
+CONSONANTS = u"bcdfghjklmnñpqrRstvwxyzʎʧ"
+VOICED = u"aeioubdglmnrRvw"
+VOICED_CONSONANTS = u"bdglmnrRv"
+LABIODENTALS = u"fv"
+CORONALS = u"dlrnstzʧ"
+PALATALS = u"yʎ"
+BILABIALS = u"bmp"
+VELARS = u"gjq"
+PAUSE = u"‖"
+
+# Letters after which voiced obstruents are stops rather than approximants
+AFTER_PAUSE = letters(EDGE, PAUSE, NASALS)
+AFTER_PAUSE_OR_LATERAL = letters(AFTER_PAUSE, LATERALS)
+
+# Letters are rewritten before the rules apply, e.g. "rr" into "R" and "ll"
+# into "ʎ", see `Transcriptor.remove_double_consonants`
+RULES = (
+    Rule(u"a", u"a"),
+    Rule(u"b", u"b", left=AFTER_PAUSE),
+    Rule(u"b", u"β"),
+    Rule(u"c", u"s", right=FRONT_VOWELS),
+    Rule(u"c", u"k"),
+    Rule(u"d", u"d", left=AFTER_PAUSE_OR_LATERAL),
+    Rule(u"d", u"ð"),
+    Rule(u"e", u"e"),
+    Rule(u"é", u"e"),
+    Rule(u"f", u"v", right=VOICED),
+    Rule(u"f", u"f"),
+    Rule(u"g", u"x", right=u"ie", priority=1),
+    Rule(u"g", u"ɡ", left=AFTER_PAUSE),
+    Rule(u"g", u"ɣ"),
+    Rule(u"h", u""),
+    Rule(u"i", u"j", right=u"eao"),
+    Rule(u"i", u"i"),
+    Rule(u"í", u"i"),
+    Rule(u"j", u"x"),  # this may vary, possibly need a uvular u"χ"
+    Rule(u"l", u"l"),  # this takes diacritics based on next
+    Rule(u"m", u"m"),
+    Rule(u"n", u"n", right=letters(EDGE, VOWELS)),
+    Rule(u"n", u"ɱ", right=LABIODENTALS),
+    Rule(u"n", u"n", right=CORONALS),
+    Rule(u"n", u"ɲ", right=PALATALS),
+    Rule(u"n", u"m", right=BILABIALS),
+    Rule(u"n", u"ŋ", right=VELARS),
+    Rule(u"n", u"ɴ"),
+    Rule(u"ñ", u"ɲ"),
+    Rule(u"o", u"o"),
+    Rule(u"ó", u"o"),
+    Rule(u"p", u"p"),
+    Rule(u"q", u"k"),
+    Rule(u"r", u"r", left=letters(EDGE, PAUSE, u"lns")),
+    Rule(u"r", u"ɾ"),
+    Rule(u"R", u"r"),
+    Rule(u"s", u"z", right=VOICED_CONSONANTS),
+    Rule(u"s", u"s"),
+    Rule(u"t", u"t"),
+    Rule(u"u", u"w", right=u"iea"),
+    Rule(u"u", u"u"),
+    Rule(u"ú", u"u"),
+    Rule(u"v", u"b", left=AFTER_PAUSE),
+    Rule(u"v", u"β"),
+    Rule(u"w", u"w"),
+    Rule(u"x", u"x", index=0),
+    Rule(u"x", u"ks"),  # need a better symbol here, maybe
+    Rule(u"y", u"i", left=EDGE, right=EDGE),
+    Rule(u"y", u"ʑ", left=AFTER_PAUSE_OR_LATERAL),  # maybe u"ʎ"
+    Rule(u"y", u"i", left=u"o"),
+    Rule(u"y", u"ʝ"),
+    Rule(u"z", u"z", right=VOICED_CONSONANTS),
+    Rule(u"z", u"s"),
+)
+
+# Overlays replace every rule of the letters they declare
+DISTINCION = (
+    Rule(u"c", u"θ", right=FRONT_VOWELS),
+    Rule(u"c", u"k"),
+    Rule(u"z", u"ð", right=VOICED_CONSONANTS),
+    Rule(u"z", u"θ"),
+)
+
+YEISMO = (
+    Rule(u"ʎ", u"ʑ", left=AFTER_PAUSE_OR_LATERAL),
+    Rule(u"ʎ", u"ʝ"),
+)
+
+SHEISMO = (
+    Rule(u"y", u"i", left=EDGE, right=EDGE),
+    Rule(u"y", u"i", left=u"o"),
+    Rule(u"y", u"ʃ"),
+    Rule(u"ʎ", u"ʃ"),
+)
+
+ASPIRATION = (
+    Rule(u"s", u"h", right=CONSONANTS),
+    Rule(u"s", u"s"),
+    Rule(u"z", u"h", right=CONSONANTS),
+    Rule(u"z", u"s"),
+)
+
+# Neutral Spanish has seseo and keeps "ll" apart from "y"
+DIALECTS = {
+    "es": (),
+    "es_AR": SHEISMO + ASPIRATION,
+    "es_ES": DISTINCION + YEISMO,
+    "es_MX": YEISMO,
+}
+
+_compiled_rules = {}
+_default_tables = {}
+_default_table_lock = threading.Lock()
+
+
+def dialect_rules(lang):
+    """
+    Return the compiled rules of a dialect, shared by every transcriptor
+
+    Dialects reuse the functions compiled for the neutral rules and only
+    compile the letters their overlay declares.
+
+    :param lang: one of the keys of `DIALECTS`
+    :return: dictionary mapping letters to rule functions
+    """
+    rules = _compiled_rules.get(lang)
+    if rules is None:
+        if lang not in DIALECTS:
+            raise NotLanguageSupported(lang)
+        if DIALECTS[lang]:
+            rules = dict(dialect_rules("es"))
+            rules.update(compile_rules(DIALECTS[lang]))
+        else:
+            rules = compile_rules(RULES)
+        rules = _compiled_rules.setdefault(lang, rules)
+    return rules
+
+
+def syllable_inventory(path=SYLLABLES_PATH):
+    """Return the list of syllables precompiled by default"""
+    syllables = set(u"aeiouáéíóú")
+    with io.open(path, encoding="utf-8") as syllables_file:
+        for line in syllables_file:
+            fields = line.split()
+            if fields:
+                syllables.add(fields[0])
+    return sorted(syllables)
+
+
+def _default_syllable_table(transcriptor):
+    # Only transcriptors of the same class with the same rules share a
+    # table, so subclasses with rules of their own never get it
+    key = (type(transcriptor), frozenset(transcriptor.rules.items()))
+    table = _default_tables.get(key)
+    if table is None:
+        with _default_table_lock:
+            table = _default_tables.get(key)
+            if table is None:
+                table = _default_tables[key] = compile_syllable_table(
+                    transcriptor, syllable_inventory())
+    return table
 
 
 class Transcriptor(BaseTranscriptor):
 
     def __init__(self, *args, **kwargs):
+        """
+        :param syllable_table: `SyllableTable` object or path to a saved one
+                               to resolve common syllables in one lookup,
+                               `True` to compile the bundled inventory on
+                               first use, `None` to always apply the rules,
+                               the default since the lookup saves little
+                               next to hyphenating
+        :param hyphenation: string with the name of the hyphenation backend
+                            used when no `hyphenator` is given, "rules" for
+                            the rule-based `Syllabifier`
+        :param engine: "rules" to transcribe syllable by syllable, "fst" to
+                       scan every phrase with the compiled `Transducer`
+        :param lexicon: see `BaseTranscriptor`
+        """
+        syllable_table = kwargs.pop("syllable_table", None)
+        hyphenation = kwargs.pop("hyphenation", "liang")
+        engine = kwargs.pop("engine", "rules")
+        if engine not in ("rules", "fst"):
+            raise ValueError("Unknown engine '{}'".format(engine))
         super(Transcriptor, self).__init__(*args, **kwargs)
+        self._engine = engine
+        self._transducer = None
+        self._vectorized = None
+        if isinstance(syllable_table, (str, type(u""))):
+            syllable_table = SyllableTable.load(syllable_table)
+        self._syllable_table = syllable_table
         if not self._hyphenator:
-            self._hyphenator = get_hyphenator("es_ES")
-        self._punctuation = re.compile(r"[ \.,\?\!¡¿\n\t]+")
+            self._hyphenator = get_hyphenator("es_ES", backend=hyphenation)
+        self._punctuation = re.compile(
+            u"[ \\.,;:\\?\\!¡¿…\\(\\)\\[\\]\\n\\t—–]+")
+        self._tokenizer = Tokenizer(self._punctuation, spell=spell_number)
         self._grave = re.compile(u'[aeiouns]')
         self._irregular = re.compile(u'[áéíóú]')
         self._double_consonants = {u'rr': u'R', u'll': u'ʎ', u'ch': u'ʧ',
                                    u'gu': u'g', u'qu': u'q'}
         self._double_consonants_set = set(self._double_consonants.keys())
-        self._nasals = u'mnñ'
-        self._laterals = u'l'
-        self._vowels = u'aeiouáéíóú'
-        self._voiced = u'aeioubdglmnrRvw'
-        self._voiced_consonants = u'bdglmnrRv'
-        self._labiodentals = u'fv'
-        self._coronals = u'dlrnstzʧ'
-        self._palatals = u'yʎ'
-        self._bilabials = u'bmp'
-        self._velars = u'gjq'
-        self._pause = u'‖'
+
+    def _get_syllable_table(self):
+        table = self._syllable_table
+        if table is True:
+            # Kept once resolved, so instrumenting the rules later does not
+            # compile another table from them
+            table = self._syllable_table = _default_syllable_table(self)
+        return table or None
+    syllable_table = property(fget=_get_syllable_table)
+
+    def instrument(self, stats=None, callback=None):
+        # Tables compiled from the rules are built before the rules are
+        # wrapped, so compiling them is neither counted nor timed
+        self.syllable_table
+        if self._engine == "fst":
+            self.transducer
+        return super(Transcriptor, self).instrument(stats, callback)
+
+    def _get_transducer(self):
+        if self._transducer is None:
+            with self._lock:
+                if self._transducer is None:
+                    self._transducer = Transducer(self, syllable_inventory())
+        return self._transducer
+    transducer = property(fget=_get_transducer)
+
+    def _get_vectorized(self):
+        if self._vectorized is None:
+            # Imported here to keep NumPy out of the import of this module
+            from stevens.languages.es.vectorized import VectorizedTranscriptor
+            with self._lock:
+                if self._vectorized is None:
+                    self._vectorized = VectorizedTranscriptor(self)
+        return self._vectorized
+    vectorized = property(fget=_get_vectorized)
+
+    def transcribe_words(self, words, stress_mark=None,
+                         syllabic_separator=None, options=None):
+        """
+        Transcribe a batch of words at once with NumPy
+
+        :param words: list of lowercase words, e.g. a vocabulary list
+        :param stress_mark: string to mark stressed syllables
+        :return: list with the same output as `transcribe_word` per word
+        """
+        options = self.options(options, syllabic_separator, None, None,
+                               stress_mark)
+        if options.alphabet not in IPA_NAMES:
+            return [self.transcribe_word(word, options=options)
+                    for word in words]
+        transcriptions = self.vectorized.transcribe_words(
+            words, options.stress_mark, options.syllabic_separator)
+        lexicon = self._lexicon
+        if lexicon is not None:
+            for index, word in enumerate(words):
+                transcription = lexicon.transcribe(
+                    word, options.stress_mark, options.syllabic_separator)
+                if transcription is not None:
+                    transcriptions[index] = transcription
+        return transcriptions
+
+    def _transcribe_word(self, word, previous, next, options):
+        # Words missing the table, cache and store of `transcribe_word` are
+        # scanned by the transducer, which only emits IPA
+        if self._engine == "fst" and options.alphabet in IPA_NAMES:
+            return self.transducer.transcribe_word(
+                word, options.stress_mark, options.syllabic_separator)
+        return super(Transcriptor, self)._transcribe_word(word, previous,
+                                                          next, options)
+
+    def word_phones(self, word):
+        if self._lexicon is not None and word in self._lexicon:
+            return super(Transcriptor, self).word_phones(word)
+        phones = self.transducer.word_phones(word)
+        return phones, self.find_stress([u"".join(syllable)
+                                         for syllable in phones])
 
     def transcribe_syllable(self, syllable, previous=None, next=None,
                             alphabet=None, stress_mark=None):
-        transcribed_syllable = unicode()
+        table = self.syllable_table
+        if table is not None:
+            transcribed_syllable = table.lookup(
+                previous[-1] if previous else None,
+                syllable,
+                next[0] if next else None
+            )
+            if transcribed_syllable is not None:
+                return transcribed_syllable
+        return self.transcribe_syllable_rules(syllable, previous, next,
+                                              alphabet, stress_mark)
+
+    def transcribe_syllable_rules(self, syllable, previous=None, next=None,
+                                  alphabet=None, stress_mark=None):
         if previous:
             cross_syllabic_previous = previous[-1]
         else:
@@ -42,41 +326,32 @@ class Transcriptor(BaseTranscriptor):
             cross_syllabic_next = None
         syllable = self.remove_double_consonants(syllable)
         syllable_length = len(syllable)
+        rules = self.rules
         if syllable_length == 1:
-            rule_func = self.rules.get(syllable[0],
-                                       lambda p, n, i: syllable[0])
+            rule_func = rules.get(syllable)
+            if rule_func is None:
+                return syllable
             return rule_func(
                 cross_syllabic_previous,
                 cross_syllabic_next, 0
             )
+        last_index = syllable_length - 1
+        transcribed_syllable = []
         for index, letter in enumerate(syllable):
-            previous, next = self.get_surroundings(
-                index,
-                letter,
-                syllable,
-                syllable_length
-            )
+            rule_func = rules.get(letter)
+            if rule_func is None:
+                transcribed_syllable.append(letter)
+                continue
             if index == 0:
-                rule_func = self.rules.get(letter, lambda p, n, i: syllable[0])
-                ipa_symbol = rule_func(
-                    cross_syllabic_previous,
-                    next,
-                    index
-                )
-                transcribed_syllable += ipa_symbol
-            elif index == len(syllable) - 1:
-                rule_func = self.rules.get(letter, lambda p, n, i: syllable[0])
-                ipa_symbol = rule_func(
-                    previous,
-                    cross_syllabic_next,
-                    index
-                )
-                transcribed_syllable += ipa_symbol
+                previous = cross_syllabic_previous
+            else:
+                previous = syllable[index - 1]
+            if index == last_index:
+                next = cross_syllabic_next
             else:
-                rule_func = self.rules.get(letter, lambda p, n, i: syllable[0])
-                ipa_symbol = rule_func(previous, next, index)
-                transcribed_syllable += ipa_symbol
-        return transcribed_syllable
+                next = syllable[index + 1]
+            transcribed_syllable.append(rule_func(previous, next, index))
+        return u"".join(transcribed_syllable)
 
     def remove_double_consonants(self, syllable):
         if len(syllable) == 1:
@@ -99,203 +374,5 @@ class Transcriptor(BaseTranscriptor):
                 return len(syllable_list) - 1
 
     def _transcription_rules(self):
-
-        @self.rule(u"a")
-        def transcribe_a(previous, next, index):
-            return u'a'
-
-        @self.rule(u"b")
-        def transcribe_b(previous, next, index):
-            if not previous or previous in self._nasals \
-                    or previous == self._pause:
-                return u'b'
-            else:
-                return u'β'
-
-        @self.rule(u"c")
-        def transcribe_c(previous, next, index):
-            if next in [u'i', u'o']:
-                return u's'  # or u'θ'
-            else:
-                return u'k'
-
-        @self.rule(u"ch")
-        def transcribe_ch(previous, next, index):
-            return u'ʧ'
-
-        @self.rule(u"d")
-        def transcribe_d(previous, next, index):
-            if not previous or previous in self._nasals \
-                    or previous in self._laterals or previous == self._pause:
-                return u'd'
-            else:
-                return u'ð'
-
-        @self.rule(u"e")
-        def transcribe_e(previous, next, index):
-            return u'e'
-
-        @self.rule(u"é")
-        def transcribe_stressed_e(previous, next, index):
-            return u'e'
-
-        @self.rule(u"f")
-        def transcribe_f(previous, next, index):
-            if next in self._voiced:
-                return u'v'
-            else:
-                return u'f'
-
-        @self.rule(u"g")
-        def transcribe_g(previous, next, index):
-            if next in [u'i', u'e']:
-                return u'x'
-            elif (not previous or previous in self._nasals
-                    or previous == self._pause):
-                return u'ɡ'
-            else:
-                return u'ɣ'
-
-        @self.rule(u"h")
-        def transcribe_h(previous, next, index):
-            return ''
-
-        @self.rule(u"i")
-        def transcribe_i(previous, next, index):
-            if next in [u'e', u'a', u'o']:
-                return u'j'
-            else:
-                return u'i'
-
-        @self.rule(u"í")
-        def transcribe_stressed_i(previous, next, index):
-            return u'i'
-
-        @self.rule(u"j")
-        def transcribe_j(previous, next, index):
-            return u'x'  # this may vary based on prev, next,
-                         # possibly need a uvular u'χ'
-
-        @self.rule(u"l")
-        def transcribe_l(previous, next, index):
-            return u'l'  # this takes diacritics based on next
-
-        @self.rule(u"ll")
-        def transcribe_ll(previous, next, index):
-            if not previous or previous in self._nasals \
-                    or previous in self._laterals or previous == self._pause:
-                return u'ʑ'  # maybe u'ʎ'
-            else:
-                return u'ʝ'
-
-        @self.rule(u"m")
-        def transcribe_m(previous, next, index):
-            return u'm'
-
-        @self.rule(u"n")
-        def transcribe_n(previous, next, index):
-            if not next or next in self._vowels:
-                return u'n'
-            elif next in self._labiodentals:
-                return u'ɱ'
-            elif next in self._coronals:
-                return u'n'
-            elif next in self._palatals:
-                return u'ɲ'
-            elif next in self._bilabials:
-                return u'm'
-            elif next in self._velars:
-                return u'ŋ'
-            else:
-                return u'ɴ'
-
-        @self.rule(u"ñ")
-        def transcribe_enye(previous, next, index):
-            return u'ɲ'
-
-        @self.rule(u"o")
-        def transcribe_o(previous, next, index):
-            return u'o'
-
-        @self.rule(u"ó")
-        def transcribe_stressed_o(previous, next, index):
-            return u'o'
-
-        @self.rule(u"p")
-        def transcribe_p(previous, next, index):
-            return u'p'
-
-        @self.rule(u"q")
-        def transcribe_q(previous, next, index):
-            return u'k'
-
-        @self.rule(u"r")
-        def transcribe_r(previous, next, index):
-            if not previous or previous in [self._pause, u'l', u'n', u's']:
-                return u'r'  # make an attribute maybe
-            else:
-                return u'ɾ'
-
-        @self.rule(u"R")
-        def transcribe_trill(previous, next, index):
-            return u'r'
-
-        @self.rule(u"s")
-        def transcribe_s(previous, next, index):
-            if next in self._voiced_consonants:
-                return u'z'
-            else:
-                return u's'
-
-        @self.rule(u"t")
-        def transcribe_t(previous, next, index):
-            return u't'
-
-        @self.rule(u"u")
-        def transcribe_u(previous, next, index):
-            if next in [u'i', u'e', u'a']:  # att?
-                return u'w'
-            else:
-                return u'u'
-
-        @self.rule(u"ú")
-        def transcribe_stressed_u(previous, next, index):
-            return u'u'
-
-        @self.rule(u"v")
-        def transcribe_v(previous, next, index):
-            if not previous or previous in self._nasals \
-                    or previous == self._pause:
-                return u'b'
-            else:
-                return u'β'
-
-        @self.rule(u"w")
-        def transcribe_w(previous, next, index):
-            return u'w'
-
-        @self.rule(u"x")
-        def transcribe_x(previous, next, index):
-            if index == 0:
-                return u'x'
-            else:
-                return u'ks'  # need a better sembol here...maybe
-
-        @self.rule(u"y")
-        def transcribe_y(previous, next, index):
-            if previous is None and next is None:
-                return u'i'
-            elif not previous or previous in self._nasals \
-                    or previous in self._laterals or previous == self._pause:
-                return u'ʑ'  # maybe u'ʎ'
-            elif previous == u'o':
-                return u'i'
-            else:
-                return u'ʝ'
-
-        @self.rule(u"z")
-        def transcribe_z(previous, next, index):
-            if next in self._voiced_consonants:
-                return u'z'
-            else:
-                return u's'
+        for chunk, function in dialect_rules(self._lang).items():
+            self.rule(chunk)(function)
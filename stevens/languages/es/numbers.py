@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Spelling of numbers written with digits as Spanish cardinals
+"""
+
+UNITS = (u"cero uno dos tres cuatro cinco seis siete ocho nueve diez once "
+         u"doce trece catorce quince dieciséis diecisiete dieciocho "
+         u"diecinueve veinte veintiuno veintidós veintitrés veinticuatro "
+         u"veinticinco veintiséis veintisiete veintiocho veintinueve").split()
+
+TENS = (u"_ _ _ treinta cuarenta cincuenta sesenta setenta ochenta "
+        u"noventa").split()
+
+HUNDREDS = (u"_ ciento doscientos trescientos cuatrocientos quinientos "
+            u"seiscientos setecientos ochocientos novecientos").split()
+
+# Numbers up to a billion are spelled as cardinals, longer ones digit by
+# digit, like phone numbers or codes
+MAX_DIGITS = 12
+
+
+def _below_thousand(number):
+    words = []
+    hundreds, rest = divmod(number, 100)
+    if hundreds:
+        words.append(u"cien" if number == 100 else HUNDREDS[hundreds])
+    if rest >= 30:
+        tens, units = divmod(rest, 10)
+        words.append(TENS[tens])
+        if units:
+            words.extend([u"y", UNITS[units]])
+    elif rest:
+        words.append(UNITS[rest])
+    return words
+
+
+def _apocopate(words):
+    # "uno" drops its last vowel before a noun: "veintiún mil", "un millón"
+    if words[-1] == u"uno":
+        words[-1] = u"un"
+    elif words[-1] == u"veintiuno":
+        words[-1] = u"veintiún"
+    return words
+
+
+def _below_million(number):
+    thousands, rest = divmod(number, 1000)
+    words = []
+    if thousands == 1:
+        words.append(u"mil")
+    elif thousands:
+        words.extend(_apocopate(_below_thousand(thousands)))
+        words.append(u"mil")
+    words.extend(_below_thousand(rest))
+    return words
+
+
+def spell_number(digits):
+    """
+    Return the list of words of a number written with digits
+
+    :param digits: string of ASCII or any other decimal digits
+    :return: list of lowercase words
+    """
+    if len(digits) > MAX_DIGITS or (len(digits) > 1 and
+                                    digits.startswith(u"0")):
+        return [UNITS[int(digit)] for digit in digits]
+    number = int(digits)
+    if not number:
+        return [UNITS[0]]
+    millions, rest = divmod(number, 1000000)
+    words = []
+    if millions == 1:
+        words.extend([u"un", u"millón"])
+    elif millions:
+        words.extend(_apocopate(_below_million(millions)))
+        words.append(u"millones")
+    words.extend(_below_million(rest))
+    return words
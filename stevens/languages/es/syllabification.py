@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Rule-based Spanish syllabification
+
+Words are split into onset, nucleus and coda following the phonological
+rules of Spanish instead of typesetting hyphenation dictionaries.
+"""
+
+
+STRONG_VOWELS = frozenset(u"aeoáéó")
+STRESSED_WEAK_VOWELS = frozenset(u"íú")
+WEAK_VOWELS = frozenset(u"iuü")
+VOWELS = STRONG_VOWELS | STRESSED_WEAK_VOWELS | WEAK_VOWELS
+DIGRAPHS = frozenset([u"ch", u"ll", u"rr"])
+ONSETS = frozenset([u"pr", u"br", u"tr", u"dr", u"cr", u"kr", u"gr", u"fr",
+                    u"pl", u"bl", u"cl", u"kl", u"gl", u"fl"])
+
+
+class Syllabifier(object):
+    """Syllabifier usable wherever a hyphenator is expected"""
+
+    def __init__(self, onsets=ONSETS):
+        """
+        :param onsets: set of two-consonant clusters that begin a syllable,
+                       add u"tl" for the American division of "a-tle-ta"
+        """
+        self._onsets = frozenset(onsets)
+
+    def fingerprint(self):
+        """Return a digest of the onsets of the syllabifier"""
+        return u" ".join(sorted(self._onsets))
+
+    def is_vowel(self, word, index):
+        letter = word[index]
+        if letter == u"y":
+            # "y" is a vowel unless it starts a syllable before a vowel
+            return index + 1 >= len(word) or word[index + 1] not in VOWELS
+        return letter in VOWELS
+
+    def get_units(self, word):
+        """Return a list of (letters, is_vowel) with digraphs kept together"""
+        units = []
+        index = 0
+        length = len(word)
+        while index < length:
+            if word[index:index + 2] in DIGRAPHS:
+                units.append((word[index:index + 2], False))
+                index += 2
+            else:
+                units.append((word[index], self.is_vowel(word, index)))
+                index += 1
+        return units
+
+    def is_hiatus(self, previous, letter):
+        if previous in STRESSED_WEAK_VOWELS or letter in STRESSED_WEAK_VOWELS:
+            return True
+        if previous in STRONG_VOWELS and letter in STRONG_VOWELS:
+            return True
+        return previous == letter and previous in WEAK_VOWELS
+
+    def get_nuclei(self, units):
+        """Group the vowels of `units` into (start, end) nucleus spans"""
+        nuclei = []
+        start = None
+        for index, (letters, is_vowel) in enumerate(units):
+            if not is_vowel:
+                if start is not None:
+                    nuclei.append((start, index))
+                    start = None
+            elif start is None:
+                start = index
+            elif self.is_hiatus(units[index - 1][0], letters):
+                nuclei.append((start, index))
+                start = index
+        if start is not None:
+            nuclei.append((start, len(units)))
+        return nuclei
+
+    def split_consonants(self, consonants):
+        """Return how many of the `consonants` between nuclei are a coda"""
+        length = len(consonants)
+        if length < 2:
+            return 0
+        if consonants[-2] + consonants[-1] in self._onsets:
+            return length - 2
+        return length - 1
+
+    def syllables(self, word):
+        if not word:
+            return []
+        units = self.get_units(word)
+        nuclei = self.get_nuclei(units)
+        if len(nuclei) < 2:
+            return [word]
+        boundaries = []
+        for (_, end), (start, _) in zip(nuclei, nuclei[1:]):
+            consonants = [letters for letters, _ in units[end:start]]
+            boundaries.append(end + self.split_consonants(consonants))
+        syllables = []
+        begin = 0
+        for boundary in boundaries:
+            syllables.append(u"".join(letters for letters, _
+                                      in units[begin:boundary]))
+            begin = boundary
+        syllables.append(u"".join(letters for letters, _ in units[begin:]))
+        return syllables
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Table-driven transducer running the castillian letter rules in one scan
+"""
+from stevens.hyphenation import LiangHyphenator
+from stevens.languages.tables import edge_classes
+
+
+class Transducer(object):
+    """Context-dependent rewrite transducer compiled from letter rules
+
+    Every rule registered with `BaseTranscriptor.rule` is a function of the
+    letter, its previous and next characters and its index in the syllable.
+    Outputs are compiled into a table keyed by (letter, previous class, next
+    class, index), so scanning the letters of a phrase emits every phone
+    with a single lookup. Characters outside the compiled classes are keyed
+    by themselves and their output is computed on first sight.
+
+    Words are split into syllables by the same pass when the transcriptor
+    hyphenates with Liang patterns, which are compiled into a dictionary
+    instead of being looked up in the packed trie of the hyphenator.
+    """
+
+    def __init__(self, transcriptor, syllables=(), indexes=(0, 1, 2)):
+        """
+        :param transcriptor: `castillian.Transcriptor` whose rules are compiled
+        :param syllables: iterable of syllables whose letters are compiled
+                          ahead of time
+        :param indexes: letter indexes in the syllable compiled ahead of time
+        """
+        self._transcriptor = transcriptor
+        self._rules = transcriptor.rules
+        self._previous_classes, self._next_classes = edge_classes(
+            transcriptor, syllables)
+        self._table = {}
+        self._patterns = None
+        hyphenator = transcriptor.hyphenator
+        if isinstance(hyphenator, LiangHyphenator):
+            self._compile_patterns(hyphenator)
+        letters = set(symbol for symbol in self._previous_classes if symbol)
+        for letter in letters:
+            for previous in set(self._previous_classes.values()):
+                for next in set(self._next_classes.values()):
+                    for index in indexes:
+                        self._compile(letter, previous, next, index)
+
+    def __len__(self):
+        return len(self._table)
+
+    def _compile_patterns(self, hyphenator):
+        # Prefixes of the patterns map to no points, so a scan stops as soon
+        # as no pattern can match
+        patterns = {}
+        for letters, points in hyphenator.patterns.items():
+            for end in range(1, len(letters)):
+                patterns.setdefault(letters[:end], ())
+            patterns[letters] = tuple(int(point) for point in points)
+        self._patterns = patterns
+        self._left_min = hyphenator.left_min
+        self._right_min = hyphenator.right_min
+
+    def _get_patterns(self):
+        return self._patterns
+    patterns = property(fget=_get_patterns)
+
+    def _get_left_min(self):
+        return self._left_min
+    left_min = property(fget=_get_left_min)
+
+    def _get_right_min(self):
+        return self._right_min
+    right_min = property(fget=_get_right_min)
+
+    def syllables(self, word):
+        """Return the syllables of `word`, like the hyphenator of the
+        transcriptor"""
+        patterns = self._patterns
+        if patterns is None:
+            return self._transcriptor.get_syllables(word)
+        if not word:
+            return []
+        dotted = u"." + word + u"."
+        length = len(dotted)
+        points = [0] * (length + 1)
+        for start in range(length):
+            for end in range(start + 1, length + 1):
+                values = patterns.get(dotted[start:end])
+                if values is None:
+                    break
+                for offset, value in enumerate(values):
+                    if value > points[start + offset]:
+                        points[start + offset] = value
+        syllables = []
+        begin = 0
+        for index in range(self._left_min, len(word) - self._right_min + 1):
+            if points[index + 1] % 2:
+                syllables.append(word[begin:index])
+                begin = index
+        syllables.append(word[begin:])
+        return syllables
+
+    def _compile(self, letter, previous, next, index):
+        rule = self._rules.get(letter)
+        if rule is None:
+            phone = letter
+        else:
+            phone = rule(previous, next, index)
+        key = (letter, self._previous_classes.get(previous, previous),
+               self._next_classes.get(next, next), index)
+        self._table[key] = phone
+        return phone
+
+    def _get_previous_classes(self):
+        return self._previous_classes
+    previous_classes = property(fget=_get_previous_classes)
+
+    def _get_next_classes(self):
+        return self._next_classes
+    next_classes = property(fget=_get_next_classes)
+
+    def phone(self, letter, previous, next, index):
+        """Return the output of `letter` between `previous` and `next`"""
+        phone = self._table.get((letter,
+                                 self._previous_classes.get(previous,
+                                                            previous),
+                                 self._next_classes.get(next, next), index))
+        if phone is None:
+            phone = self._compile(letter, previous, next, index)
+        return phone
+
+    def word_phones(self, word):
+        """Return the list of phones of every syllable of `word`"""
+        transcriptor = self._transcriptor
+        table = self._table
+        previous_classes = self._previous_classes
+        next_classes = self._next_classes
+        syllables = self.syllables(word)
+        count = len(syllables)
+        transcription = []
+        edge = None
+        for position, syllable in enumerate(syllables):
+            if position + 1 < count and syllables[position + 1]:
+                next_edge = syllables[position + 1][0]
+            else:
+                next_edge = None
+            letters = transcriptor.remove_double_consonants(syllable)
+            last = len(letters) - 1
+            phones = []
+            previous = edge
+            for index, letter in enumerate(letters):
+                if index < last:
+                    next = letters[index + 1]
+                else:
+                    next = next_edge
+                phone = table.get((letter,
+                                   previous_classes.get(previous, previous),
+                                   next_classes.get(next, next), index))
+                if phone is None:
+                    phone = self._compile(letter, previous, next, index)
+                phones.append(phone)
+                previous = letter
+            transcription.append(phones)
+            edge = syllable[-1] if syllable else None
+        return transcription
+
+    def transcribe_word(self, word, stress_mark, syllabic_separator):
+        transcriptor = self._transcriptor
+        if transcriptor.lexicon is not None:
+            transcription = transcriptor.lexicon.transcribe(
+                word, stress_mark, syllabic_separator)
+            if transcription is not None:
+                return transcription
+        transcription = [u"".join(phones)
+                         for phones in self.word_phones(word)]
+        stress_index = transcriptor.find_stress(transcription)
+        if stress_index is not None:
+            transcription[stress_index] = \
+                stress_mark + transcription[stress_index]
+        return syllabic_separator.join(transcription)
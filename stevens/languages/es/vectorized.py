@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Batched castillian transcription of word lists with NumPy
+
+Words are split into syllables all at once: the Liang patterns compiled by
+the `Transducer` are looked up for every window of the text of the batch
+with a binary search over their packed code points.
+
+Letters of every syllable in a batch are encoded as integer code points in
+one flat array. Neighbours come from shifting that array and, at syllable
+edges, from the edge letters of the surrounding syllables. The compiled
+`Transducer` table, densified into an array indexed by (letter, previous
+class, next class, index), then maps every letter to its phone at once.
+
+The table grows with the symbols of every batch. Growth happens under a
+lock and replaces the table and the phone array with new ones, so batches
+transcribed by other threads keep reading the ones they were given.
+"""
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+
+NONE_CODE = 0
+
+# Bits of a code point, patterns of up to three letters fit in 64 bits
+CODE_BITS = 21
+MAX_PATTERN_LENGTH = 3
+
+# Characters ending words and marking syllable breaks in a batch
+WORD_END = u"\0"
+BREAK = u"\1"
+
+
+def _encode(text):
+    return numpy.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+
+def _decode(codes):
+    return codes.astype("<u4").tobytes().decode("utf-32-le")
+
+
+def _pattern_key(letters):
+    return sum(ord(letter) << (CODE_BITS * offset)
+               for offset, letter in enumerate(letters))
+
+
+class VectorizedTranscriptor(object):
+    """Transcribe lists of words with the rules of a castillian transcriptor"""
+
+    def __init__(self, transcriptor):
+        """
+        :param transcriptor: `castillian.Transcriptor` object whose rules,
+                             hyphenator and stress rules are used
+        """
+        if numpy is None:
+            raise ImportError("Please, install numpy")
+        self._transcriptor = transcriptor
+        self._transducer = transcriptor.transducer
+        self._letters = {}
+        self._previous = {}
+        self._next = {}
+        self._phones = []
+        self._phone_ids = {}
+        self._table = numpy.zeros((0, 0, 0, 0), dtype=numpy.int32)
+        self._phone_array = numpy.array([], dtype=object)
+        self._lock = threading.Lock()
+        self._patterns = self._compile_patterns()
+
+    def _compile_patterns(self):
+        """Return the sorted keys and the points of the hyphenation
+        patterns of every length, `None` if they can not be batched"""
+        patterns = self._transducer.patterns
+        if patterns is None:
+            return None
+        lengths = {}
+        for letters, points in patterns.items():
+            if points:
+                lengths.setdefault(len(letters), []).append(
+                    (_pattern_key(letters), points))
+        if not lengths or max(lengths) > MAX_PATTERN_LENGTH:
+            return None
+        compiled = []
+        for length, items in sorted(lengths.items()):
+            items.sort()
+            compiled.append((
+                length,
+                numpy.array([key for key, _ in items], dtype=numpy.int64),
+                numpy.array([points for _, points in items],
+                            dtype=numpy.int64)))
+        return compiled
+
+    def syllables(self, words):
+        """Return the syllables of every word in `words`, like the
+        hyphenator of the transcriptor"""
+        text = u"".join(u"." + word + u"." + WORD_END for word in words)
+        if self._patterns is None or BREAK in text or \
+                text.count(WORD_END) != len(words):
+            return [self._transducer.syllables(word) for word in words]
+        if not words:
+            return []
+        codes = _encode(text).astype(numpy.int64)
+        size = len(codes)
+        points = numpy.zeros(size, dtype=numpy.int64)
+        for length, keys, values in self._patterns:
+            count = size - length + 1
+            windows = codes[:count].copy()
+            for offset in range(1, length):
+                windows += codes[offset:offset + count] << (CODE_BITS *
+                                                            offset)
+            found = numpy.minimum(numpy.searchsorted(keys, windows),
+                                  len(keys) - 1)
+            matches = numpy.nonzero(keys[found] == windows)[0]
+            found = found[matches]
+            # Matches are distinct, so no position is updated twice at once
+            for offset in range(length + 1):
+                positions = matches + offset
+                inside = positions < size
+                positions = positions[inside]
+                points[positions] = numpy.maximum(
+                    points[positions], values[found[inside], offset])
+        # Every word takes its letters between two dots and an end mark
+        lengths = numpy.array([len(word) for word in words],
+                              dtype=numpy.int64)
+        blocks = lengths + 3
+        relative = numpy.arange(size) - numpy.repeat(
+            numpy.cumsum(blocks) - blocks, blocks)
+        word_lengths = numpy.repeat(lengths, blocks)
+        letters = (relative > 0) & (relative <= word_lengths)
+        keep = letters | (relative == word_lengths + 2)
+        breaks = (letters & (points % 2 == 1) &
+                  (relative - 1 >= self._transducer.left_min) &
+                  (relative - 1 <= word_lengths -
+                   self._transducer.right_min))
+        kept = codes[keep]
+        positions = (numpy.cumsum(keep) - 1)[breaks]
+        text = _decode(numpy.insert(kept, positions, ord(BREAK)))
+        return [word.split(BREAK) if word else []
+                for word in text.split(WORD_END)[:-1]]
+
+    def _ids(self, ids, symbols):
+        for symbol in symbols:
+            if symbol not in ids:
+                ids[symbol] = len(ids)
+        return ids
+
+    def _phone_id(self, phone):
+        phone_id = self._phone_ids.get(phone)
+        if phone_id is None:
+            phone_id = self._phone_ids[phone] = len(self._phones)
+            self._phones.append(phone)
+        return phone_id
+
+    def _lookup(self, codes, ids, classes=None):
+        """Map every code point in `codes` to the id of its symbol or class"""
+        unique, inverse = numpy.unique(codes, return_inverse=True)
+        symbols = [None if code == NONE_CODE else unichr(code)
+                   for code in unique.tolist()]
+        if classes is not None:
+            symbols = [classes.get(symbol, symbol) for symbol in symbols]
+        self._ids(ids, symbols)
+        mapping = numpy.array([ids[symbol] for symbol in symbols],
+                              dtype=numpy.int32)
+        return mapping[inverse.reshape(-1)]
+
+    def _fill(self, indexes):
+        """Grow the dense table to cover every known symbol and index, with
+        the lock held"""
+        shape = (len(self._letters), len(self._previous), len(self._next),
+                 max(indexes, self._table.shape[3]))
+        if shape == self._table.shape:
+            return
+        table = numpy.zeros(shape, dtype=numpy.int32)
+        old = self._table.shape
+        table[:old[0], :old[1], :old[2], :old[3]] = self._table
+        phone = self._transducer.phone
+        for letter, letter_id in self._letters.items():
+            for previous, previous_id in self._previous.items():
+                known = letter_id < old[0] and previous_id < old[1]
+                for next, next_id in self._next.items():
+                    # Only the indexes missing from the old table are new
+                    start = old[3] if known and next_id < old[2] else 0
+                    for index in range(start, shape[3]):
+                        table[letter_id, previous_id, next_id, index] = \
+                            self._phone_id(phone(letter, previous, next,
+                                                 index))
+        self._phone_array = numpy.array(self._phones, dtype=object)
+        self._table = table
+
+    def transcribe_syllables(self, syllable_lists):
+        """
+        Return the transcribed syllables of every list in `syllable_lists`
+
+        :param syllable_lists: list of lists of syllables, one per word
+        :return: list of lists of transcribed syllables without stress
+        """
+        remove_double_consonants = \
+            self._transcriptor.remove_double_consonants
+        syllables = [syllable for word in syllable_lists
+                     for syllable in word]
+        if not syllables:
+            return [[] for _ in syllable_lists]
+        letters = [remove_double_consonants(syllable)
+                   for syllable in syllables]
+        lengths = numpy.array([len(normalized) for normalized in letters],
+                              dtype=numpy.int64)
+        codes = _encode(u"".join(letters)).astype(numpy.int64)
+        if not len(codes):
+            return [[u"" for _ in word] for word in syllable_lists]
+        # Edge letters of the neighbouring syllables of the same word
+        counts = numpy.array([len(word) for word in syllable_lists],
+                             dtype=numpy.int64)
+        word_ends = numpy.cumsum(counts)
+        word_first = numpy.zeros(len(syllables), dtype=bool)
+        word_first[(word_ends - counts)[counts > 0]] = True
+        word_last = numpy.zeros(len(syllables), dtype=bool)
+        word_last[word_ends[counts > 0] - 1] = True
+        heads = _encode(u"".join(syllable[:1] or u"\0"
+                                 for syllable in syllables)).astype(
+            numpy.int64)
+        tails = _encode(u"".join(syllable[-1:] or u"\0"
+                                 for syllable in syllables)).astype(
+            numpy.int64)
+        edges_before = numpy.where(word_first, NONE_CODE,
+                                   numpy.roll(tails, 1))
+        edges_after = numpy.where(word_last, NONE_CODE,
+                                  numpy.roll(heads, -1))
+        starts = numpy.cumsum(lengths) - lengths
+        index = numpy.arange(len(codes)) - numpy.repeat(starts, lengths)
+        first = index == 0
+        last = index == numpy.repeat(lengths, lengths) - 1
+        previous = numpy.where(first, numpy.repeat(edges_before, lengths),
+                               numpy.roll(codes, 1))
+        next = numpy.where(last, numpy.repeat(edges_after, lengths),
+                           numpy.roll(codes, -1))
+        with self._lock:
+            letter_ids = self._lookup(codes, self._letters)
+            previous_ids = self._lookup(previous, self._previous,
+                                        self._transducer.previous_classes)
+            next_ids = self._lookup(next, self._next,
+                                    self._transducer.next_classes)
+            self._fill(int(index.max()) + 1)
+            table = self._table
+            phone_array = self._phone_array
+        phones = phone_array[table[letter_ids, previous_ids, next_ids, index]]
+        # Phones are concatenated syllable by syllable in a single call
+        transcribed = numpy.empty(len(syllables), dtype=object)
+        transcribed[:] = u""
+        filled = lengths > 0
+        transcribed[filled] = numpy.add.reduceat(phones, starts[filled])
+        transcribed = transcribed.tolist()
+        return [transcribed[end - count:end]
+                for count, end in zip(counts.tolist(), word_ends.tolist())]
+
+    def transcribe_words(self, words, stress_mark, syllabic_separator):
+        """
+        Return the transcription of every word in `words`, as
+        `Transcriptor.transcribe_word` would
+        """
+        transcriptor = self._transcriptor
+        syllable_lists = self.syllables(words)
+        results = []
+        for transcription in self.transcribe_syllables(syllable_lists):
+            stress_index = transcriptor.find_stress(transcription)
+            if stress_index is not None:
+                transcription[stress_index] = \
+                    stress_mark + transcription[stress_index]
+            results.append(syllabic_separator.join(transcription))
+        return results
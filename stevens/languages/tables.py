@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+
+TABLE_VERSION = 1
+
+
+class SyllableTable(object):
+    """Precompiled transcriptions keyed by (previous, syllable, next)
+
+    `previous` and `next` are the edge characters of the surrounding
+    syllables. Edge characters that every rule treats alike share a single
+    representative, so the table only holds one entry per class.
+    """
+
+    def __init__(self, entries, previous_classes, next_classes):
+        """
+        :param entries: dictionary mapping (previous, syllable, next) to the
+                        transcription of the syllable
+        :param previous_classes: dictionary mapping edge characters found
+                                 before a syllable to their representative
+        :param next_classes: dictionary mapping edge characters found after
+                             a syllable to their representative
+        """
+        self._entries = entries
+        self._previous_classes = previous_classes
+        self._next_classes = next_classes
+
+    def lookup(self, previous, syllable, next):
+        """Return the transcription of `syllable` or `None` if not compiled"""
+        classes = self._previous_classes
+        if previous not in classes:
+            return None
+        previous = classes[previous]
+        classes = self._next_classes
+        if next not in classes:
+            return None
+        return self._entries.get((previous, syllable, classes[next]))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def to_dict(self):
+        return {
+            "version": TABLE_VERSION,
+            "previous": sorted(self._previous_classes.items(),
+                               key=_sort_key),
+            "next": sorted(self._next_classes.items(), key=_sort_key),
+            "entries": sorted([[key[0], key[1], key[2], value]
+                               for key, value in self._entries.items()],
+                              key=_sort_key),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != TABLE_VERSION:
+            raise ValueError("Unsupported syllable table version {}".format(
+                data.get("version")))
+        entries = dict(((previous, syllable, next), value)
+                       for previous, syllable, next, value in data["entries"])
+        return cls(entries, dict(data["previous"]), dict(data["next"]))
+
+    def save(self, path):
+        with io.open(path, "wb") as table_file:
+            table_file.write(json.dumps(self.to_dict()).encode("ascii"))
+
+    @classmethod
+    def load(cls, path):
+        with io.open(path, "rb") as table_file:
+            data = json.loads(table_file.read().decode("ascii"))
+        return cls.from_dict(data)
+
+
+def _sort_key(item):
+    return tuple(u"" if value is None else value for value in item)
+
+
+def _classify(symbols, signature):
+    representatives = {}
+    classes = {}
+    for symbol in symbols:
+        classes[symbol] = representatives.setdefault(signature(symbol),
+                                                     symbol)
+    return classes
+
+
+def edge_classes(transcriptor, syllables):
+    """
+    Return dictionaries mapping the characters seen before and after a letter
+    to the representative of the characters every rule treats alike
+
+    :param transcriptor: `Transcriptor` object whose rules are compared
+    :param syllables: iterable of syllables whose letters are considered
+    :return: tuple with the previous and next dictionaries
+    """
+    symbols = set(symbol for symbol in transcriptor.rules if len(symbol) == 1)
+    for syllable in syllables:
+        symbols.update(syllable)
+        symbols.update(transcriptor.remove_double_consonants(syllable))
+    symbols = [None] + sorted(symbols)
+    rules = [rule for _, rule in sorted(transcriptor.rules.items())]
+
+    def previous_signature(symbol):
+        return tuple(rule(symbol, next, 0)
+                     for rule in rules for next in symbols)
+
+    def next_signature(symbol):
+        return tuple(rule(previous, symbol, index)
+                     for rule in rules for previous in symbols
+                     for index in (0, 1, 2))
+
+    return (_classify(symbols, previous_signature),
+            _classify(symbols, next_signature))
+
+
+def compile_syllable_table(transcriptor, syllables):
+    """
+    Return a `SyllableTable` with the transcriptions of `syllables`
+
+    Every entry is produced by `transcriptor.transcribe_syllable_rules`, so
+    table lookups always agree with the rule-by-rule path.
+
+    :param transcriptor: `Transcriptor` object whose rules are compiled
+    :param syllables: iterable of syllables in the inventory
+    :return: a `SyllableTable` object
+    """
+    syllables = sorted(set(syllables))
+    previous_classes, next_classes = edge_classes(transcriptor, syllables)
+    entries = {}
+    for previous in set(previous_classes.values()):
+        for next in set(next_classes.values()):
+            for syllable in syllables:
+                entries[(previous, syllable, next)] = \
+                    transcriptor.transcribe_syllable_rules(
+                        syllable, previous=previous, next=next)
+    return SyllableTable(entries, previous_classes, next_classes)
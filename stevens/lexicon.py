@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Pronunciation lexicons looked up before the letter rules
+
+A lexicon maps words to their pronunciation, either because the letter
+rules get them wrong, like loanwords, acronyms and some proper nouns, or to
+skip the rules for the most frequent words. Pronunciations are written with
+"." between syllables and "'" before the stressed one, and rendered with
+the separators of every call.
+
+Lexicon files are plain text with a word and its pronunciation per line,
+separated by whitespace, and "#" comments. They can be compiled into a
+packed trie, which is memory-mapped when loaded, so lookups cost one step
+per letter of the word and nothing is read into memory however many
+entries the lexicon holds.
+"""
+import io
+import os
+
+from stevens.cache import LRUCache
+from stevens.packed import MAGIC, PackedTrie, pack_trie, save_trie
+
+
+LEXICONS_PATH = os.path.join(os.path.dirname(__file__), "lexicons")
+
+# Bundled lexicons by dialect. Pronunciations depend on the dialect, so a
+# dialect is never given the lexicon of another one, unless they pronounce
+# every entry alike
+BUNDLED_LEXICONS = {
+    "es": "es",
+    "es_ES": "es_ES",
+    "es_MX": "es",
+    "es_AR": "es_AR",
+}
+
+SYLLABIC_SEPARATOR = u"."
+STRESS_MARK = u"'"
+
+_lexicons = LRUCache(maxsize=8)
+
+
+def read_lexicon(path, encoding="utf-8"):
+    """Yield the (word, pronunciation) pairs of a lexicon text file"""
+    with io.open(path, encoding=encoding) as lexicon_file:
+        for line in lexicon_file:
+            fields = line.split(u"#", 1)[0].split()
+            if len(fields) == 2:
+                yield fields[0].lower(), fields[1]
+            elif fields:
+                raise ValueError("Malformed lexicon line: {!r}".format(line))
+
+
+def lexicon_entries(sources=(), transcriptor=None, words=()):
+    """
+    Yield the entries of a lexicon, with the frequent `words` transcribed by
+    `transcriptor` and then the entries of `sources`
+
+    Later entries of a word replace earlier ones, so the pronunciations of
+    `sources` win over the rules.
+
+    :param sources: iterable of iterables of (word, pronunciation) pairs,
+                    e.g. read by `read_lexicon`
+    :param transcriptor: `BaseTranscriptor` object
+    :param words: iterable of frequent lowercase words
+    """
+    if transcriptor is not None:
+        for word in words:
+            yield word, transcriptor.transcribe_word(
+                word, stress_mark=STRESS_MARK,
+                syllabic_separator=SYLLABIC_SEPARATOR)
+    for source in sources:
+        for entry in source:
+            yield entry
+
+
+def compile_lexicon(target, sources=(), transcriptor=None, words=()):
+    """
+    Save a lexicon as a packed trie, see `lexicon_entries`
+
+    :param target: path to the packed trie, loaded with `Lexicon.load`
+    """
+    save_trie(dict(lexicon_entries(sources, transcriptor, words)).items(),
+              target)
+
+
+class Lexicon(object):
+    """Read-only mapping of words to pronunciations"""
+
+    def __init__(self, trie):
+        """
+        :param trie: `PackedTrie` object mapping words to pronunciations
+        """
+        self._trie = trie
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build a lexicon in memory from (word, pronunciation) pairs"""
+        return cls(PackedTrie(pack_trie(dict(entries).items())))
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a compiled lexicon or read a lexicon text file"""
+        with io.open(path, "rb") as lexicon_file:
+            compiled = lexicon_file.read(len(MAGIC)) == MAGIC
+        if compiled:
+            return cls(PackedTrie.load(path))
+        return cls.from_entries(read_lexicon(path))
+
+    def digest(self):
+        return self._trie.digest()
+
+    def get(self, word):
+        """Return the pronunciation of `word` as written in the lexicon"""
+        if not word:
+            return None
+        return self._trie.get(word)
+
+    def syllables(self, word):
+        """
+        Return the syllables of `word` and the index of the stressed one, or
+        `None` if `word` is not in the lexicon
+        """
+        pronunciation = self.get(word)
+        if pronunciation is None:
+            return None
+        syllables = pronunciation.split(SYLLABIC_SEPARATOR)
+        stress_index = None
+        for index, syllable in enumerate(syllables):
+            if syllable.startswith(STRESS_MARK):
+                syllables[index] = syllable[len(STRESS_MARK):]
+                stress_index = index
+        return syllables, stress_index
+
+    def transcribe(self, word, stress_mark=STRESS_MARK,
+                   syllabic_separator=SYLLABIC_SEPARATOR):
+        """Return the pronunciation of `word` with the given separators, or
+        `None` if `word` is not in the lexicon"""
+        pronunciation = self.get(word)
+        if pronunciation is None or (stress_mark == STRESS_MARK and
+                                     syllabic_separator ==
+                                     SYLLABIC_SEPARATOR):
+            return pronunciation
+        syllables, stress_index = self.syllables(word)
+        if stress_index is not None:
+            syllables[stress_index] = stress_mark + syllables[stress_index]
+        return syllabic_separator.join(syllables)
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        return len(self._trie)
+
+    def close(self):
+        self._trie.close()
+
+
+def _load_bundled(name):
+    for filename in (name + ".lex", name + ".txt"):
+        path = os.path.join(LEXICONS_PATH, filename)
+        if os.path.exists(path):
+            return Lexicon.load(path)
+    return None
+
+
+def get_lexicon(lang):
+    """Return the lexicon bundled for the dialect `lang`, `None` if there
+    is none"""
+    name = BUNDLED_LEXICONS.get(lang)
+    if name is None:
+        return None
+    return _lexicons.get_or_create(name, lambda: _load_bundled(name))
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import mmap
+import struct
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+
+MAGIC = b"STVT"
+VERSION = 1
+NO_VALUE = 0xFFFFFFFF
+
+_header = struct.Struct("<4sIIII")
+_node = struct.Struct("<IIII")
+_edge = struct.Struct("<II")
+
+
+class PackedTrie(object):
+    """Read-only trie of unicode keys and values stored in a flat buffer
+
+    Nodes and edges are fixed-size little-endian records, so a trie saved to
+    disk can be memory-mapped and shared by every process that opens it.
+    Looking a key up costs one binary search over the children of each node
+    along the key, independently of the number of entries.
+    """
+
+    def __init__(self, buffer):
+        """
+        :param buffer: `bytes`, `mmap` or any object supporting the buffer
+                       protocol with the contents built by `pack_trie`
+        """
+        magic, version, nodes, edges, values = _header.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a packed trie")
+        self._buffer = buffer
+        self._nodes_offset = _header.size
+        self._edges_offset = self._nodes_offset + nodes * _node.size
+        self._values_offset = self._edges_offset + edges * _edge.size
+        self._length = None
+        self._node_count = nodes
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map the packed trie stored at `path`"""
+        with io.open(path, "rb") as trie_file:
+            buffer = mmap.mmap(trie_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def digest(self):
+        """Return the SHA-1 hexadecimal digest of the packed trie"""
+        return hashlib.sha1(self._buffer[:]).hexdigest()
+
+    def _child(self, node, label):
+        first, count, _, _ = _node.unpack_from(
+            self._buffer, self._nodes_offset + node * _node.size)
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            edge_label, target = _edge.unpack_from(
+                self._buffer, self._edges_offset + middle * _edge.size)
+            if edge_label < label:
+                low = middle + 1
+            elif edge_label > label:
+                high = middle
+            else:
+                return target
+        return None
+
+    def _value(self, node):
+        _, _, offset, length = _node.unpack_from(
+            self._buffer, self._nodes_offset + node * _node.size)
+        if offset == NO_VALUE:
+            return None
+        start = self._values_offset + offset
+        return self._buffer[start:start + length].decode("utf-8")
+
+    def _find(self, key):
+        node = 0
+        for char in key:
+            node = self._child(node, ord(char))
+            if node is None:
+                return None
+        return node
+
+    def get(self, key, default=None):
+        node = self._find(key)
+        if node is None:
+            return default
+        value = self._value(node)
+        if value is None:
+            return default
+        return value
+
+    def prefixes(self, key, start=0):
+        """Yield (end, value) for every key that is a prefix of key[start:]"""
+        node = 0
+        for end in range(start, len(key)):
+            node = self._child(node, ord(key[end]))
+            if node is None:
+                return
+            value = self._value(node)
+            if value is not None:
+                yield end + 1, value
+
+    def items(self):
+        """Yield every (key, value) pair of the trie in key order"""
+        stack = [(0, u"")]
+        while stack:
+            node, key = stack.pop()
+            value = self._value(node)
+            if value is not None:
+                yield key, value
+            first, count, _, _ = _node.unpack_from(
+                self._buffer, self._nodes_offset + node * _node.size)
+            for edge in range(first + count - 1, first - 1, -1):
+                label, target = _edge.unpack_from(
+                    self._buffer, self._edges_offset + edge * _edge.size)
+                stack.append((target, key + unichr(label)))
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(
+                1 for node in range(self._node_count)
+                if _node.unpack_from(
+                    self._buffer,
+                    self._nodes_offset + node * _node.size)[2] != NO_VALUE
+            )
+        return self._length
+
+
+def pack_trie(items):
+    """
+    Return the bytes of a `PackedTrie` holding `items`
+
+    :param items: iterable of (key, value) pairs of unicode strings
+    :return: `bytes` to be saved to disk or wrapped by `PackedTrie`
+    """
+    root = {}
+    for key, value in items:
+        node = root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[None] = value
+    nodes = []
+    edges = []
+    values = []
+    values_size = 0
+    # Breadth-first numbering keeps the children of a node contiguous
+    queue = [root]
+    next_node = 1
+    for node in queue:
+        labels = sorted(label for label in node if label is not None)
+        first = len(edges)
+        for label in labels:
+            edges.append((ord(label), next_node))
+            queue.append(node[label])
+            next_node += 1
+        value = node.get(None)
+        if value is None:
+            nodes.append((first, len(labels), NO_VALUE, 0))
+        else:
+            encoded = value.encode("utf-8")
+            nodes.append((first, len(labels), values_size, len(encoded)))
+            values.append(encoded)
+            values_size += len(encoded)
+    chunks = [_header.pack(MAGIC, VERSION, len(nodes), len(edges),
+                           values_size)]
+    chunks.extend(_node.pack(*node) for node in nodes)
+    chunks.extend(_edge.pack(*edge) for edge in edges)
+    chunks.extend(values)
+    return b"".join(chunks)
+
+
+def save_trie(items, path):
+    """Pack `items` and write them to `path`"""
+    with io.open(path, "wb") as trie_file:
+        trie_file.write(pack_trie(items))
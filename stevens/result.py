@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Structured transcriptions stored in flat arrays
+
+A `Transcription` keeps every phone as an index into a shared
+`PhoneInventory` and the phrase, word and syllable boundaries as offsets
+into the level below, so no intermediate strings are built until a
+transcription is rendered. Slices and `Word` views share the arrays of the
+transcription they come from.
+"""
+import threading
+from array import array
+
+from stevens.alphabets import IPA_NAMES, get_alphabet
+
+
+NO_STRESS = -1
+
+
+class PhoneInventory(object):
+    """Interned phones, each identified by its index"""
+
+    def __init__(self):
+        self._phones = []
+        self._ids = {}
+        self._translations = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._phones)
+
+    def __getitem__(self, phone_id):
+        return self._phones[phone_id]
+
+    def intern(self, phone):
+        """Return the index of `phone`, adding it on first sight"""
+        phone_id = self._ids.get(phone)
+        if phone_id is None:
+            with self._lock:
+                phone_id = self._ids.get(phone)
+                if phone_id is None:
+                    phone_id = len(self._phones)
+                    self._phones.append(phone)
+                    self._ids[phone] = phone_id
+        return phone_id
+
+    def translation(self, alphabet):
+        """
+        Return the list of the phones translated into `alphabet`, by index
+
+        Translations are kept and only the phones interned since the last
+        call are translated.
+
+        :param alphabet: `stevens.alphabets.Alphabet` object
+        """
+        translation = self._translations.get(alphabet, [])
+        if len(translation) < len(self._phones):
+            translate = alphabet.translate
+            translation = translation + [
+                translate(phone)
+                for phone in self._phones[len(translation):]]
+            self._translations[alphabet] = translation
+        return translation
+
+
+class Transcription(object):
+    """Phrases, words and syllables of a transcribed text
+
+    Indexing by phrase returns a `Transcription` sharing the same storage;
+    iterating over `words` yields lightweight `Word` views. The transcription
+    is rendered to the separator format of `BaseTranscriptor.transcribe` on
+    demand and the default rendering is kept.
+    """
+    __slots__ = ("source", "inventory", "phones", "syllables", "words",
+                 "phrases", "spans", "stress", "separators", "_start",
+                 "_stop", "_rendered")
+
+    def __init__(self, source, inventory, separators=(u".", u"|", u"/",
+                                                     u"'")):
+        """
+        :param source: unicode string that was transcribed
+        :param inventory: `PhoneInventory` the phone indexes refer to
+        :param separators: tuple with the syllabic, word and phrase separators
+                           and the stress mark used to render
+        """
+        self.source = source
+        self.inventory = inventory
+        self.phones = array("I")
+        self.syllables = array("I", [0])
+        self.words = array("I", [0])
+        self.phrases = array("I", [0])
+        self.spans = array("I")
+        self.stress = array("h")
+        self.separators = separators
+        self._start = 0
+        self._stop = 0
+        self._rendered = None
+
+    def add_word(self, start, end, syllables, stress_index):
+        """
+        Append a word to the last phrase
+
+        :param start: offset of the word in `source`
+        :param end: offset past the end of the word in `source`
+        :param syllables: list of lists of phone strings, one per syllable
+        :param stress_index: index of the stressed syllable or `None`
+        """
+        intern = self.inventory.intern
+        for phones in syllables:
+            self.phones.extend(intern(phone) for phone in phones)
+            self.syllables.append(len(self.phones))
+        self.words.append(len(self.syllables) - 1)
+        self.spans.append(start)
+        self.spans.append(end)
+        self.stress.append(NO_STRESS if stress_index is None
+                           else stress_index)
+        self._rendered = None
+
+    def end_phrase(self):
+        """Close the current phrase, even if it has no words"""
+        self.phrases.append(len(self.words) - 1)
+        self._stop = len(self.phrases) - 1
+        self._rendered = None
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """Return a phrase, or a range of phrases, sharing this storage"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Phrases can only be sliced contiguously")
+            stop = max(start, stop)
+        else:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("Phrase index out of range")
+            start, stop = index, index + 1
+        view = Transcription.__new__(Transcription)
+        for slot in Transcription.__slots__[:-3]:
+            setattr(view, slot, getattr(self, slot))
+        view._start = self._start + start
+        view._stop = self._start + stop
+        view._rendered = None
+        return view
+
+    def _get_word_range(self):
+        return self.phrases[self._start], self.phrases[self._stop]
+    word_range = property(fget=_get_word_range)
+
+    def _get_span(self):
+        """Offsets in `source` covered by the words of the transcription"""
+        first, last = self.word_range
+        if first == last:
+            return None
+        return self.spans[2 * first], self.spans[2 * last - 1]
+    span = property(fget=_get_span)
+
+    def iter_words(self):
+        first, last = self.word_range
+        for index in range(first, last):
+            yield Word(self, index)
+
+    def phone_ids(self):
+        """Return the phone indexes of the transcription without copying"""
+        first, last = self.word_range
+        start = self.syllables[self.words[first]]
+        stop = self.syllables[self.words[last]]
+        try:
+            return memoryview(self.phones)[start:stop]
+        except TypeError:
+            # Python 2 arrays do not expose the buffer protocol
+            return self.phones[start:stop]
+
+    def render(self, syllabic_separator=None, word_separator=None,
+               phrase_separator=None, stress_mark=None, alphabet=None):
+        """
+        Return the transcription as a string with separators
+
+        :param alphabet: name of the phonetic alphabet or
+                         `stevens.alphabets.Alphabet` object, IPA if `None`
+        """
+        default = (syllabic_separator is None and word_separator is None and
+                   phrase_separator is None and stress_mark is None and
+                   alphabet is None)
+        if default and self._rendered is not None:
+            return self._rendered
+        separators = self.separators
+        syllabic_separator = syllabic_separator or separators[0]
+        word_separator = word_separator or separators[1]
+        phrase_separator = phrase_separator or separators[2]
+        stress_mark = stress_mark or separators[3]
+        if alphabet not in IPA_NAMES:
+            alphabet = get_alphabet(alphabet)
+        phrases = []
+        for index in range(self._start, self._stop):
+            words = [Word(self, word).render(syllabic_separator, stress_mark,
+                                             alphabet)
+                     for word in range(self.phrases[index],
+                                       self.phrases[index + 1])]
+            phrases.append(word_separator.join(words))
+        rendered = phrase_separator.join(phrases)
+        if default:
+            self._rendered = rendered
+        return rendered
+
+    def __unicode__(self):
+        return self.render()
+
+    def __str__(self):
+        rendered = self.render()
+        if str is bytes:
+            return rendered.encode("utf-8")
+        return rendered
+
+    def __repr__(self):
+        return "<Transcription of {} phrases, {} words>".format(
+            len(self), self.word_range[1] - self.word_range[0])
+
+
+class Word(object):
+    """View over one word of a `Transcription`"""
+    __slots__ = ("_transcription", "_index")
+
+    def __init__(self, transcription, index):
+        self._transcription = transcription
+        self._index = index
+
+    def _get_span(self):
+        spans = self._transcription.spans
+        return spans[2 * self._index], spans[2 * self._index + 1]
+    span = property(fget=_get_span)
+
+    def _get_text(self):
+        start, end = self.span
+        return self._transcription.source[start:end]
+    text = property(fget=_get_text)
+
+    def _get_stress(self):
+        stress = self._transcription.stress[self._index]
+        return None if stress == NO_STRESS else stress
+    stress = property(fget=_get_stress)
+
+    def _get_syllables(self):
+        """List of tuples with the phones of every syllable"""
+        transcription = self._transcription
+        inventory = transcription.inventory
+        phones = transcription.phones
+        offsets = transcription.syllables
+        words = transcription.words
+        return [tuple(inventory[phone_id]
+                      for phone_id in phones[offsets[syllable]:
+                                             offsets[syllable + 1]])
+                for syllable in range(words[self._index],
+                                      words[self._index + 1])]
+    syllables = property(fget=_get_syllables)
+
+    def _get_phones(self):
+        return [phone for syllable in self.syllables for phone in syllable]
+    phones = property(fget=_get_phones)
+
+    def render(self, syllabic_separator=None, stress_mark=None,
+               alphabet=None):
+        transcription = self._transcription
+        separators = transcription.separators
+        if alphabet in IPA_NAMES:
+            symbols = transcription.inventory
+        else:
+            symbols = transcription.inventory.translation(
+                get_alphabet(alphabet))
+        phones = transcription.phones
+        offsets = transcription.syllables
+        words = transcription.words
+        syllables = [u"".join(symbols[phone_id]
+                              for phone_id in phones[offsets[syllable]:
+                                                     offsets[syllable + 1]])
+                     for syllable in range(words[self._index],
+                                           words[self._index + 1])]
+        stress = self.stress
+        if stress is not None:
+            syllables[stress] = (stress_mark or separators[3]) + \
+                syllables[stress]
+        return (syllabic_separator or separators[0]).join(syllables)
+
+    def __repr__(self):
+        return "<Word {!r} at {}>".format(self.text, self.span)
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative allophone rules compiled into dispatch tables
+
+A `Rule` rewrites a target letter into an output when the letters around it
+belong to given classes. Instead of being tried one after another, the rules
+of every letter are compiled into a table indexed by the class of the
+previous letter, the class of the next one and the position in the
+syllable, so applying them costs the same whatever their number.
+
+Where the contexts of two rules overlap, the more specific one wins, i.e.
+the one whose contexts are contained in the other's, as in the elsewhere
+condition of phonology; a higher `priority` wins over any specificity.
+Rules that can never apply and overlapping rules with different outputs
+that neither of those criteria tell apart raise `RuleError` when compiled.
+"""
+from collections import namedtuple
+
+
+# Context of letters at the edge of a word, which have no neighbour
+EDGE = frozenset([None])
+
+_OTHER = object()
+
+
+class RuleError(Exception):
+    pass
+
+
+class UnreachableRule(RuleError):
+
+    def __init__(self, rule, reason):
+        message = "Rule {!r} can never apply: {}".format(rule, reason)
+        super(UnreachableRule, self).__init__(message)
+
+
+class ConflictingRules(RuleError):
+
+    def __init__(self, rules, context):
+        message = "Rules {!r} overlap on {!r} with different outputs".format(
+            rules, context)
+        super(ConflictingRules, self).__init__(message)
+
+
+_Rule = namedtuple("Rule", ["target", "output", "left", "right", "index",
+                            "priority"])
+
+
+class Rule(_Rule):
+    """Rewrite `target` into `output` in a context
+
+    `left` and `right` are the sets of letters the previous and next letters
+    must belong to, `None` for any letter. They may include `None`, see
+    `EDGE`, to match the edges of a word. `index` restricts the rule to one
+    position in the syllable.
+    """
+    __slots__ = ()
+
+    def __new__(cls, target, output, left=None, right=None, index=None,
+                priority=0):
+        if left is not None:
+            left = frozenset(left)
+        if right is not None:
+            right = frozenset(right)
+        return super(Rule, cls).__new__(cls, target, output, left, right,
+                                        index, priority)
+
+
+def letters(*groups):
+    """Return the class with the letters of every string or set in `groups`
+    """
+    members = set()
+    for group in groups:
+        members.update(group)
+    return frozenset(members)
+
+
+def _partition(contexts):
+    """Map every symbol mentioned in `contexts` to the id of the set of
+    contexts it belongs to, and return the id of any other symbol"""
+    symbols = set()
+    for context in contexts:
+        symbols.update(context)
+    signatures = {}
+    classes = {}
+    for symbol in symbols:
+        signature = tuple(symbol in context for context in contexts)
+        classes[symbol] = signatures.setdefault(signature, len(signatures))
+    other = signatures.setdefault((False, ) * len(contexts), len(signatures))
+    # A representative of every class, to check which rules match it
+    representatives = [_OTHER] * len(signatures)
+    for symbol, class_id in classes.items():
+        representatives[class_id] = symbol
+    return classes, other, representatives
+
+
+def _matches(context, symbol):
+    return context is None or symbol in context
+
+
+def _context_key(context):
+    return sorted(u"" if symbol is None else symbol for symbol in context)
+
+
+def _compile_target(target, rules):
+    lefts = sorted(set(rule.left for rule in rules if rule.left is not None),
+                   key=_context_key)
+    rights = sorted(set(rule.right for rule in rules
+                        if rule.right is not None), key=_context_key)
+    indexes = sorted(set(rule.index for rule in rules
+                         if rule.index is not None))
+    left_classes, left_other, left_symbols = _partition(lefts)
+    right_classes, right_other, right_symbols = _partition(rights)
+    index_classes, index_other, index_values = _partition(
+        [frozenset([index]) for index in indexes])
+    cells = {}
+    for rule in rules:
+        cells[rule] = frozenset(
+            (left, right, index)
+            for left, previous in enumerate(left_symbols)
+            if _matches(rule.left, previous)
+            for right, next in enumerate(right_symbols)
+            if _matches(rule.right, next)
+            for index, position in enumerate(index_values)
+            if rule.index is None or rule.index == position)
+        if not cells[rule]:
+            raise UnreachableRule(rule, "its contexts are empty")
+    table = {}
+    used = set()
+    for cell in sorted(set().union(*cells.values())):
+        matching = [rule for rule in rules if cell in cells[rule]]
+        priority = max(rule.priority for rule in matching)
+        matching = [rule for rule in matching if rule.priority == priority]
+        winners = [rule for rule in matching
+                   if all(cells[rule] <= cells[other] for other in matching)]
+        if not winners:
+            minimal = [rule for rule in matching
+                       if not any(cells[other] < cells[rule]
+                                  for other in matching)]
+            if len(set(rule.output for rule in minimal)) > 1:
+                raise ConflictingRules(minimal, (left_symbols[cell[0]],
+                                                 right_symbols[cell[1]],
+                                                 index_values[cell[2]]))
+            winners = minimal
+        table[cell] = winners[0].output
+        used.update(winners)
+    for rule in rules:
+        if rule not in used:
+            raise UnreachableRule(rule, "more specific rules cover it")
+    missing = (len(left_symbols) * len(right_symbols) * len(index_values) -
+               len(table))
+    if missing:
+        raise RuleError("Rules for {!r} leave {} contexts without output"
+                        .format(target, missing))
+    return _dispatcher(table, left_classes, left_other, right_classes,
+                       right_other, index_classes, index_other)
+
+
+def _dispatcher(table, left_classes, left_other, right_classes, right_other,
+                index_classes, index_other):
+    outputs = set(table.values())
+    if len(outputs) == 1:
+        output = outputs.pop()
+
+        def rule(previous, next, index):
+            return output
+        return rule
+    left_get = left_classes.get
+    right_get = right_classes.get
+    index_get = index_classes.get
+
+    def rule(previous, next, index):
+        return table[left_get(previous, left_other),
+                     right_get(next, right_other),
+                     index_get(index, index_other)]
+    return rule
+
+
+def compile_rules(rules):
+    """
+    Compile declarative rules into one function per target letter
+
+    :param rules: iterable of `Rule` objects
+    :return: dictionary mapping every target to a function of the previous
+             letter, the next one and the index in the syllable, as taken
+             by `BaseTranscriptor.rule`
+    :raises RuleError: if a rule can never apply, rules overlap with
+                       different outputs or some context has no rule
+    """
+    by_target = {}
+    for rule in rules:
+        if len(rule.target) != 1:
+            raise UnreachableRule(rule, "rules apply to single letters")
+        by_target.setdefault(rule.target, []).append(rule)
+    compiled = {}
+    for target, target_rules in by_target.items():
+        function = _compile_target(target, target_rules)
+        # Kept to fingerprint the rules, since all functions share code
+        function.rules = tuple(target_rules)
+        compiled[target] = function
+    return compiled
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Phonetic index of a lexicon in a SQLite file, for rhyme and near-homophone
+queries
+
+Every word is stored with its transcription, its phones and its rhyme, the
+phones from the vowel of the stressed syllable to the end of the word.
+Phones are the symbols of the IPA transcription without separators nor
+stress marks, so "ks" counts as two. Words with the same phones are
+homophones and words with the same rhyme rhyme.
+
+Words within an edit distance of the phones of a query are found through
+an inverted index of phone n-grams, keyed by the number of phones of the
+word: an edit changes at most `n` n-grams, so a word within distance `k`
+of a query shares all but `nk` of the distinct n-grams of the query at
+least. Only the words with one of its `nk + 1` rarest n-grams are read,
+and only those sharing enough n-grams are compared with the query.
+"""
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+
+INDEX_VERSION = 1
+
+# Trigrams are selective enough to keep the words read by a query few, and
+# short enough for short words to have some
+NGRAM_SIZE = 3
+
+# Pads the phones so that their first and last phones get n-grams of their
+# own
+START = u"^"
+END = u"$"
+
+VOWELS = frozenset(u"aeiouáéíóúɛɔəɐæɪʊøœy")
+
+Entry = namedtuple("Entry", ["word", "transcription", "phones", "rhyme"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE,
+    transcription TEXT NOT NULL,
+    phones TEXT NOT NULL,
+    rhyme TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS words_phones ON words (phones);
+CREATE INDEX IF NOT EXISTS words_rhyme ON words (rhyme);
+CREATE TABLE IF NOT EXISTS ngrams (
+    ngram TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    word INTEGER NOT NULL,
+    PRIMARY KEY (ngram, length, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ngram_counts (
+    ngram TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+def rhyme(syllables, stress_index):
+    """
+    Return the phones of a word from the vowel of its stressed syllable on
+
+    :param syllables: list of strings with the phones of every syllable
+    :param stress_index: index of the stressed syllable, `None` for
+                         monosyllables
+    """
+    if not syllables:
+        return u""
+    if stress_index is None:
+        stress_index = len(syllables) - 1
+    stressed = syllables[stress_index]
+    for index, phone in enumerate(stressed):
+        if phone in VOWELS:
+            stressed = stressed[index:]
+            break
+    return stressed + u"".join(syllables[stress_index + 1:])
+
+
+def ngrams(phones, size=NGRAM_SIZE):
+    """Return the set of the n-grams of `phones`, padded at both ends"""
+    padded = START * (size - 1) + phones + END * (size - 1)
+    return set(padded[index:index + size]
+               for index in range(len(padded) - size + 1))
+
+
+def edit_distance(first, second, limit=None):
+    """
+    Return the Levenshtein distance between two strings
+
+    :param limit: stop as soon as the distance is known to exceed `limit`,
+                  returning `limit` + 1
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if limit is not None and len(first) - len(second) > limit:
+        return limit + 1
+    previous = list(range(len(second) + 1))
+    for row, letter in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (letter != other)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class PhoneticIndex(object):
+    """Persistent index of the pronunciations of a lexicon
+
+    Words are added incrementally and queried by spelling, looked up in the
+    index or transcribed on the fly. An index only accepts words from
+    transcriptors with the fingerprint of the one that created it, so all
+    its entries follow the same rules.
+    """
+
+    def __init__(self, path, transcriptor=None, batch_size=500):
+        """
+        :param path: path to the SQLite database, created if missing
+        :param transcriptor: `BaseTranscriptor` object to add words and to
+                             query words missing from the index
+        :param batch_size: number of words added per transaction
+        :raises ValueError: if the index was built by another transcriptor
+        """
+        self._path = path
+        self._transcriptor = transcriptor
+        self._batch_size = batch_size
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+        connection = self._connect()
+        if transcriptor is not None:
+            fingerprint = self._metadata(u"fingerprint")
+            if fingerprint is None:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO metadata (name, value) VALUES (?, ?)",
+                        [(u"fingerprint", transcriptor.fingerprint()),
+                         (u"version", type(u"")(INDEX_VERSION))])
+            elif fingerprint != transcriptor.fingerprint():
+                raise ValueError("Phonetic index built by another "
+                                 "transcriptor")
+
+    def _get_path(self):
+        return self._path
+    path = property(fget=_get_path)
+
+    def _connect(self):
+        # Connections can not be shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self._path,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _metadata(self, name):
+        row = self._connect().execute(
+            "SELECT value FROM metadata WHERE name = ?", (name, )).fetchone()
+        return row[0] if row is not None else None
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+    def entry(self, word):
+        """
+        Return the `Entry` of `word` computed by the transcriptor
+
+        :param word: lowercase word
+        """
+        transcriptor = self._transcriptor
+        if transcriptor is None:
+            raise ValueError("A transcriptor is needed to transcribe words")
+        phones, stress_index = transcriptor.word_phones(word)
+        syllables = [u"".join(syllable) for syllable in phones]
+        options = transcriptor.default_options
+        transcription = list(syllables)
+        if stress_index is not None:
+            transcription[stress_index] = \
+                options.stress_mark + transcription[stress_index]
+        return Entry(word, options.syllabic_separator.join(transcription),
+                     u"".join(syllables), rhyme(syllables, stress_index))
+
+    def add(self, words):
+        """
+        Add the words that are not in the index yet
+
+        :param words: iterable of lowercase words
+        :return: number of words added
+        """
+        added = 0
+        batch = []
+        for word in words:
+            if word:
+                batch.append(word)
+            if len(batch) >= self._batch_size:
+                added += self._insert(batch)
+                batch = []
+        if batch:
+            added += self._insert(batch)
+        return added
+
+    def _insert(self, words):
+        # Only the words missing from the index are transcribed
+        known = set(row[0] for row in self._query(
+            "SELECT word FROM words WHERE word IN ({})".format(
+                u", ".join(u"?" * len(words))), words))
+        entries = [self.entry(word) for word in sorted(set(words) - known)]
+        rows = []
+        counts = {}
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                cursor = connection.cursor()
+                for entry in entries:
+                    length = len(entry.phones)
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO words "
+                        "(word, transcription, phones, rhyme, length) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (entry.word, entry.transcription, entry.phones,
+                         entry.rhyme, length))
+                    if cursor.rowcount != 1:
+                        continue
+                    word_id = cursor.lastrowid
+                    for ngram in ngrams(entry.phones):
+                        rows.append((ngram, length, word_id))
+                        counts[ngram] = counts.get(ngram, 0) + 1
+                cursor.executemany(
+                    "INSERT INTO ngrams (ngram, length, word) "
+                    "VALUES (?, ?, ?)", rows)
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO ngram_counts (ngram, count) "
+                    "VALUES (?, 0)", [(ngram, ) for ngram in counts])
+                cursor.executemany(
+                    "UPDATE ngram_counts SET count = count + ? "
+                    "WHERE ngram = ?",
+                    [(count, ngram) for ngram, count in counts.items()])
+        return len(set(row[2] for row in rows))
+
+    def get(self, word):
+        """Return the `Entry` of `word` in the index or `None`"""
+        rows = self._query("SELECT word, transcription, phones, rhyme "
+                           "FROM words WHERE word = ?", (word, ))
+        return Entry(*rows[0]) if rows else None
+
+    def lookup(self, word):
+        """Return the `Entry` of `word`, transcribed if not in the index"""
+        entry = self.get(word)
+        if entry is None:
+            entry = self.entry(word)
+        return entry
+
+    def rhymes(self, word, limit=None):
+        """
+        Return the words with the same rhyme as `word`, in alphabetical order
+
+        :param limit: maximum number of words to return, all if `None`
+        """
+        entry = self.lookup(word)
+        return [row[0] for row in self._query(
+            "SELECT word FROM words WHERE rhyme = ? AND word != ? "
+            "ORDER BY word LIMIT ?",
+            (entry.rhyme, word, -1 if limit is None else limit))]
+
+    def homophones(self, word):
+        """Return the other words pronounced like `word`"""
+        entry = self.lookup(word)
+        return [row[0] for row in self._query(
+            "SELECT word FROM words WHERE phones = ? AND word != ? "
+            "ORDER BY word", (entry.phones, word))]
+
+    def similar(self, word, distance=1):
+        """
+        Return the words whose phones are within an edit distance of the
+        ones of `word`
+
+        :param distance: maximum number of phones inserted, deleted or
+                         replaced
+        :return: list of (word, distance) tuples, closest first
+        """
+        phones = self.lookup(word).phones
+        length = len(phones)
+        query_ngrams = ngrams(phones)
+        missed = NGRAM_SIZE * distance
+        shared = len(query_ngrams) - missed
+        if shared > 0:
+            # Candidates miss at most `missed` n-grams of the query, so they
+            # have at least one of any `missed + 1` of them, and the rarest
+            # ones have the shortest posting lists
+            counts = dict(self._query(
+                "SELECT ngram, count FROM ngram_counts "
+                "WHERE ngram IN ({})".format(
+                    u", ".join(u"?" * len(query_ngrams))),
+                list(query_ngrams)))
+            probes = sorted(query_ngrams,
+                            key=lambda ngram: (counts.get(ngram, 0), ngram))
+            probes = probes[:missed + 1]
+            rows = [row for row in self._query(
+                "SELECT DISTINCT words.word, words.phones FROM ngrams "
+                "JOIN words ON words.id = ngrams.word "
+                "WHERE ngram IN ({}) AND ngrams.length BETWEEN ? AND ?"
+                .format(u", ".join(u"?" * len(probes))),
+                probes + [length - distance, length + distance])
+                if len(query_ngrams & ngrams(row[1])) >= shared]
+        else:
+            # Too few n-grams to filter on, only the length is
+            rows = self._query(
+                "SELECT word, phones FROM words "
+                "WHERE length BETWEEN ? AND ?",
+                (length - distance, length + distance))
+        results = []
+        for candidate, candidate_phones in rows:
+            if candidate == word:
+                continue
+            candidate_distance = edit_distance(phones, candidate_phones,
+                                               distance)
+            if candidate_distance <= distance:
+                results.append((candidate, candidate_distance))
+        results.sort(key=lambda result: (result[1], result[0]))
+        return results
+
+    def __contains__(self, word):
+        return bool(self._query("SELECT 1 FROM words WHERE word = ?",
+                                (word, )))
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM words")[0][0]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
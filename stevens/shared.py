@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Transcriptor state shared by the workers of a pre-forking server
+
+Forked workers share the memory of their parent until either one writes to
+it, so whatever is built before the fork costs RSS once rather than once per
+worker. `prefork` builds the transcriptors, their compiled rules and the
+langid model in the parent, and moves them out of reach of the garbage
+collector, whose bookkeeping would otherwise copy the pages they live in.
+Hyphenation patterns are already memory-mapped from a packed trie.
+
+Frequent words can be transcribed ahead of time into a `WordTable`, a packed
+trie saved to a file that every worker memory-maps, so the table is shared
+even by processes that were not forked from the one that built it.
+"""
+import errno
+import gc
+import getpass
+import hashlib
+import os
+import stat
+import tempfile
+
+from stevens.packed import PackedTrie, pack_trie
+
+
+# Keys no word can have, holding the fingerprint of the transcriptor and the
+# digest of the words
+FINGERPRINT_KEY = u""
+WORDS_KEY = u"\0"
+
+# Tables are written by the master and memory-mapped by workers that may
+# run as other users
+TABLE_MODE = 0o644
+
+
+def words_digest(words):
+    """Return a digest of the distinct words of an iterable"""
+    digest = hashlib.sha1()
+    for word in sorted(set(word for word in words if word)):
+        digest.update(word.encode("utf-8"))
+        digest.update(b"\n")
+    return type(u"")(digest.hexdigest())
+
+
+class WordTable(object):
+    """Read-only transcriptions of words in a memory-mapped packed trie
+
+    The empty key holds the fingerprint of the transcriptor the words were
+    transcribed with, so a table is never used with different rules or
+    options, and the "\\0" key a digest of the words.
+    """
+
+    def __init__(self, trie):
+        """
+        :param trie: `PackedTrie` object built by `WordTable.build`
+        """
+        self._trie = trie
+        self._fingerprint = trie.get(FINGERPRINT_KEY)
+        self._words_digest = trie.get(WORDS_KEY)
+
+    @classmethod
+    def build(cls, transcriptor, words, path=None):
+        """
+        Transcribe `words` with the default options of `transcriptor`
+
+        :param transcriptor: `BaseTranscriptor` object
+        :param words: iterable of lowercase words
+        :param path: file to save the table to and memory-map, `None` to keep
+                     it in memory
+        :return: a `WordTable` object
+        """
+        words = set(word for word in words if word)
+        items = [(FINGERPRINT_KEY, transcriptor.fingerprint()),
+                 (WORDS_KEY, words_digest(words))]
+        items.extend((word, transcriptor.transcribe_word(word))
+                     for word in words)
+        data = pack_trie(items)
+        if path is None:
+            return cls(PackedTrie(data))
+        # Renamed into place, so concurrent builders never expose half a file
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, "wb") as table_file:
+            table_file.write(data)
+        # mkstemp creates files only readable by their owner
+        os.chmod(temporary, TABLE_MODE)
+        os.rename(temporary, path)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(PackedTrie.load(path))
+
+    def _get_fingerprint(self):
+        return self._fingerprint
+    fingerprint = property(fget=_get_fingerprint)
+
+    def _get_words_digest(self):
+        return self._words_digest
+    words_digest = property(fget=_get_words_digest)
+
+    def get(self, word):
+        """Return the transcription of `word` or `None`"""
+        if not word or word == WORDS_KEY:
+            return None
+        return self._trie.get(word)
+
+    def __len__(self):
+        return len(self._trie) - 1 - (self._words_digest is not None)
+
+    def close(self):
+        self._trie.close()
+
+
+def _trusted(path, mask):
+    # Whether `path` belongs to the current user and has none of the
+    # permission bits in `mask`, e.g. written by nobody else for 0o022
+    status = os.lstat(path)
+    if stat.S_ISLNK(status.st_mode):
+        return False
+    if not hasattr(os, "getuid"):
+        return True
+    return status.st_uid == os.getuid() and not status.st_mode & mask
+
+
+def table_directory():
+    """
+    Return the directory word tables are saved to by default, private to the
+    current user in the temporary directory
+
+    :raises OSError: if it exists but someone else could write to it
+    """
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    directory = os.path.join(tempfile.gettempdir(),
+                             "stevens-{}".format(user))
+    try:
+        os.mkdir(directory, 0o700)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            raise
+    # Any user can create it first in a shared temporary directory
+    if not _trusted(directory, 0o077):
+        raise OSError("{} is not private, pass another directory".format(
+            directory))
+    return directory
+
+
+def table_path(transcriptor, directory=None):
+    """Return the file a `WordTable` for `transcriptor` is saved to"""
+    return os.path.join(directory or table_directory(),
+                        "stevens-{}.words".format(transcriptor.fingerprint()))
+
+
+def prefork(langs=("es_ES", ), words=(), directory=None, freeze=True,
+            identification=True, **kwargs):
+    """
+    Build in the parent of a pre-forking server everything its workers share
+
+    Meant to be called once in the master process before the workers are
+    forked, e.g. at the top of a gunicorn config or a uWSGI app without
+    `lazy-apps`.
+
+    :param langs: iterable of language codes whose transcriptors are built
+    :param words: iterable of frequent lowercase words transcribed into a
+                  `WordTable` for every transcriptor, reused from `directory`
+                  if it was already built from the same words by the current
+                  user and nobody else can write to it
+    :param directory: directory the word tables are saved to, by default
+                      `table_directory`, which workers running as other
+                      users can not read
+    :param freeze: boolean to move every object built so far out of the
+                   garbage collector, where supported (Python 3.7+)
+    :param identification: boolean to load the langid model, if installed
+    :param kwargs: options passed to `get_transcriptor`
+    :return: list of the shared `Transcriptor` objects
+    """
+    from stevens.transcriber import get_transcriptor, preload
+    preload(langs, identification=identification, **kwargs)
+    transcriptors = [get_transcriptor(lang, **kwargs) for lang in langs]
+    words = list(words)
+    if words:
+        digest = words_digest(words)
+        for transcriptor in transcriptors:
+            path = table_path(transcriptor, directory)
+            table = None
+            if os.path.exists(path) and _trusted(path, 0o022):
+                table = WordTable.load(path)
+                if table.words_digest != digest:
+                    table.close()
+                    table = None
+            if table is None:
+                table = WordTable.build(transcriptor, words, path)
+            transcriptor.set_word_table(table)
+    if freeze and hasattr(gc, "freeze"):
+        gc.collect()
+        gc.freeze()
+    return transcriptors
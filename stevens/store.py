@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent transcription cache in a SQLite file shared across processes
+
+Entries are keyed by a fingerprint of the transcriptor, hashed from the code
+of its rules and methods, its `Options`, its lexicon and the tokenizer and
+hyphenator it splits text with, so changing any of them makes old entries
+unreachable instead of wrong. The database runs in WAL mode,
+which lets any number of processes read while one of them writes.
+"""
+import atexit
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import types
+import weakref
+
+
+STORE_VERSION = 1
+
+# Stores flushed when the interpreter exits, without keeping them alive
+_open_stores = weakref.WeakSet()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    fingerprint TEXT NOT NULL,
+    input TEXT NOT NULL,
+    output TEXT NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (fingerprint, input)
+);
+CREATE INDEX IF NOT EXISTS transcriptions_used ON transcriptions (used);
+"""
+
+
+def _canonical(value):
+    """Return a representation of `value` that is stable across processes,
+    whatever their hash seed"""
+    if isinstance(value, dict):
+        return u"{%s}" % u",".join(sorted(
+            _canonical(key) + u":" + _canonical(item)
+            for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return u"{%s}" % u",".join(sorted(_canonical(item)
+                                          for item in value))
+    if isinstance(value, (list, tuple)):
+        return u"[%s]" % u",".join(_canonical(item) for item in value)
+    if isinstance(value, types.CodeType):
+        return _canonical((value.co_code, value.co_consts, value.co_names))
+    if isinstance(value, bytes):
+        return type(u"")(hashlib.sha1(value).hexdigest())
+    if hasattr(value, "pattern") and hasattr(value, "flags"):
+        return _canonical((value.pattern, value.flags))
+    return type(u"")(repr(value))
+
+
+def _code_parts(value):
+    """Yield the name of the class of `value` and the code of its methods"""
+    cls = type(value)
+    yield cls.__module__ + u"." + cls.__name__
+    for klass in cls.__mro__:
+        for name, member in sorted(vars(klass).items()):
+            code = getattr(member, "__code__", None)
+            if code is not None:
+                yield name + u"=" + _canonical(code)
+
+
+def fingerprint(transcriptor):
+    """
+    Return a digest of everything the output of `transcriptor` depends on
+
+    :param transcriptor: `BaseTranscriptor` object
+    :return: string with a hexadecimal digest
+    """
+    digest = hashlib.sha1()
+    parts = [_canonical(STORE_VERSION)]
+    parts.extend(_code_parts(transcriptor))
+    parts.append(_canonical(transcriptor.lang))
+    parts.append(_canonical(tuple(transcriptor.default_options)))
+    rules = getattr(transcriptor, "_uninstrumented_rules", transcriptor.rules)
+    for chunk, rule in sorted(rules.items()):
+        parts.append(chunk + u"=" + _canonical(rule.__code__))
+        # Compiled rules share their code and differ in their declarations
+        if hasattr(rule, "rules"):
+            parts.append(_canonical(rule.rules))
+    tokenizer = getattr(transcriptor, "_tokenizer", None)
+    if tokenizer is not None:
+        parts.extend(_code_parts(tokenizer))
+        parts.append(_canonical(tokenizer.pauses))
+        if tokenizer.spell is not None:
+            parts.append(_canonical(tokenizer.spell.__code__))
+    lexicon = getattr(transcriptor, "_lexicon", None)
+    if lexicon is not None:
+        parts.append(lexicon.digest())
+    hyphenator = getattr(transcriptor, "_hyphenator", None)
+    if hyphenator is not None:
+        parts.extend(_code_parts(hyphenator))
+        # Hyphenators digest their own data and options, like Liang patterns
+        if hasattr(hyphenator, "fingerprint"):
+            parts.append(hyphenator.fingerprint())
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@atexit.register
+def _flush_open_stores():
+    for store in list(_open_stores):
+        store.flush()
+
+
+def _encode_key(key):
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+def read_word_list(path, limit=None, encoding="utf-8"):
+    """
+    Return the words of a frequency list, most frequent first
+
+    Every line holds a word, optionally followed by its count. Lines are
+    expected to be sorted by frequency already unless they all have counts.
+
+    :param path: path to the word list
+    :param limit: maximum number of words to return
+    """
+    words = []
+    counts = []
+    with io.open(path, encoding=encoding) as word_list:
+        for line in word_list:
+            fields = line.split()
+            if not fields:
+                continue
+            words.append(fields[0].lower())
+            if len(fields) > 1 and re.match(r"^\d+$", fields[1]):
+                counts.append(int(fields[1]))
+    if len(counts) == len(words):
+        order = sorted(range(len(words)), key=lambda index: -counts[index])
+        words = [words[index] for index in order]
+    return words[:limit] if limit is not None else words
+
+
+class TranscriptionStore(object):
+    """Size-bounded SQLite cache of transcriptions
+
+    Writes are buffered and committed in batches, and the last time every
+    read entry was used is only updated on those commits, so reads never
+    write to the database. When the store grows past `maxsize` the entries
+    used longest ago are evicted. Each process opens its own connection.
+
+    Entries are counted once per process, and the count is then kept up to
+    date with the writes and evictions of that process, so several writers
+    can take the store past `maxsize` by what the others added since; `len`
+    counts them all again.
+
+    Stores still open when the interpreter exits are flushed then, but they
+    are not kept alive for it: call `close` to commit the pending writes of
+    a store that is no longer used.
+    """
+
+    def __init__(self, path, maxsize=1000000, batch_size=256, timeout=30.0):
+        """
+        :param path: path to the SQLite database, created if missing
+        :param maxsize: maximum number of entries kept
+        :param batch_size: number of writes buffered before a commit
+        :param timeout: seconds to wait for other processes to finish writing
+        """
+        self._path = path
+        self._maxsize = maxsize
+        self._batch_size = batch_size
+        self._timeout = timeout
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+        self._pending = {}
+        self._touched = set()
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        # Processes forked afterwards find the database ready
+        self._connect()
+        _open_stores.add(self)
+
+    def _get_path(self):
+        return self._path
+    path = property(fget=_get_path)
+
+    def _setup(self, connection):
+        deadline = time.time() + self._timeout
+        while True:
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(_SCHEMA)
+                return
+            except sqlite3.OperationalError:
+                # Another process is creating the same store right now
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def _connect(self):
+        # Connections can not be shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self._path, timeout=self._timeout,
+                                         check_same_thread=False)
+            self._setup(connection)
+            self._connection = connection
+            self._pid = os.getpid()
+            self._pending = {}
+            self._touched = set()
+            self._size = None
+        return self._connection
+
+    def get(self, fingerprint, key):
+        """
+        Return the output stored for `key` or `None`
+
+        :param fingerprint: string with the fingerprint of the transcriptor
+        :param key: tuple of strings or `None`, like a word cache key
+        """
+        key = _encode_key(key)
+        with self._lock:
+            connection = self._connect()
+            output = self._pending.get((fingerprint, key))
+            if output is None:
+                row = connection.execute(
+                    "SELECT output FROM transcriptions "
+                    "WHERE fingerprint = ? AND input = ?",
+                    (fingerprint, key)).fetchone()
+                if row is not None:
+                    output = row[0]
+                    self._touched.add((fingerprint, key))
+            if output is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return output
+
+    def put(self, fingerprint, key, output):
+        key = _encode_key(key)
+        with self._lock:
+            self._connect()
+            self._pending[(fingerprint, key)] = output
+            if len(self._pending) >= self._batch_size:
+                self.flush()
+
+    def flush(self):
+        """Commit the buffered writes and evict entries over `maxsize`"""
+        with self._lock:
+            if self._connection is None or self._pid != os.getpid():
+                return
+            if not self._pending and not self._touched:
+                return
+            now = time.time()
+            connection = self._connection
+            with connection:
+                if self._size is None:
+                    self._size = self._count(connection)
+                # Entries written meanwhile by another process hold the same
+                # output, since the fingerprint is part of the key
+                inserted = connection.executemany(
+                    "INSERT OR IGNORE INTO transcriptions "
+                    "(fingerprint, input, output, used) VALUES (?, ?, ?, ?)",
+                    [(fingerprint, key, output, now)
+                     for (fingerprint, key), output in self._pending.items()]
+                ).rowcount
+                connection.executemany(
+                    "UPDATE transcriptions SET used = ? "
+                    "WHERE fingerprint = ? AND input = ?",
+                    [(now, fingerprint, key)
+                     for fingerprint, key in self._touched])
+                self.writes += len(self._pending)
+                self._pending = {}
+                self._touched = set()
+                self._size += inserted
+                if self._size > self._maxsize:
+                    evicted = connection.execute(
+                        "DELETE FROM transcriptions WHERE rowid IN ("
+                        "SELECT rowid FROM transcriptions ORDER BY used "
+                        "LIMIT ?)", (self._size - self._maxsize, )).rowcount
+                    self.evictions += evicted
+                    self._size -= evicted
+
+    def _count(self, connection):
+        return connection.execute(
+            "SELECT COUNT(*) FROM transcriptions").fetchone()[0]
+
+    def populate(self, transcriptor, words):
+        """
+        Store the transcriptions of `words`, e.g. read from a frequency list
+
+        :param transcriptor: `BaseTranscriptor` object using this store
+        :param words: iterable of lowercase words
+        :return: number of words transcribed
+        """
+        count = 0
+        for word in words:
+            transcriptor.transcribe_word(word)
+            count += 1
+        self.flush()
+        return count
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect()
+            self._pending = {}
+            self._touched = set()
+            with connection:
+                connection.execute("DELETE FROM transcriptions")
+            self._size = 0
+
+    def __len__(self):
+        with self._lock:
+            self.flush()
+            self._size = self._count(self._connect())
+            return self._size
+
+    def stats(self):
+        size = len(self)
+        with self._lock:
+            return {
+                "size": size,
+                "maxsize": self._maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        _open_stores.discard(self)
+        with self._lock:
+            self.flush()
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
@@ -0,0 +1,78 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import sys
+import unittest
+
+from stevens.transcriber import get_transcriptor
+
+if sys.version_info >= (3, 7):
+    import asyncio
+    from stevens.aio import AsyncTranscriber
+else:
+    asyncio = None
+
+
+@unittest.skipIf(asyncio is None, "asyncio facade requires Python 3.7")
+class AsyncTranscriberTestCase(unittest.TestCase):
+
+    texts = [u"Hola, qué tal", u"Esto es una prueba", u"Buenos días",
+             u"Hola, qué tal", u""]
+
+    def run_clients(self, transcriber, texts):
+        try:
+            return asyncio.run(transcriber.transcribe_all(texts))
+        finally:
+            asyncio.run(transcriber.close())
+
+    def test_transcribe(self):
+        transcriptor = get_transcriptor("es_ES")
+        transcriber = AsyncTranscriber(batch_size=2)
+        results = self.run_clients(transcriber, self.texts)
+        self.assertEqual(results, [transcriptor.transcribe(text)
+                                   for text in self.texts])
+
+    def test_batching(self):
+        transcriber = AsyncTranscriber(batch_size=100, max_wait=0.05)
+        self.run_clients(transcriber, self.texts * 10)
+        stats = transcriber.stats()
+        self.assertEqual(stats["requests"], 50)
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["deduplicated"], 46)
+
+    def test_process_executor(self):
+        transcriptor = get_transcriptor("es_ES")
+        transcriber = AsyncTranscriber(workers=2, batch_size=2,
+                                       executor="process")
+        results = self.run_clients(transcriber, self.texts)
+        self.assertEqual(results, [transcriptor.transcribe(text)
+                                   for text in self.texts])
+
+    def test_independent_instances(self):
+        # Transcribers with other options in the same process do not share
+        # their transcriptor
+        texts = [u"Cielo azul", u"La calle"]
+        seseo = AsyncTranscriber(lang="es")
+        distincion = AsyncTranscriber(lang="es_ES", syllabic_separator=u"-")
+        try:
+            # The executor of the second one starts between both batches of
+            # the first one
+            results = [asyncio.run(transcriber.transcribe_all(texts))
+                       for transcriber in (seseo, distincion, seseo)]
+        finally:
+            asyncio.run(seseo.close())
+            asyncio.run(distincion.close())
+        expected = [get_transcriptor("es").transcribe(text)
+                    for text in texts]
+        self.assertEqual(results, [
+            expected,
+            [get_transcriptor("es_ES", syllabic_separator=u"-").transcribe(
+                text) for text in texts],
+            expected])
+        self.assertNotEqual(results[0], results[1])
+
+    def test_unknown_executor(self):
+        self.assertRaises(ValueError, AsyncTranscriber, executor="xx")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from stevens.alphabets import Alphabet, get_alphabet, register_alphabet
+from stevens.exceptions import NotAlphabetSupported
+from stevens.languages.es import castillian
+from stevens.result import PhoneInventory
+from stevens.transcriber import get_transcriptor, transcribe
+
+
+class AlphabetTestCase(unittest.TestCase):
+
+    def test_get_alphabet(self):
+        alphabet = get_alphabet("X-SAMPA")
+        self.assertIs(alphabet, get_alphabet("xsampa"))
+        self.assertIs(get_alphabet(alphabet), alphabet)
+        self.assertEqual(get_alphabet(None).name, "ipa")
+        self.assertRaises(NotAlphabetSupported, get_alphabet, "arpabet")
+        self.assertRaises(ValueError, get_alphabet, ("ipa", "sampa"))
+
+    def test_translate(self):
+        xsampa = get_alphabet("xsampa")
+        self.assertEqual(xsampa.translate(u"β"), u"B")
+        self.assertEqual(xsampa.translate(u"ʧi"), u"tSi")
+        self.assertEqual(xsampa.translate(u"ks"), u"ks")
+        self.assertEqual(get_alphabet("sampa").translate(u"ɾ"), u"r")
+        self.assertEqual(get_alphabet("ipa").translate(u"ɾ"), u"ɾ")
+
+    def test_longest_symbol(self):
+        alphabet = Alphabet("test", {u"k": u"K", u"ks": u"X"})
+        self.assertEqual(alphabet.translate(u"kaks"), u"KaX")
+
+    def test_inventory(self):
+        inventory = PhoneInventory()
+        inventory.intern(u"β")
+        xsampa = get_alphabet("xsampa")
+        self.assertEqual(inventory.translation(xsampa), [u"B"])
+        inventory.intern(u"a")
+        self.assertEqual(inventory.translation(xsampa), [u"B", u"a"])
+
+
+class TranscriptorAlphabetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transcriptor = castillian.Transcriptor(lang="es_ES",
+                                                    lexicon=True)
+        self.text = u"Un chico, la calle y el whisky"
+
+    def test_alphabets(self):
+        self.assertEqual(self.transcriptor.transcribe(self.text),
+                         u"un/'ʧi.ko/la/'ka.ʝe/i/el/'wis.ki")
+        self.assertEqual(
+            self.transcriptor.transcribe(self.text, alphabet="xsampa"),
+            u"un/'tSi.ko/la/'ka.j\\e/i/el/'wis.ki")
+        self.assertEqual(
+            self.transcriptor.transcribe(self.text, alphabet="sampa",
+                                         stress_mark=u"\""),
+            u"un/\"tSi.ko/la/\"ka.jje/i/el/\"wis.ki")
+
+    def test_single_analysis(self):
+        alphabets = ("ipa", "xsampa", "sampa")
+        self.assertEqual(
+            self.transcriptor.transcribe(self.text, alphabet=alphabets),
+            tuple(self.transcriptor.transcribe(self.text, alphabet=alphabet)
+                  for alphabet in alphabets))
+        transcription = self.transcriptor.analyze(self.text)
+        self.assertEqual(transcription.render(alphabet="xsampa"),
+                         self.transcriptor.transcribe(self.text,
+                                                      alphabet="xsampa"))
+        self.assertEqual(transcription.render(),
+                         self.transcriptor.transcribe(self.text))
+
+    def test_engines(self):
+        transcriptor = castillian.Transcriptor(lang="es_ES", engine="fst",
+                                               lexicon=True)
+        self.assertEqual(
+            transcriptor.transcribe(self.text, alphabet="xsampa"),
+            self.transcriptor.transcribe(self.text, alphabet="xsampa"))
+
+    def test_word_cache(self):
+        transcriptor = castillian.Transcriptor(lang="es_ES",
+                                               word_cache_size=10)
+        self.assertEqual(transcriptor.transcribe_word(u"zapato"),
+                         u"θa.'pa.to")
+        self.assertEqual(transcriptor.transcribe_word(u"zapato",
+                                                      alphabet="xsampa"),
+                         u"Ta.'pa.to")
+
+    def test_custom_alphabet(self):
+        register_alphabet("vowels", {u"a": u"A", u"e": u"E"})
+        self.assertEqual(self.transcriptor.transcribe(u"casa verde",
+                                                      alphabet="vowels"),
+                         u"'kA.sA/'bEɾ.ðE")
+
+    def test_transcriber(self):
+        self.assertEqual(transcribe(u"Caballo", lang="es_AR",
+                                    alphabet=("IPA", "X-SAMPA")),
+                         (u"ka.'βa.ʃo", u"ka.'Ba.So"))
+        self.assertRaises(NotAlphabetSupported, get_transcriptor,
+                          alphabet="arpabet", cached=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
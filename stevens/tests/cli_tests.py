@@ -0,0 +1,56 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from stevens import cli
+from stevens.transcriber import get_transcriptor
+
+
+class CommandLineTestCase(unittest.TestCase):
+
+    lines = [u"Hola, qué tal", u"", u"Esto es una prueba. Buenos días"]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input = os.path.join(self.directory, "input.txt")
+        self.output = os.path.join(self.directory, "output.txt")
+        with io.open(self.input, "w", encoding="utf-8") as input_file:
+            input_file.write(u"\n".join(self.lines) + u"\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_output(self):
+        with io.open(self.output, encoding="utf-8") as output_file:
+            return output_file.read().splitlines()
+
+    def expected(self):
+        transcriptor = get_transcriptor("es_ES")
+        return [transcriptor.transcribe(line) for line in self.lines]
+
+    def test_read_lines(self):
+        stream = io.StringIO(u"abcde\nfg\n\nh")
+        lines = [list(chunks) for chunks in cli.read_lines(stream, 2)]
+        self.assertEqual(lines, [[u"ab", u"cd", u"e\n"], [u"fg", u"\n"],
+                                 [u"\n"], [u"h"]])
+
+    def test_main(self):
+        cli.main([self.input, "-o", self.output])
+        self.assertEqual(self.read_output(), self.expected())
+
+    def test_main_small_buffer(self):
+        cli.main([self.input, "-o", self.output, "--buffer-size", "3"])
+        self.assertEqual(self.read_output(), self.expected())
+
+    def test_main_workers(self):
+        cli.main([self.input, "-o", self.output, "-j", "2",
+                  "--chunksize", "1"])
+        self.assertEqual(self.read_output(), self.expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import threading
+import unittest
+
+from stevens.languages import Options
+from stevens.languages.es import castillian
+from stevens.languages.es import vectorized
+from stevens.tests.transducer_tests import corpus
+
+
+THREADS = 16
+CALLS = 100
+
+OPTIONS = [
+    {},
+    {"syllabic_separator": u"-"},
+    {"stress_mark": u"ˈ", "word_separator": u" "},
+    {"phrase_separator": u" ‖ ", "syllabic_separator": u"·"},
+]
+
+
+class OptionsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transcriptor = castillian.Transcriptor(lang="es")
+
+    def test_defaults(self):
+        options = self.transcriptor.options()
+        self.assertIs(options, self.transcriptor.default_options)
+        self.assertEqual(options.syllabic_separator, u".")
+
+    def test_overrides(self):
+        transcriptor = self.transcriptor
+        text = u"Esto es una prueba, otra vez"
+        self.assertEqual(
+            transcriptor.transcribe(text, syllabic_separator=u"-",
+                                    phrase_separator=u" ",
+                                    stress_mark=u"ˈ"),
+            u"ˈes-to es ˈu-na ˈpɾwe-βa ˈo-tɾa bes")
+        self.assertEqual(
+            transcriptor.transcribe_phrase(u"una prueba",
+                                           word_separator=u" ",
+                                           syllabic_separator=u"-"),
+            u"'u-na 'pɾwe-βa")
+        # Overrides do not stick to the transcriptor
+        self.assertEqual(transcriptor.transcribe(text),
+                         u"'es.to/es/'u.na/'pɾwe.βa/'o.tɾa/bes")
+
+    def test_options_object(self):
+        options = self.transcriptor.default_options._replace(
+            syllabic_separator=u"-")
+        self.assertEqual(self.transcriptor.transcribe(u"casa",
+                                                      options=options),
+                         u"'ka-sa")
+        self.assertEqual(
+            self.transcriptor.transcribe(u"casa", options=options,
+                                         stress_mark=u"ˈ"),
+            u"ˈka-sa")
+        self.assertEqual(Options(u".", u"|", u"/", u"'", "IPA"),
+                         self.transcriptor.default_options)
+
+    def test_word_cache_key(self):
+        transcriptor = castillian.Transcriptor(word_cache_size=8)
+        self.assertEqual(transcriptor.transcribe_word(u"casa"), u"'ka.sa")
+        self.assertEqual(transcriptor.transcribe_word(
+            u"casa", syllabic_separator=u"-"), u"'ka-sa")
+
+
+class ThreadsTestCase(unittest.TestCase):
+
+    def hammer(self, transcriptor):
+        texts = corpus(50, seed=3)
+        reference = castillian.Transcriptor(lang="es")
+        expected = dict(((index, text), reference.transcribe(text, **kwargs))
+                        for index, kwargs in enumerate(OPTIONS)
+                        for text in texts)
+        failures = []
+
+        def worker(seed):
+            generator = random.Random(seed)
+            for _ in range(CALLS):
+                index = generator.randrange(len(OPTIONS))
+                text = generator.choice(texts)
+                result = transcriptor.transcribe(text, **OPTIONS[index])
+                if result != expected[index, text]:
+                    failures.append((text, OPTIONS[index], result))
+
+        threads = [threading.Thread(target=worker, args=(seed, ))
+                   for seed in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_rules(self):
+        self.hammer(castillian.Transcriptor(lang="es"))
+
+    def test_word_cache(self):
+        self.hammer(castillian.Transcriptor(lang="es", word_cache_size=64))
+
+    def test_transducer(self):
+        # The transducer is built lazily by whichever thread comes first
+        self.hammer(castillian.Transcriptor(lang="es", engine="fst"))
+
+    def test_syllable_table(self):
+        self.hammer(castillian.Transcriptor(lang="es", syllable_table=True))
+
+    @unittest.skipIf(vectorized.numpy is None, "numpy is not installed")
+    def test_vectorized(self):
+        # Batches with new letters grow the tables other batches read
+        transcriptor = castillian.Transcriptor(lang="es")
+        reference = castillian.Transcriptor(lang="es")
+        words = sorted(set(word for text in corpus(200, seed=4)
+                           for word in text.split()))
+        failures = []
+
+        def worker(seed):
+            generator = random.Random(seed)
+            for _ in range(CALLS):
+                batch = generator.sample(words, generator.randint(1, 20))
+                try:
+                    results = transcriptor.transcribe_words(batch)
+                except Exception as error:
+                    results = error
+                expected = [reference.transcribe_word(word)
+                            for word in batch]
+                if results != expected:
+                    failures.append((batch, results))
+
+        threads = [threading.Thread(target=worker, args=(seed, ))
+                   for seed in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 #/usr/bin/env python
 # -*- coding: utf-8 -*-
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 
+from stevens.exceptions import NotLanguageSupported
 from stevens.languages.es import castillian
 
 
@@ -98,6 +102,179 @@ class SpanishTestCase(unittest.TestCase):
         transcribed_text = transcriptor.find_stress(syllable_list)
         self.assertEqual(transcribed_text, 4)
 
+    def test_word_cache(self):
+        transcriptor = castillian.Transcriptor(word_cache_size=2)
+        syllables = []
+        get_syllables = transcriptor.get_syllables
+
+        def counting_get_syllables(word):
+            syllables.append(word)
+            return get_syllables(word)
+
+        transcriptor.get_syllables = counting_get_syllables
+        first = transcriptor.transcribe_word(u"casa")
+        second = transcriptor.transcribe_word(u"casa")
+        self.assertEqual(first, second)
+        self.assertEqual(syllables, [u"casa"])
+        info = transcriptor.word_cache_info()
+        self.assertEqual((info["hits"], info["misses"]), (1, 1))
+
+    def test_word_cache_stress_mark(self):
+        transcriptor = castillian.Transcriptor(word_cache_size=2)
+        first = transcriptor.transcribe_word(u"casa", stress_mark=u"ˈ")
+        second = transcriptor.transcribe_word(u"casa", stress_mark=u"'")
+        self.assertNotEqual(first, second)
+
+    def test_word_cache_eviction(self):
+        transcriptor = castillian.Transcriptor(word_cache_size=1)
+        transcriptor.transcribe_word(u"casa")
+        transcriptor.transcribe_word(u"mesa")
+        self.assertEqual(transcriptor.word_cache_info()["evictions"], 1)
+
+    def test_word_cache_disabled(self):
+        transcriptor = castillian.Transcriptor()
+        self.assertIsNone(transcriptor.word_cache_info())
+
+    def test_syllable_table(self):
+        transcriptor = castillian.Transcriptor(syllable_table=True)
+        rules_transcriptor = castillian.Transcriptor()
+        self.assertIsNone(rules_transcriptor.syllable_table)
+        for syllable in castillian.syllable_inventory():
+            for previous, next in ((None, None), (u"un", u"lo"),
+                                   (u"la", u"ga"), (u"tos", None)):
+                self.assertEqual(
+                    transcriptor.transcribe_syllable(syllable, previous,
+                                                     next),
+                    rules_transcriptor.transcribe_syllable(syllable,
+                                                           previous, next)
+                )
+
+    def test_syllable_table_rules(self):
+        # Transcriptors with other rules compile a default table of their
+        # own
+        class KTranscriptor(castillian.Transcriptor):
+            def _transcription_rules(self):
+                super(KTranscriptor, self)._transcription_rules()
+                self.rule(u"k")(lambda previous, next, index: u"q")
+
+        self.assertEqual(KTranscriptor(lang="es", syllable_table=True)
+                         .transcribe_word(u"kilo"), u"'qi.lo")
+        transcriptor = castillian.Transcriptor(lang="es", syllable_table=True)
+        self.assertEqual(transcriptor.transcribe_word(u"kilo"), u"'ki.lo")
+        self.assertIs(transcriptor.syllable_table, castillian.Transcriptor(
+            lang="es", syllable_table=True).syllable_table)
+
+    def test_syllable_table_fallback(self):
+        transcriptor = castillian.Transcriptor(syllable_table=True)
+        self.assertIsNone(transcriptor.syllable_table.lookup(None, u"bue",
+                                                             u"n"))
+        transcribed_text = transcriptor.transcribe_syllable(u"bue", u"una",
+                                                            u"na")
+        self.assertEqual(transcribed_text, u"βwe")
+
+    def test_syllable_table_save(self):
+        table = castillian.Transcriptor(syllable_table=True).syllable_table
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "syllables.json")
+            table.save(path)
+            transcriptor = castillian.Transcriptor(syllable_table=path)
+            self.assertEqual(len(transcriptor.syllable_table), len(table))
+            self.assertEqual(transcriptor.transcribe_syllable(u"ga", u"un"),
+                             u"ɡa")
+        finally:
+            shutil.rmtree(directory)
+
+    def test_iter_phrases(self):
+        transcriptor = castillian.Transcriptor()
+        chunks = [u"Hola, q", u"ué t", u"al. Bue", u"nos", u" días"]
+        phrases = list(transcriptor.iter_phrases(chunks))
+        self.assertEqual(phrases,
+                         transcriptor.get_phrases(u"".join(chunks)))
+
+    def test_rules_syllabification(self):
+        transcriptor = castillian.Transcriptor(hyphenation="rules")
+        transcribed_text = transcriptor.transcribe_word(u"prueba")
+        self.assertEqual(transcribed_text, u"'pɾwe.βa")
+
+    def test_instrument(self):
+        transcriptor = castillian.Transcriptor()
+        stats = transcriptor.instrument()
+        transcriptor.transcribe(u"Hola, qué tal")
+        summary = stats.summary()
+        self.assertEqual(summary["stages"]["transcribe"]["calls"], 1)
+        self.assertEqual(summary["stages"]["transcribe_phrase"]["calls"], 3)
+        self.assertEqual(summary["stages"]["transcribe_word"]["calls"], 3)
+        self.assertEqual(summary["rule_hits"][u"l"], 2)
+        self.assertEqual(summary["rule_hits"][u"a"], 2)
+
+    def test_instrument_syllable_table(self):
+        # The default table is compiled before the rules are counted
+        castillian._default_tables.clear()
+        transcriptor = castillian.Transcriptor(lang="es", syllable_table=True)
+        stats = transcriptor.instrument()
+        transcriptor.transcribe(u"whisky, kiwi")
+        summary = stats.summary()
+        # Only "whis" and "ky" are missing from the table
+        self.assertEqual(summary["rule_hits"], {u"w": 1, u"h": 1, u"i": 1,
+                                                u"s": 1, u"y": 1})
+        self.assertEqual(summary["stages"]["transcribe_syllable"]["calls"],
+                         4)
+
+    def test_instrument_callback(self):
+        transcriptor = castillian.Transcriptor()
+        events = []
+        transcriptor.instrument(callback=lambda stage, seconds:
+                                events.append(stage))
+        transcriptor.transcribe_word(u"casa")
+        self.assertEqual(events[-1], u"transcribe_word")
+        self.assertIn(u"get_syllables", events)
+
+    def test_uninstrument(self):
+        transcriptor = castillian.Transcriptor()
+        rules = transcriptor.rules
+        transcriptor.instrument()
+        transcriptor.uninstrument()
+        self.assertIsNone(transcriptor.stats)
+        self.assertIs(transcriptor.rules, rules)
+        self.assertNotIn("transcribe_word", vars(transcriptor))
+
+
+class DialectTestCase(unittest.TestCase):
+
+    def transcribe(self, lang, text):
+        return castillian.Transcriptor(lang=lang).transcribe(text)
+
+    def test_seseo(self):
+        self.assertEqual(self.transcribe("es", u"cinco"), u"'siɴ.ko")
+        self.assertEqual(self.transcribe("es_MX", u"zapato"),
+                         u"sa.'pa.to")
+
+    def test_distincion(self):
+        self.assertEqual(self.transcribe("es_ES", u"cinco"), u"'θiɴ.ko")
+        self.assertEqual(self.transcribe("es_ES", u"juzgar"), u"xuð.'ɣaɾ")
+
+    def test_yeismo(self):
+        self.assertEqual(self.transcribe("es", u"calle"), u"'ka.ʎe")
+        self.assertEqual(self.transcribe("es_ES", u"calle"), u"'ka.ʝe")
+        self.assertEqual(self.transcribe("es_AR", u"calle"), u"'ka.ʃe")
+        self.assertEqual(self.transcribe("es_AR", u"hoy"), u"oi")
+
+    def test_aspiration(self):
+        self.assertEqual(self.transcribe("es_AR", u"estos"), u"'eh.tos")
+
+    def test_shared_rules(self):
+        neutral = castillian.dialect_rules("es")
+        rules = castillian.dialect_rules("es_ES")
+        self.assertIs(rules[u"a"], neutral[u"a"])
+        self.assertIsNot(rules[u"c"], neutral[u"c"])
+        self.assertIs(castillian.Transcriptor(lang="es_ES").rules[u"c"],
+                      rules[u"c"])
+
+    def test_not_supported(self):
+        self.assertRaises(NotLanguageSupported, castillian.Transcriptor,
+                          lang="pt_BR")
+
 
 if __name__ == '__main__':
     unittest.main()
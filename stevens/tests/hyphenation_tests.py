@@ -0,0 +1,111 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from stevens.exceptions import NotLanguageSupported
+from stevens.hyphenation import (PATTERNS_PATH, compile_patterns,
+                                 get_hyphenator, parse_patterns)
+from stevens.languages.es.syllabification import ONSETS, Syllabifier
+from stevens.packed import PackedTrie, pack_trie, save_trie
+
+
+class PackedTrieTestCase(unittest.TestCase):
+
+    items = [(u"a", u"1"), (u"ab", u"2"), (u"abc", u"3"), (u"ñu", u"ñ"),
+             (u"b", u"")]
+
+    def test_get(self):
+        trie = PackedTrie(pack_trie(self.items))
+        for key, value in self.items:
+            self.assertEqual(trie.get(key), value)
+        self.assertIsNone(trie.get(u"abcd"))
+        self.assertIsNone(trie.get(u"ñ"))
+        self.assertEqual(len(trie), len(self.items))
+
+    def test_prefixes(self):
+        trie = PackedTrie(pack_trie(self.items))
+        self.assertEqual(list(trie.prefixes(u"xabcd", 1)),
+                         [(2, u"1"), (3, u"2"), (4, u"3")])
+
+    def test_items(self):
+        trie = PackedTrie(pack_trie(self.items))
+        self.assertEqual(list(trie.items()), sorted(self.items))
+
+    def test_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "items.trie")
+            save_trie(self.items, path)
+            trie = PackedTrie.load(path)
+            self.assertEqual(trie[u"ab"], u"2")
+            self.assertRaises(KeyError, trie.__getitem__, u"c")
+            trie.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+class LiangHyphenatorTestCase(unittest.TestCase):
+
+    def test_parse_patterns(self):
+        patterns = list(parse_patterns([u"% comment", u"1ba", u"b2l",
+                                        u".a1e"]))
+        self.assertEqual(patterns, [(u"ba", u"100"), (u"bl", u"020"),
+                                    (u".ae", u"0010")])
+
+    def test_bundled_patterns(self):
+        source = os.path.join(PATTERNS_PATH, "es.pat")
+        with open(os.path.join(PATTERNS_PATH, "es.trie"), "rb") as trie:
+            self.assertEqual(compile_patterns(source), trie.read())
+
+    def test_syllables(self):
+        hyphenator = get_hyphenator("es_ES")
+        words = {
+            u"prueba": [u"prue", u"ba"],
+            u"muchacho": [u"mu", u"cha", u"cho"],
+            u"instante": [u"ins", u"tan", u"te"],
+            u"extraordinario": [u"ex", u"tra", u"or", u"di", u"na", u"rio"],
+            u"país": [u"pa", u"ís"],
+            u"pingüino": [u"pin", u"güi", u"no"],
+            u"una": [u"u", u"na"],
+            u"hoy": [u"hoy"],
+        }
+        for word, syllables in words.items():
+            self.assertEqual(hyphenator.syllables(word), syllables)
+
+    def test_not_supported(self):
+        self.assertRaises(NotLanguageSupported, get_hyphenator, "xx_XX")
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, get_hyphenator, "es_ES", "xx")
+
+
+class SyllabifierTestCase(unittest.TestCase):
+
+    def test_syllables(self):
+        syllabifier = get_hyphenator("es_ES", backend="rules")
+        self.assertIsInstance(syllabifier, Syllabifier)
+        words = [u"a-mor", u"mu-cha-cho", u"ca-lle", u"pe-rro",
+                 u"cons-truc-ción", u"obs-tá-cu-lo", u"ex-tra-or-di-na-rio",
+                 u"pa-ís", u"bú-ho", u"pin-güi-no", u"a-ve-ri-guáis",
+                 u"chi-i-ta", u"a-yer", u"rey", u"hoy", u"y"]
+        for word in words:
+            syllables = word.split(u"-")
+            self.assertEqual(syllabifier.syllables(u"".join(syllables)),
+                             syllables)
+
+    def test_onsets(self):
+        self.assertEqual(Syllabifier().syllables(u"atleta"),
+                         [u"at", u"le", u"ta"])
+        american = Syllabifier(onsets=ONSETS | set([u"tl"]))
+        self.assertEqual(american.syllables(u"atleta"),
+                         [u"a", u"tle", u"ta"])
+
+    def test_empty(self):
+        self.assertEqual(Syllabifier().syllables(u""), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+
+from stevens import transcriber
+from stevens.exceptions import NotLanguageSupported
+from stevens.identification import UNDETERMINED, Identifier, pin_language
+
+
+class IdentifierTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.identifier = Identifier()
+
+    def test_prefilter(self):
+        prefilter = self.identifier.prefilter
+        self.assertEqual(prefilter(u"El perro corre por el parque todos "
+                                   u"los días"), "es")
+        self.assertEqual(prefilter(u"¿Qué?"), "es")
+        self.assertEqual(prefilter(u"Mañana"), "es")
+        self.assertEqual(prefilter(u"This is a test of the house that we "
+                                   u"have in the village"), "en")
+        self.assertEqual(prefilter(u"Questo è un test della casa che "
+                                   u"abbiamo nel paese"), "it")
+        self.assertEqual(prefilter(u"Привет, как дела у тебя сегодня"),
+                         UNDETERMINED)
+
+    def test_short_texts(self):
+        self.assertEqual(self.identifier.identify(u"hola"), "es")
+        self.assertEqual(self.identifier.identify(u"ok 123"), "es")
+
+    def test_not_supported(self):
+        self.assertRaises(NotLanguageSupported, self.identifier.identify,
+                          u"This is a test of the house that we have in "
+                          u"the village")
+
+    def test_cache(self):
+        text = u"Esto es una prueba de la casa que tenemos en el pueblo"
+        self.identifier.identify(text)
+        self.identifier.identify(text)
+        info = self.identifier.cache_info()
+        self.assertEqual((info["hits"], info["misses"]), (1, 1))
+
+    def test_identify_many(self):
+        texts = [u"Esto es una prueba de la casa que tenemos en el pueblo",
+                 u"This is a test of the house that we have in the village",
+                 u"Esto es una prueba de la casa que tenemos en el pueblo"]
+        self.assertEqual(self.identifier.identify_many(texts),
+                         ["es", None, "es"])
+        self.assertEqual(self.identifier.cache_info()["size"], 2)
+
+    def test_concurrent_misses(self):
+        # Texts missing the cache are classified at the same time
+        both = threading.Event()
+        inside = []
+        waited = []
+        classify = self.identifier.classify
+
+        def blocking_classify(text):
+            inside.append(text)
+            if len(inside) == 2:
+                both.set()
+            # Only set in time if the other thread is not kept out
+            waited.append(both.wait(2))
+            return classify(text)
+
+        self.identifier.classify = blocking_classify
+        texts = [u"El perro corre por el parque todos los días",
+                 u"La casa tiene una puerta de madera muy vieja"]
+        threads = [threading.Thread(target=self.identifier.identify,
+                                    args=(text, )) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(waited, [True, True])
+        self.assertEqual(self.identifier.cache_info()["size"], 2)
+
+    def test_pin(self):
+        english = u"This is a test of the house that we have in the village"
+        self.identifier.pin("es")
+        self.assertEqual(self.identifier.identify(english), "es")
+        self.assertEqual(self.identifier.identify_many([english]), ["es"])
+        self.assertEqual(self.identifier.cache_info()["misses"], 0)
+        self.identifier.pin(None)
+        self.assertRaises(NotLanguageSupported, self.identifier.identify,
+                          english)
+        self.assertRaises(NotLanguageSupported, self.identifier.pin, "en")
+
+    def test_pin_dialect(self):
+        english = u"This is a test of the house that we have in the village"
+        self.identifier.pin("es_ES")
+        self.assertEqual(self.identifier.identify(english), "es_ES")
+        self.identifier.pin("es-mx")
+        self.assertEqual(self.identifier.identify_many([english]),
+                         ["es-mx"])
+        self.assertRaises(NotLanguageSupported, self.identifier.pin, "en_US")
+
+    def test_dialect_languages(self):
+        identifier = Identifier(languages=("es_AR", ))
+        spanish = u"Esto es una prueba de la casa que tenemos en el pueblo"
+        self.assertEqual(identifier.identify(spanish), "es_AR")
+        self.assertEqual(identifier.identify(u"hola"), "es_AR")
+        self.assertEqual(identifier.identify_many([spanish]), ["es_AR"])
+
+    def test_transcribe_pinned_dialect(self):
+        text = u"La cena del cazador"
+        pin_language("es_ES")
+        try:
+            self.assertEqual(transcriber.transcribe(text),
+                             transcriber.transcribe(text, lang="es_ES"))
+        finally:
+            pin_language(None)
+
+    def test_transcribe_auto_lang(self):
+        text = u"El perro corre por el parque todos los días"
+        self.assertEqual(transcriber.transcribe(text),
+                         transcriber.transcribe(text, lang="es"))
+
+
+if __name__ == '__main__':
+    unittest.main()
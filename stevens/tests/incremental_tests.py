@@ -0,0 +1,104 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import unittest
+
+from stevens.incremental import IncrementalTranscription
+from stevens.languages.es import castillian
+from stevens.tests.transducer_tests import corpus
+
+
+class IncrementalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transcriptor = castillian.Transcriptor()
+
+    def test_random_edits(self):
+        generator = random.Random(4)
+        pieces = corpus(200, seed=4) + [u", ", u". ", u" ", u"¿", u"!", u""]
+        document = IncrementalTranscription(self.transcriptor,
+                                            u". ".join(corpus(8, seed=5)))
+        for _ in range(100):
+            text = document.text
+            start = generator.randint(0, len(text))
+            end = min(len(text), start + generator.randint(0, 12))
+            document.edit(start, end, generator.choice(pieces))
+            self.assertEqual(document.transcription,
+                             self.transcriptor.transcribe(document.text))
+
+    def test_lazy_offsets(self):
+        # Edits far apart and close together, checked only now and then
+        generator = random.Random(9)
+        pieces = corpus(100, seed=9) + [u", ", u". ", u" ", u"¿", u""]
+        text = u". ".join(corpus(30, seed=10))
+        document = IncrementalTranscription(self.transcriptor, text)
+        start = 0
+        for step in range(200):
+            if step % 3:
+                start = generator.randint(0, len(text))
+            else:
+                start = min(len(text), start + generator.randint(0, 4))
+            end = min(len(text), start + generator.randint(0, 8))
+            piece = generator.choice(pieces)
+            document.edit(start, end, piece)
+            text = text[:start] + piece + text[end:]
+            if step % 20 == 19:
+                fresh = IncrementalTranscription(self.transcriptor, text)
+                self.assertEqual(document.text, text)
+                self.assertEqual(document.spans(), fresh.spans())
+                self.assertEqual(document.transcription,
+                                 fresh.transcription)
+
+    def test_symbols(self):
+        # Symbols that are neither words nor pauses are skipped, like
+        # `transcribe` does, instead of becoming empty phrases
+        text = u"«Hola» - dijo él."
+        document = IncrementalTranscription(self.transcriptor, text)
+        self.assertEqual(document.transcription,
+                         self.transcriptor.transcribe(text))
+        generator = random.Random(7)
+        pieces = corpus(50, seed=7) + [u"«", u"»", u" - ", u"'", u"\"",
+                                       u", ", u". ", u" ", u"¿", u""]
+        for _ in range(80):
+            text = document.text
+            start = generator.randint(0, len(text))
+            end = min(len(text), start + generator.randint(0, 6))
+            document.edit(start, end, generator.choice(pieces))
+            self.assertEqual(document.transcription,
+                             self.transcriptor.transcribe(document.text))
+
+    def test_patch(self):
+        document = IncrementalTranscription(self.transcriptor,
+                                            u"uno dos, tres. Cuatro")
+        self.assertEqual(len(document), 4)
+        patch = document.edit(9, 13, u"seis")
+        self.assertEqual((patch.start, patch.stop), (2, 3))
+        self.assertEqual(patch.phrases,
+                         [self.transcriptor.transcribe(u"seis")])
+        # Removing a separator joins the phrases around it
+        patch = document.edit(3, 4, u"")
+        self.assertEqual((patch.start, patch.stop), (0, 2))
+        self.assertEqual(document.spans()[0], (0, 6))
+        self.assertEqual(document.text, u"unodos, seis. Cuatro")
+
+    def test_update(self):
+        document = IncrementalTranscription(self.transcriptor, u"hola")
+        patch = document.update(u"hola, qué tal")
+        self.assertEqual(patch.start, 0)
+        self.assertEqual(document.transcription,
+                         self.transcriptor.transcribe(u"hola, qué tal"))
+        text = u". ".join(corpus(40, seed=6))
+        document.update(text)
+        middle = text.index(u". ", len(text) // 2) + 2
+        patch = document.update(text[:middle] + u"Nuevo" + text[middle:])
+        self.assertEqual(patch.stop - patch.start, 1)
+        self.assertEqual(document.transcription,
+                         self.transcriptor.transcribe(document.text))
+        document.update(u"")
+        self.assertEqual(document.transcription, u"")
+        self.assertEqual(len(document), 0)
+        self.assertRaises(IndexError, document.edit, 0, 1, u"a")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from stevens.languages.es import castillian
+from stevens.lexicon import (Lexicon, compile_lexicon, get_lexicon,
+                             read_lexicon)
+
+
+class LexiconTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.lexicon = Lexicon.from_entries([(u"whisky", u"'wis.ki"),
+                                             (u"onu", u"'o.nu"),
+                                             (u"ok", u"o.'kej")])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with io.open(path, "w", encoding="utf-8") as lexicon_file:
+            lexicon_file.write(text)
+        return path
+
+    def test_lookup(self):
+        self.assertEqual(len(self.lexicon), 3)
+        self.assertIn(u"onu", self.lexicon)
+        self.assertNotIn(u"on", self.lexicon)
+        self.assertNotIn(u"", self.lexicon)
+        self.assertEqual(self.lexicon.syllables(u"whisky"),
+                         ([u"wis", u"ki"], 0))
+        self.assertEqual(self.lexicon.transcribe(u"ok"), u"o.'kej")
+        self.assertEqual(self.lexicon.transcribe(u"ok", u"ˈ", u"-"),
+                         u"o-ˈkej")
+        self.assertIsNone(self.lexicon.transcribe(u"casa"))
+
+    def test_read(self):
+        path = self.write("lexicon.txt", u"# Comment\n"
+                                         u"Jazz  'ʝas  # loanword\n\n")
+        self.assertEqual(list(read_lexicon(path)), [(u"jazz", u"'ʝas")])
+        self.assertEqual(Lexicon.load(path).get(u"jazz"), u"'ʝas")
+        path = self.write("malformed.txt", u"jazz\n")
+        self.assertRaises(ValueError, list, read_lexicon(path))
+
+    def test_compile(self):
+        transcriptor = castillian.Transcriptor(lang="es", lexicon=None)
+        path = os.path.join(self.directory, "lexicon.lex")
+        compile_lexicon(path, [[(u"casa", u"'ka.za")]], transcriptor,
+                        [u"casa", u"perro"])
+        lexicon = Lexicon.load(path)
+        self.assertEqual(lexicon.get(u"perro"),
+                         transcriptor.transcribe_word(u"perro"))
+        # Entries of the sources win over the rules
+        self.assertEqual(lexicon.get(u"casa"), u"'ka.za")
+        lexicon.close()
+
+    def test_bundled(self):
+        lexicon = get_lexicon("es")
+        self.assertIs(lexicon, get_lexicon("es_MX"))
+        self.assertEqual(lexicon.get(u"whisky"), u"'wis.ki")
+        # Dialects that pronounce entries differently have their own
+        self.assertEqual(get_lexicon("es_ES").get(u"pc"), u"pe.'θe")
+        self.assertEqual(get_lexicon("es_AR").get(u"whisky"), u"'wih.ki")
+        self.assertIsNone(get_lexicon("es_XX"))
+        self.assertIsNone(get_lexicon("xx"))
+
+
+class TranscriptorLexiconTestCase(unittest.TestCase):
+
+    def test_exceptions(self):
+        transcriptor = castillian.Transcriptor(lang="es", lexicon=True)
+        self.assertEqual(transcriptor.transcribe(u"Un whisky, ok"),
+                         u"un/'wis.ki/o.'kej")
+        self.assertEqual(transcriptor.transcribe_word(
+            u"whisky", stress_mark=u"ˈ", syllabic_separator=u"-"),
+            u"ˈwis-ki")
+        word = transcriptor.analyze(u"whisky").iter_words()
+        self.assertEqual(next(word).render(), u"'wis.ki")
+
+    def test_engines(self):
+        text = u"El software de la pizzería en México"
+        self.assertEqual(
+            castillian.Transcriptor(lang="es", engine="fst",
+                                    lexicon=True).transcribe(text),
+            castillian.Transcriptor(lang="es", lexicon=True).transcribe(text))
+
+    def test_dialects(self):
+        # Entries agree with the rules of the dialect around them
+        text = u"cinco pc, cd"
+        self.assertEqual(
+            castillian.Transcriptor(lang="es_ES",
+                                    lexicon=True).transcribe(text),
+            u"'θiɴ.ko/pe.'θe/θe.'ðe")
+        self.assertEqual(
+            castillian.Transcriptor(lang="es", lexicon=True).transcribe(text),
+            u"'siɴ.ko/pe.'se/se.'ðe")
+
+    def test_disabled(self):
+        # Lexicons are only looked up when asked for
+        transcriptor = castillian.Transcriptor(lang="es")
+        self.assertIsNone(transcriptor.lexicon)
+        self.assertNotEqual(transcriptor.transcribe_word(u"whisky"),
+                            u"'wis.ki")
+        self.assertNotEqual(
+            transcriptor.fingerprint(),
+            castillian.Transcriptor(lang="es", lexicon=True).fingerprint())
+
+    def test_custom(self):
+        lexicon = Lexicon.from_entries([(u"casa", u"'ka.za")])
+        transcriptor = castillian.Transcriptor(lang="es", lexicon=lexicon)
+        self.assertEqual(transcriptor.transcribe(u"casa whisky"),
+                         u"'ka.za/w.'iskʝ")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from stevens.languages.es import castillian
+from stevens.result import PhoneInventory
+from stevens.tests.transducer_tests import corpus
+
+
+class TranscriptionTestCase(unittest.TestCase):
+
+    def test_render(self):
+        transcriptor = castillian.Transcriptor()
+        for text in corpus(300, seed=3) + [u"", u"¿Qué tal?  Bien, ¡gracias!",
+                                            u"Ayer\tllovió.\n"]:
+            transcription = transcriptor.analyze(text)
+            self.assertEqual(transcription.render(),
+                             transcriptor.transcribe(text))
+
+    def test_words(self):
+        text = u"¿Qué tal?  Bien, gracias"
+        transcriptor = castillian.Transcriptor()
+        transcription = transcriptor.analyze(text)
+        words = list(transcription.iter_words())
+        self.assertEqual([word.text for word in words],
+                         [u"Qué", u"tal", u"Bien", u"gracias"])
+        self.assertEqual(words[2].span, (11, 15))
+        self.assertEqual(words[3].syllables, [(u"ɡ", u"ɾ", u"a"),
+                                               (u"θ", u"j", u"a", u"s")])
+        self.assertEqual(words[3].stress, 0)
+        self.assertEqual(words[3].render(), u"'ɡɾa.θjas")
+        self.assertEqual(words[1].stress, None)
+
+    def test_slicing(self):
+        transcriptor = castillian.Transcriptor(word_separator=u"|")
+        transcription = transcriptor.analyze(u"uno dos, tres")
+        self.assertEqual(len(transcription), 3)
+        last = transcription[-1]
+        self.assertIs(last.phones, transcription.phones)
+        self.assertEqual(last.render(), u"tɾes")
+        self.assertEqual(last.span, (9, 13))
+        self.assertEqual(transcription[1:].render(), u"dos/tɾes")
+        self.assertEqual(transcription[3:].render(), u"")
+        self.assertEqual(len(transcription[3:]), 0)
+        self.assertEqual(
+            [transcription.inventory[phone_id]
+             for phone_id in last.phone_ids()],
+            [u"t", u"ɾ", u"e", u"s"])
+        self.assertRaises(IndexError, lambda: transcription[3])
+        self.assertEqual(transcription.render(stress_mark=u"ˈ",
+                                              phrase_separator=u" "),
+                         u"ˈu.no dos tɾes")
+
+    def test_inventory(self):
+        inventory = PhoneInventory()
+        self.assertEqual(inventory.intern(u"β"), 0)
+        self.assertEqual(inventory.intern(u"a"), 1)
+        self.assertEqual(inventory.intern(u"β"), 0)
+        self.assertEqual(inventory[1], u"a")
+        self.assertEqual(len(inventory), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from stevens.languages.es import castillian
+from stevens.rules import (EDGE, ConflictingRules, Rule, RuleError,
+                           UnreachableRule, compile_rules, letters)
+
+
+class CompileRulesTestCase(unittest.TestCase):
+
+    def test_specificity(self):
+        # Declaration order does not matter, the narrower context wins
+        rules = compile_rules([
+            Rule(u"n", u"ɴ"),
+            Rule(u"n", u"m", right=u"bp"),
+            Rule(u"n", u"n", right=letters(EDGE, u"aeiou")),
+        ])
+        self.assertEqual(rules[u"n"](u"a", u"b", 1), u"m")
+        self.assertEqual(rules[u"n"](u"a", u"a", 1), u"n")
+        self.assertEqual(rules[u"n"](u"a", None, 1), u"n")
+        self.assertEqual(rules[u"n"](u"a", u"k", 1), u"ɴ")
+
+    def test_priority(self):
+        rules = compile_rules([
+            Rule(u"g", u"x", right=u"ie", priority=1),
+            Rule(u"g", u"ɡ", left=EDGE),
+            Rule(u"g", u"ɣ"),
+        ])
+        self.assertEqual(rules[u"g"](None, u"e", 0), u"x")
+        self.assertEqual(rules[u"g"](None, u"a", 0), u"ɡ")
+        self.assertEqual(rules[u"g"](u"a", u"a", 1), u"ɣ")
+
+    def test_index(self):
+        rules = compile_rules([Rule(u"x", u"x", index=0),
+                               Rule(u"x", u"ks")])
+        self.assertEqual(rules[u"x"](None, u"e", 0), u"x")
+        self.assertEqual(rules[u"x"](u"e", None, 2), u"ks")
+
+    def test_conflict(self):
+        self.assertRaises(ConflictingRules, compile_rules, [
+            Rule(u"y", u"i", left=u"o"),
+            Rule(u"y", u"ʝ", right=u"a"),
+            Rule(u"y", u"j"),
+        ])
+
+    def test_same_outputs_do_not_conflict(self):
+        rules = compile_rules([Rule(u"c", u"k", left=u"a"),
+                               Rule(u"c", u"k", right=u"a"),
+                               Rule(u"c", u"s")])
+        self.assertEqual(rules[u"c"](u"a", u"a", 1), u"k")
+
+    def test_unreachable(self):
+        self.assertRaises(UnreachableRule, compile_rules,
+                          [Rule(u"ch", u"ʧ")])
+        self.assertRaises(UnreachableRule, compile_rules,
+                          [Rule(u"b", u"b", left=u"")])
+        # The second rule is covered by the more specific first one
+        self.assertRaises(UnreachableRule, compile_rules, [
+            Rule(u"s", u"z", right=u"bd"),
+            Rule(u"s", u"s", right=u"bd", priority=-1),
+            Rule(u"s", u"s"),
+        ])
+
+    def test_missing_context(self):
+        self.assertRaises(RuleError, compile_rules,
+                          [Rule(u"d", u"d", left=EDGE)])
+
+
+class CastillianRulesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = castillian.Transcriptor(lang="es").rules
+
+    def test_every_letter(self):
+        self.assertEqual(sorted(self.rules),
+                         sorted(set(rule.target for rule in castillian.RULES)))
+
+    def test_allophones(self):
+        rules = self.rules
+        self.assertEqual(rules[u"b"](None, u"a", 0), u"b")
+        self.assertEqual(rules[u"b"](u"a", u"a", 1), u"β")
+        self.assertEqual(rules[u"d"](u"l", u"a", 0), u"d")
+        self.assertEqual(rules[u"d"](u"a", u"a", 1), u"ð")
+        self.assertEqual(rules[u"n"](u"a", u"f", 1), u"ɱ")
+        self.assertEqual(rules[u"n"](u"a", u"g", 1), u"ŋ")
+        self.assertEqual(rules[u"r"](u"n", u"a", 0), u"r")
+        self.assertEqual(rules[u"r"](u"a", u"a", 1), u"ɾ")
+        self.assertEqual(rules[u"s"](u"a", u"m", 1), u"z")
+        self.assertEqual(rules[u"y"](None, None, 0), u"i")
+        self.assertEqual(rules[u"y"](u"o", None, 1), u"i")
+        self.assertEqual(rules[u"y"](u"a", u"a", 1), u"ʝ")
+
+    def test_transcription(self):
+        transcriptor = castillian.Transcriptor(lang="es")
+        self.assertEqual(transcriptor.transcribe(u"gente"), u"'xen.te")
+        self.assertEqual(transcriptor.transcribe(u"un vaso"),
+                         u"un/'ba.so")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from stevens.languages.es import castillian
+from stevens.search import PhoneticIndex, edit_distance, ngrams, rhyme
+
+
+WORDS = (u"casa caza masa pasa cosa casas vaso baso vasco canción acción "
+         u"perro pero corazón razón mesa").split()
+
+
+class SearchFunctionsTestCase(unittest.TestCase):
+
+    def test_rhyme(self):
+        self.assertEqual(rhyme([u"ka", u"sa"], 0), u"asa")
+        self.assertEqual(rhyme([u"ko", u"ɾa", u"θon"], 2), u"on")
+        self.assertEqual(rhyme([u"pan"], None), u"an")
+        self.assertEqual(rhyme([], None), u"")
+
+    def test_ngrams(self):
+        self.assertEqual(ngrams(u"pan", 2),
+                         set([u"^p", u"pa", u"an", u"n$"]))
+        self.assertEqual(len(ngrams(u"pan")), 5)
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance(u"kasa", u"kasa"), 0)
+        self.assertEqual(edit_distance(u"kasa", u"kosa"), 1)
+        self.assertEqual(edit_distance(u"kasa", u"kasas"), 1)
+        self.assertEqual(edit_distance(u"pero", u"kasa"), 4)
+        self.assertEqual(edit_distance(u"pero", u"kasa", 1), 2)
+
+
+class PhoneticIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "index.sqlite")
+        self.transcriptor = castillian.Transcriptor(lang="es_ES")
+        self.index = PhoneticIndex(self.path, self.transcriptor)
+        self.index.add(WORDS)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_entries(self):
+        self.assertEqual(len(self.index), len(WORDS))
+        self.assertIn(u"casa", self.index)
+        entry = self.index.get(u"casa")
+        self.assertEqual(entry.transcription,
+                         self.transcriptor.transcribe_word(u"casa"))
+        self.assertEqual((entry.phones, entry.rhyme), (u"kasa", u"asa"))
+        self.assertIsNone(self.index.get(u"perra"))
+        self.assertEqual(self.index.lookup(u"perra").rhyme, u"era")
+
+    def test_rhymes(self):
+        self.assertEqual(self.index.rhymes(u"casa"), [u"masa", u"pasa"])
+        self.assertEqual(self.index.rhymes(u"casa", limit=1), [u"masa"])
+        # Words missing from the index are transcribed to be queried
+        self.assertEqual(self.index.rhymes(u"tasa"),
+                         [u"casa", u"masa", u"pasa"])
+        self.assertEqual(self.index.rhymes(u"razón"), [u"corazón"])
+
+    def test_homophones(self):
+        self.assertEqual(self.index.homophones(u"vaso"), [u"baso"])
+        self.assertEqual(self.index.homophones(u"casa"), [])
+
+    def test_similar(self):
+        self.assertEqual(self.index.similar(u"casa"), [
+            (u"casas", 1), (u"caza", 1), (u"cosa", 1), (u"masa", 1),
+            (u"pasa", 1)])
+        self.assertEqual(self.index.similar(u"vaso", 0), [(u"baso", 0)])
+        self.assertIn((u"pero", 1), self.index.similar(u"perro", 2))
+        # Too short a query to filter by bigrams
+        self.assertEqual(self.index.similar(u"pero", 3)[0], (u"perro", 1))
+
+    def test_similar_scan(self):
+        # Filtering by n-grams finds the same words as comparing them all
+        for word in WORDS:
+            phones = self.index.get(word).phones
+            for distance in range(4):
+                expected = sorted(
+                    (other, edit_distance(phones,
+                                          self.index.get(other).phones))
+                    for other in WORDS if other != word)
+                expected = [(other, found) for other, found in expected
+                            if found <= distance]
+                self.assertEqual(sorted(self.index.similar(word, distance)),
+                                 expected)
+
+    def test_incremental(self):
+        self.assertEqual(self.index.add([u"casa", u"tasa", u"tasa"]), 1)
+        self.index.close()
+        index = PhoneticIndex(self.path, self.transcriptor)
+        self.assertEqual(len(index), len(WORDS) + 1)
+        self.assertEqual(index.rhymes(u"casa"), [u"masa", u"pasa", u"tasa"])
+        index.close()
+        # Queries of indexed words need no transcriptor
+        index = PhoneticIndex(self.path)
+        self.assertEqual(index.homophones(u"baso"), [u"vaso"])
+        self.assertRaises(ValueError, index.rhymes, u"nube")
+        index.close()
+
+    def test_fingerprint(self):
+        self.assertRaises(ValueError, PhoneticIndex, self.path,
+                          castillian.Transcriptor(lang="es_AR"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from stevens import transcriber
+from stevens.languages.es import castillian
+from stevens.shared import WordTable, prefork, table_directory, table_path
+
+
+WORDS = [u"casa", u"perro", u"calle", u"cinco", u"gracias", u"hola"]
+
+
+class WordTableTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transcriptor = castillian.Transcriptor()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_build(self):
+        table = WordTable.build(self.transcriptor, WORDS)
+        self.assertEqual(len(table), len(WORDS))
+        self.assertEqual(table.fingerprint, self.transcriptor.fingerprint())
+        for word in WORDS:
+            self.assertEqual(table.get(word),
+                             self.transcriptor.transcribe_word(word))
+        self.assertIsNone(table.get(u"mesa"))
+        self.assertIsNone(table.get(u""))
+
+    def test_attach(self):
+        text = u"Hola, la casa del perro está en la calle cinco"
+        expected = self.transcriptor.transcribe(text)
+        path = os.path.join(self.directory, "words")
+        table = WordTable.build(self.transcriptor, WORDS, path)
+        self.assertTrue(os.path.exists(path))
+        transcriptor = castillian.Transcriptor()
+        transcriptor.set_word_table(WordTable.load(path))
+        self.assertEqual(transcriptor.transcribe(text), expected)
+        self.assertEqual(transcriptor.transcribe_word(u"casa",
+                                                      stress_mark=u"ˈ"),
+                         u"ˈka.sa")
+        table.close()
+        transcriptor.word_table.close()
+
+    def test_other_transcriptor(self):
+        table = WordTable.build(self.transcriptor, WORDS)
+        transcriptor = castillian.Transcriptor(lang="es_AR")
+        self.assertRaises(ValueError, transcriptor.set_word_table, table)
+
+    def test_table_mode(self):
+        # Workers running as other users can read the table
+        path = os.path.join(self.directory, "words")
+        WordTable.build(self.transcriptor, WORDS, path).close()
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+
+
+class PreforkTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        transcriber.clear_cache()
+
+    def tearDown(self):
+        transcriber.clear_cache()
+        shutil.rmtree(self.directory)
+
+    def test_prefork(self):
+        transcriptor, = prefork(["es_ES"], words=WORDS,
+                                directory=self.directory, freeze=False,
+                                identification=False)
+        self.assertIs(transcriptor, transcriber.get_transcriptor("es_ES"))
+        self.assertEqual(len(transcriptor.word_table), len(WORDS))
+        self.assertTrue(os.path.exists(table_path(transcriptor,
+                                                  self.directory)))
+        transcriptor.word_table.close()
+        transcriptor.set_word_table(None)
+
+    def test_prefork_words(self):
+        # Tables of other words are rebuilt rather than reused
+        options = dict(directory=self.directory, freeze=False,
+                       identification=False)
+        transcriptor, = prefork(["es_ES"], words=WORDS, **options)
+        transcriptor.word_table.close()
+        transcriptor.set_word_table(None)
+        transcriptor, = prefork(["es_ES"], words=[u"mesa", u"casa"],
+                                **options)
+        table = transcriptor.word_table
+        self.assertEqual(len(table), 2)
+        self.assertIsNotNone(table.get(u"mesa"))
+        self.assertIsNone(table.get(u"perro"))
+        table.close()
+        transcriptor.set_word_table(None)
+
+    def test_prefork_writable(self):
+        # Tables other users could have tampered with are rebuilt
+        options = dict(directory=self.directory, freeze=False,
+                       identification=False)
+        transcriptor, = prefork(["es_ES"], words=WORDS, **options)
+        transcriptor.word_table.close()
+        transcriptor.set_word_table(None)
+        path = table_path(transcriptor, self.directory)
+        os.chmod(path, 0o666)
+        transcriptor, = prefork(["es_ES"], words=WORDS, **options)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+        transcriptor.word_table.close()
+        transcriptor.set_word_table(None)
+
+    def test_table_directory(self):
+        directory = table_directory()
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+        self.assertEqual(os.stat(directory).st_uid, os.getuid())
+        self.assertEqual(table_directory(), directory)
+        transcriptor = castillian.Transcriptor()
+        self.assertEqual(os.path.dirname(table_path(transcriptor)),
+                         directory)
+        os.chmod(directory, 0o777)
+        try:
+            self.assertRaises(OSError, table_directory)
+        finally:
+            os.chmod(directory, 0o700)
+
+
+if __name__ == '__main__':
+    unittest.main()
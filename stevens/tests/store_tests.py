@@ -0,0 +1,147 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import gc
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from stevens import transcriber
+from stevens.languages.es import castillian
+from stevens import store as store_module
+from stevens.store import TranscriptionStore, fingerprint, read_word_list
+
+
+FINGERPRINT = ("from stevens.languages.es import castillian; "
+               "print(castillian.Transcriptor().fingerprint())")
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "store.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fingerprint(self):
+        transcriptor = castillian.Transcriptor()
+        self.assertEqual(fingerprint(transcriptor),
+                         castillian.Transcriptor().fingerprint())
+        self.assertNotEqual(
+            fingerprint(transcriptor),
+            fingerprint(castillian.Transcriptor(syllabic_separator=u"-")))
+        changed = castillian.Transcriptor()
+
+        @changed.rule(u"v")
+        def transcribe_v(previous, next, index):
+            return u"v"
+
+        self.assertNotEqual(fingerprint(transcriptor), fingerprint(changed))
+
+    def test_fingerprint_options(self):
+        # Only what the output depends on is fingerprinted
+        transcriptor = castillian.Transcriptor()
+        self.assertEqual(
+            fingerprint(transcriptor),
+            fingerprint(castillian.Transcriptor(engine="fst",
+                                                word_cache_size=8,
+                                                syllable_table=True)))
+        for options in (dict(lang="es"), dict(alphabet="xsampa"),
+                        dict(lexicon=True), dict(hyphenation="rules")):
+            self.assertNotEqual(
+                fingerprint(transcriptor),
+                fingerprint(castillian.Transcriptor(**options)))
+
+    def test_fingerprint_across_processes(self):
+        fingerprints = set()
+        for seed in ("1", "2"):
+            environment = dict(os.environ, PYTHONHASHSEED=seed)
+            output = subprocess.check_output(
+                [sys.executable, "-c", FINGERPRINT], env=environment)
+            fingerprints.add(output.strip())
+        self.assertEqual(len(fingerprints), 1)
+
+    def test_persistence(self):
+        text = u"Esto es una prueba, otra prueba"
+        transcriptor = castillian.Transcriptor(store=self.path)
+        expected = castillian.Transcriptor().transcribe(text)
+        self.assertEqual(transcriptor.transcribe(text), expected)
+        transcriptor.store.close()
+        stored = castillian.Transcriptor(store=self.path)
+        calls = []
+
+        def _transcribe_word(*args):
+            calls.append(args)
+
+        stored._transcribe_word = _transcribe_word
+        self.assertEqual(stored.transcribe(text), expected)
+        self.assertEqual(calls, [])
+        self.assertEqual(stored.store.stats()["hits"], 6)
+        fst = castillian.Transcriptor(store=self.path, engine="fst")
+        self.assertEqual(fst.transcribe(text), expected)
+
+    def test_eviction(self):
+        store = TranscriptionStore(self.path, maxsize=5, batch_size=1)
+        for index in range(10):
+            store.put(u"fingerprint", (u"word", index), u"output")
+        stats = store.stats()
+        self.assertEqual(stats["size"], 5)
+        self.assertEqual(stats["evictions"], 5)
+        self.assertEqual(store.get(u"fingerprint", (u"word", 9)), u"output")
+        self.assertEqual(store.get(u"fingerprint", (u"word", 0)), None)
+        store.clear()
+        self.assertEqual(len(store), 0)
+
+    @unittest.skipIf(sys.version_info < (3, 3), "No sqlite3 trace callback")
+    def test_flush_count(self):
+        # Entries are counted once, not on every flush
+        store = TranscriptionStore(self.path, maxsize=5, batch_size=1)
+        statements = []
+        store._connect().set_trace_callback(statements.append)
+        for index in range(10):
+            store.put(u"fingerprint", (u"word", index), u"output")
+        self.assertEqual(len([statement for statement in statements
+                              if u"COUNT" in statement]), 1)
+        self.assertEqual(store.stats()["size"], 5)
+        self.assertEqual(store.evictions, 5)
+
+    def test_open_stores(self):
+        # Stores are flushed at exit while open, and not kept alive for it
+        store = TranscriptionStore(self.path)
+        self.assertIn(store, store_module._open_stores)
+        store.put(u"fingerprint", (u"word", ), u"output")
+        store.close()
+        self.assertNotIn(store, store_module._open_stores)
+        self.assertEqual(len(TranscriptionStore(self.path)), 1)
+        gc.collect()
+        count = len(store_module._open_stores)
+        TranscriptionStore(self.path)
+        gc.collect()
+        self.assertEqual(len(store_module._open_stores), count)
+
+    def test_populate(self):
+        path = os.path.join(self.directory, "words.txt")
+        with io.open(path, "w", encoding="utf-8") as word_list:
+            word_list.write(u"casa 10\nÁrbol 300\nperro 42\n")
+        words = read_word_list(path)
+        self.assertEqual(words, [u"árbol", u"perro", u"casa"])
+        self.assertEqual(read_word_list(path, limit=1), [u"árbol"])
+        transcriptor = castillian.Transcriptor(store=self.path)
+        self.assertEqual(transcriptor.store.populate(transcriptor, words), 3)
+        self.assertEqual(len(transcriptor.store), 3)
+
+    def test_transcribe_many(self):
+        texts = [u"hola", u"qué tal", u"hola otra vez"] * 10
+        results = list(transcriber.transcribe_many(
+            texts, workers=2, chunksize=4, store=self.path))
+        self.assertEqual(results, list(transcriber.transcribe_many(texts)))
+        self.assertEqual(len(TranscriptionStore(self.path)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unicodedata
+import unittest
+
+from stevens.languages.es import castillian
+from stevens.languages.es.numbers import spell_number
+from stevens.tokenizer import Token, Tokenizer
+
+
+class TokenizerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tokenizer = Tokenizer()
+
+    def test_tokens(self):
+        text = u"Hola, «Señor» García: ¿qué tal?"
+        self.assertEqual(list(self.tokenizer.tokens(text)), [
+            Token(0, u"hola", 0, 4),
+            Token(1, u"señor", 7, 12),
+            Token(1, u"garcía", 14, 20),
+            Token(2, u"qué", 23, 26),
+            Token(2, u"tal", 27, 30),
+        ])
+
+    def test_decomposed(self):
+        text = unicodedata.normalize("NFD", u"Canción pingüino")
+        tokens = list(self.tokenizer.tokens(text))
+        self.assertEqual([token.word for token in tokens],
+                         [u"canción", u"pingüino"])
+        self.assertEqual(tokens[0].end, len(u"Cancio") + 2)
+        self.assertEqual(text[tokens[1].start:tokens[1].end].lower(),
+                         unicodedata.normalize("NFD", u"pingüino"))
+
+    def test_range(self):
+        text = u"uno dos. tres"
+        self.assertEqual([token.word for token in
+                          self.tokenizer.tokens(text, 4, 13)],
+                         [u"dos", u"tres"])
+
+    def test_phrases(self):
+        phrases = list(self.tokenizer.phrases(u"a b. c — d"))
+        self.assertEqual([[token.word for token in phrase]
+                          for phrase in phrases], [[u"a", u"b"], [u"c"],
+                                                   [u"d"]])
+
+    def test_numbers(self):
+        self.assertEqual([token.word for token in
+                          self.tokenizer.tokens(u"42")], [u"4", u"2"])
+        tokenizer = Tokenizer(spell=spell_number)
+        self.assertEqual(list(tokenizer.tokens(u"el 21")), [
+            Token(0, u"el", 0, 2),
+            Token(0, u"veintiuno", 3, 5),
+        ])
+
+    def test_phrase_words(self):
+        text = (u"Hola, «Señor» García: ¿qué tal? Tengo 21 años_y "
+                u"3x4 m² — ") + unicodedata.normalize("NFD", u"Canción")
+        for tokenizer in [self.tokenizer, Tokenizer(spell=spell_number),
+                          castillian.Transcriptor().tokenizer]:
+            self.assertEqual(list(tokenizer.phrase_words(text)),
+                             [[token.word for token in phrase]
+                              for phrase in tokenizer.phrases(text)])
+        self.assertEqual(list(self.tokenizer.phrase_words(text, 7, 20)),
+                         [[u"señor", u"garcía"]])
+
+
+class NumbersTestCase(unittest.TestCase):
+
+    def test_spell_number(self):
+        def spell(digits):
+            return u" ".join(spell_number(digits))
+        self.assertEqual(spell(u"0"), u"cero")
+        self.assertEqual(spell(u"16"), u"dieciséis")
+        self.assertEqual(spell(u"100"), u"cien")
+        self.assertEqual(spell(u"175"), u"ciento setenta y cinco")
+        self.assertEqual(spell(u"2024"), u"dos mil veinticuatro")
+        self.assertEqual(spell(u"21000"), u"veintiún mil")
+        self.assertEqual(spell(u"1000000"), u"un millón")
+        self.assertEqual(spell(u"3500001"),
+                         u"tres millones quinientos mil uno")
+        self.assertEqual(spell(u"007"), u"cero cero siete")
+
+
+class TranscriptorTokenizerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transcriptor = castillian.Transcriptor(lang="es")
+
+    def test_normalized_input(self):
+        text = u"Canción en la montaña"
+        self.assertEqual(
+            self.transcriptor.transcribe(unicodedata.normalize("NFD", text)),
+            self.transcriptor.transcribe(text))
+
+    def test_numbers_and_quotes(self):
+        self.assertEqual(self.transcriptor.get_phrases(u"«Tengo 2 gatos»"),
+                         [u"tengo", u"dos", u"gatos"])
+
+    def test_chunks(self):
+        text = u"Hola, qué tal. Tengo 21 años"
+        expected = self.transcriptor.get_phrases(text)
+        for size in range(1, len(text)):
+            chunks = [text[start:start + size]
+                      for start in range(0, len(text), size)]
+            self.assertEqual(list(self.transcriptor.iter_phrases(chunks)),
+                             expected)
+
+    def test_analyze_offsets(self):
+        text = unicodedata.normalize("NFD", u"Él canta")
+        transcription = self.transcriptor.analyze(text)
+        self.assertEqual([word.span for word in transcription.iter_words()],
+                         [(0, 3), (4, 9)])
+        self.assertEqual(transcription.render(),
+                         self.transcriptor.transcribe(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import subprocess
+import sys
+import threading
+import unittest
+
+from stevens import transcriber
+from stevens.cache import LRUCache
+from stevens.exceptions import NotLanguageSupported
+
+
+HEAVY_MODULES = ("langid", "hyphen", "numpy", "multiprocessing")
+
+STARTUP = """
+import json, sys
+before = set(sys.modules)
+import stevens
+added = sorted(set(sys.modules) - before)
+loaded = sorted(sys.modules)
+stevens.get_transcriptor("es_ES").transcribe(u"hola")
+print(json.dumps([added, loaded, sorted(sys.modules)]))
+"""
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_get_or_create(self):
+        cache = LRUCache(maxsize=2)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        first = cache.get_or_create("a", factory)
+        second = cache.get_or_create("a", factory)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_shrink(self):
+        cache = LRUCache(maxsize=4)
+        for key in range(4):
+            cache.put(key, key)
+        cache.maxsize = 1
+        self.assertEqual(len(cache), 1)
+        self.assertIn(3, cache)
+
+
+class RegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        transcriber.clear_cache()
+
+    def test_reuse_transcriptor(self):
+        first = transcriber.get_transcriptor("es_ES")
+        second = transcriber.get_transcriptor("es-es")
+        self.assertIs(first, second)
+
+    def test_dialects(self):
+        first = transcriber.get_transcriptor("es")
+        second = transcriber.get_transcriptor("es_AR")
+        self.assertIsNot(first, second)
+        self.assertEqual(second.lang, "es_AR")
+        self.assertRaises(NotLanguageSupported,
+                          transcriber.get_transcriptor, "es_XX")
+
+    def test_different_options(self):
+        first = transcriber.get_transcriptor("es", syllabic_separator=u"-")
+        second = transcriber.get_transcriptor("es")
+        self.assertIsNot(first, second)
+
+    def test_not_cached(self):
+        first = transcriber.get_transcriptor("es")
+        second = transcriber.get_transcriptor("es", cached=False)
+        self.assertIsNot(first, second)
+
+    def test_warm_up(self):
+        warmed, = transcriber.warm_up(["es"])
+        self.assertIs(warmed, transcriber.get_transcriptor("es"))
+        self.assertEqual(transcriber.cache_info()["size"], 1)
+
+    def test_clear_cache(self):
+        first = transcriber.get_transcriptor("es")
+        transcriber.clear_cache()
+        self.assertIsNot(first, transcriber.get_transcriptor("es"))
+
+    def test_threads_share_instance(self):
+        results = []
+
+        def worker():
+            results.append(transcriber.get_transcriptor("es"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(id(result) for result in results)), 1)
+
+    def test_not_supported(self):
+        self.assertRaises(NotLanguageSupported,
+                          transcriber.get_transcriptor, "xx")
+
+
+class TranscribeManyTestCase(unittest.TestCase):
+
+    texts = [u"Hola, qué tal", u"Esto es una prueba", u"", u"Buenos días"]
+
+    def test_in_process(self):
+        transcriptor = transcriber.get_transcriptor("es")
+        expected = [transcriptor.transcribe(text) for text in self.texts]
+        results = transcriber.transcribe_many(iter(self.texts), lang="es")
+        self.assertEqual(list(results), expected)
+
+    def test_pool(self):
+        transcriptor = transcriber.get_transcriptor("es")
+        texts = self.texts * 10
+        expected = [transcriptor.transcribe(text) for text in texts]
+        results = transcriber.transcribe_many(iter(texts), lang="es",
+                                              workers=2, chunksize=3)
+        self.assertEqual(list(results), expected)
+
+    def test_not_supported(self):
+        self.assertRaises(NotLanguageSupported, transcriber.transcribe_many,
+                          self.texts, lang="xx", workers=2)
+
+
+class StartupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        output = subprocess.check_output([sys.executable, "-c", STARTUP])
+        self.added, self.imported, self.used = json.loads(
+            output.decode("utf-8"))
+
+    def test_import_footprint(self):
+        # Importing the package imports nothing but the package itself
+        self.assertEqual(self.added, ["stevens"])
+
+    def test_lazy_imports(self):
+        self.assertNotIn("stevens.transcriber", self.imported)
+        self.assertNotIn("stevens.languages", self.imported)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, self.used)
+
+    def test_preload(self):
+        transcriber.clear_cache()
+        transcriber.preload(["es_ES"], identification=False)
+        hits = transcriber.cache_info()["hits"]
+        transcriber.get_transcriptor("es_ES")
+        self.assertEqual(transcriber.cache_info()["hits"], hits + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
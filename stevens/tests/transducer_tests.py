@@ -0,0 +1,67 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import unittest
+
+from stevens.languages.es import castillian
+
+
+def corpus(count, seed=0):
+    """Return `count` phrases of words built from random syllables"""
+    generator = random.Random(seed)
+    syllables = castillian.syllable_inventory()
+    syllables += [u"ch", u"ll", u"rr", u"qu", u"gu", u"s", u"n", u"r", u"x",
+                  u"y", u"ü", u"k", u"w", u"tr", u"pl", u"ns", u"ps", u"ñ"]
+    words = [u"".join(generator.choice(syllables)
+                      for _ in range(generator.randint(1, 5)))
+             for _ in range(2000)]
+    return [u" ".join(generator.choice(words)
+                      for _ in range(generator.randint(1, 12)))
+            for _ in range(count)]
+
+
+class TransducerTestCase(unittest.TestCase):
+
+    def test_conformance(self):
+        rules = castillian.Transcriptor()
+        fst = castillian.Transcriptor(engine="fst")
+        for text in corpus(3000):
+            self.assertEqual(fst.transcribe(text), rules.transcribe(text))
+
+    def test_conformance_rules_syllabifier(self):
+        rules = castillian.Transcriptor(hyphenation="rules")
+        fst = castillian.Transcriptor(hyphenation="rules", engine="fst")
+        for text in corpus(1000, seed=1):
+            self.assertEqual(fst.transcribe(text), rules.transcribe(text))
+
+    def test_unknown_letters(self):
+        rules = castillian.Transcriptor()
+        fst = castillian.Transcriptor(engine="fst")
+        size = len(fst.transducer)
+        text = u"año 2015 ça"
+        self.assertEqual(fst.transcribe(text), rules.transcribe(text))
+        self.assertGreater(len(fst.transducer), size)
+
+    def test_syllables(self):
+        fst = castillian.Transcriptor(engine="fst")
+        for text in corpus(300, seed=2):
+            for word in text.split():
+                self.assertEqual(fst.transducer.syllables(word),
+                                 fst.get_syllables(word))
+        self.assertEqual(fst.transducer.syllables(u""), [])
+
+    def test_word_cache(self):
+        # Words go through the cache and the instrumented stages
+        fst = castillian.Transcriptor(engine="fst", word_cache_size=16)
+        stats = fst.instrument()
+        fst.transcribe(u"casa, casa, perro")
+        self.assertEqual(fst.word_cache_info()["hits"], 1)
+        summary = stats.summary()
+        self.assertEqual(summary["stages"]["transcribe_word"]["calls"], 3)
+
+    def test_unknown_engine(self):
+        self.assertRaises(ValueError, castillian.Transcriptor, engine="xx")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+#/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from stevens.languages.es import castillian
+from stevens.languages.es import vectorized
+from stevens.tests.transducer_tests import corpus
+
+
+@unittest.skipIf(vectorized.numpy is None, "numpy is not installed")
+class VectorizedTestCase(unittest.TestCase):
+
+    def test_conformance(self):
+        transcriptor = castillian.Transcriptor()
+        words = sorted(set(word for text in corpus(1000, seed=2)
+                           for word in text.split()))
+        expected = [transcriptor.transcribe_word(word) for word in words]
+        self.assertEqual(transcriptor.transcribe_words(words), expected)
+
+    def test_batches_grow_table(self):
+        transcriptor = castillian.Transcriptor(hyphenation="rules")
+        words = [u"agua", u"cantar", u"perro", u"zapato", u"ñandú",
+                 u"kiwi", u"über", u"x", u"extraordinariamente"]
+        for word in words:
+            self.assertEqual(transcriptor.transcribe_words([word]),
+                             [transcriptor.transcribe_word(word)])
+        self.assertEqual(transcriptor.transcribe_words(words),
+                         [transcriptor.transcribe_word(word)
+                          for word in words])
+
+    def test_syllables(self):
+        transcriptor = castillian.Transcriptor()
+        words = sorted(set(word for text in corpus(500, seed=3)
+                           for word in text.split()))
+        words += [u"", u"a", u"ça", u"año", u"x", u"", u"pingüino"]
+        self.assertEqual(transcriptor.vectorized.syllables(words),
+                         [transcriptor.get_syllables(word)
+                          for word in words])
+        self.assertEqual(transcriptor.vectorized.syllables([]), [])
+
+    def test_empty(self):
+        transcriptor = castillian.Transcriptor()
+        self.assertEqual(transcriptor.transcribe_words([]), [])
+        self.assertEqual(transcriptor.transcribe_words([u"a"]),
+                         [transcriptor.transcribe_word(u"a")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass tokenizer splitting text into phrases and words
+
+The text is scanned once for words and numbers; the gap between two of them
+is only searched for a pause, which ends the phrase. Words are lowercased
+and normalized to NFC one at a time as they are found, so decomposed accents
+are transcribed like precomposed ones and the text is never copied whole.
+Offsets always point into the original text.
+
+Callers that only need the words use `phrase_words`, which splits the text
+on pauses and then on whitespace, and only scans the phrases with digits,
+combining marks or other symbols for words.
+"""
+import re
+import unicodedata
+from collections import namedtuple
+
+
+# Number of the phrase in the text, normalized word and offsets of the text
+# it was read from
+Token = namedtuple("Token", ["phrase", "word", "start", "end"])
+
+# Letters, possibly followed by combining marks, and runs of digits
+LETTERS = u"(?:[^\\W\\d_]|[\u0300-\u036f])+"
+DIGITS = u"\\d+"
+
+_MARKS = re.compile(u"[\u0300-\u036f]")
+
+PAUSES = re.compile(u"[\\.,;:\\?\\!¡¿…\\(\\)\\[\\]\\n\\t—–]")
+
+
+class Tokenizer(object):
+    """Tokenizer yielding the `Token` of every word of a text"""
+
+    def __init__(self, pauses=PAUSES, spell=None):
+        """
+        :param pauses: compiled regular expression matching the characters
+                       between words that end a phrase, anything else is
+                       skipped
+        :param spell: function returning the list of words of a string of
+                      digits, numbers are read digit by digit if `None`
+        """
+        self._pauses = pauses
+        self._spell = spell
+        # Pauses are matched by the same scan as words, so the characters
+        # between words are never searched again
+        self._scanner = re.compile(u"({})|({})|(?:{})".format(
+            LETTERS, DIGITS, pauses.pattern), re.UNICODE)
+        self._words = re.compile(u"({})|({})".format(LETTERS, DIGITS),
+                                 re.UNICODE)
+
+    def _get_pauses(self):
+        return self._pauses
+    pauses = property(fget=_get_pauses)
+
+    def _get_spell(self):
+        return self._spell
+    spell = property(fget=_get_spell)
+
+    def _spell_number(self, digits):
+        if self._spell is None:
+            return list(digits)
+        return self._spell(digits)
+
+    def tokens(self, text, start=0, end=None):
+        """
+        Lazily yield the `Token` of every word in text[start:end]
+
+        Numbers yield a token per spelled word, all with the offsets of the
+        number.
+        """
+        if end is None:
+            end = len(text)
+        phrase = 0
+        words = pause = False
+        for match in self._scanner.finditer(text, start, end):
+            kind = match.lastindex
+            if kind is None:
+                pause = words
+                continue
+            if pause:
+                phrase += 1
+                pause = False
+            words = True
+            if kind == 1:
+                word = match.group(1).lower()
+                if _MARKS.search(word):
+                    word = unicodedata.normalize("NFC", word)
+                yield Token(phrase, word, match.start(), match.end())
+            else:
+                for word in self._spell_number(match.group(2)):
+                    yield Token(phrase, word, match.start(), match.end())
+
+    def phrases(self, text, start=0, end=None):
+        """Lazily yield the list of tokens of every phrase in text[start:end]
+        """
+        words = []
+        for token in self.tokens(text, start, end):
+            if words and token.phrase != words[-1].phrase:
+                yield words
+                words = []
+            words.append(token)
+        if words:
+            yield words
+
+    def words(self, text):
+        """Return the normalized words of `text`, read as a single phrase"""
+        text = text.lower()
+        words = text.split()
+        # Plain words, by far the most common, need no scanning
+        if u"".join(words).isalpha():
+            return words
+        words = []
+        for match in self._words.finditer(text):
+            if match.lastindex == 1:
+                word = match.group(1)
+                if _MARKS.search(word):
+                    word = unicodedata.normalize("NFC", word)
+                words.append(word)
+            else:
+                words.extend(self._spell_number(match.group(2)))
+        return words
+
+    def phrase_words(self, text, start=0, end=None):
+        """
+        Lazily yield the list of words of every phrase in text[start:end],
+        the same as `phrases` without the offsets
+        """
+        for piece in self._pauses.split(text[start:end]):
+            words = self.words(piece)
+            if words:
+                yield words
@@ -1,46 +1,147 @@
 # -*- coding: utf-8 -*-
+from collections import deque
 from importlib import import_module
+from itertools import islice
 
-try:
-    import langid
-except ImportError:
-    langid = None
-
-from stevens.hyphenation import get_hyphenator
+from stevens.cache import LRUCache
+from stevens.hyphenation import clear_hyphenators, get_hyphenator
 from stevens.exceptions import NotLanguageSupported
 
 
+# Language tags with their own rules, see `castillian.DIALECTS`
+DIALECTS = ("es", "es_AR", "es_ES", "es_MX")
+
+_dialects = dict((lang.lower(), lang) for lang in DIALECTS)
+_transcriptors = LRUCache(maxsize=16)
+_worker_transcriptor = None
+
+
+def build_transcriptor(lang, alphabet, syllabic_separator, stress_mark,
+                       word_separator, word_cache_size=0,
+                       hyphenation="liang", engine="rules", store=None,
+                       lexicon=None):
+    if lang in DIALECTS:
+        # Dialects only differ in their rules, not in their hyphenation
+        hyphenator = get_hyphenator("es_ES", backend=hyphenation)
+        module = import_module("stevens.languages.es.castillian")
+        transcriptor = module.Transcriptor(
+            lang=lang,
+            hyphenator=hyphenator,
+            syllabic_separator=syllabic_separator,
+            word_separator=word_separator,
+            alphabet=alphabet,
+            stress_mark=stress_mark,
+            word_cache_size=word_cache_size,
+            engine=engine,
+            store=store,
+            lexicon=lexicon,
+        )
+        return transcriptor
+    else:
+        raise NotLanguageSupported(lang)
+
+
 def get_transcriptor(lang="es_ES", alphabet="IPA",
                      syllabic_separator=u".", stress_mark=u"'",
-                     word_separator=u"|"):
+                     word_separator=u"|", word_cache_size=0,
+                     hyphenation="liang", engine="rules", store=None,
+                     lexicon=None, cached=True):
     """
     Return a `Transcriptor` object
 
+    Transcriptors are kept in a bounded registry keyed by all the arguments,
+    so repeated calls share an already built instance.
+
     :param lang: string with the ISO 639-1 code or IETF language tag of `text`
     :param alphabet: string with the name of the phonetic alphabet to use
     :param syllabic_separator: string with the syllabic separator character
     :param stress_mark: string to mark the stress in words
     :param word_separator: string with the word separator character
+    :param word_cache_size: maximum number of transcribed words to memoize
+    :param hyphenation: string with the name of the hyphenation backend
+    :param engine: string with the name of the transcription engine
+    :param store: path to a SQLite file persisting transcribed words
+    :param lexicon: path to a lexicon file looked up before the rules, `True`
+                    for the one bundled for the dialect or `None` to apply
+                    the rules alone
+    :param cached: boolean to reuse a transcriptor from the registry
     :return: a `Transcriptor` object
     """
     if not syllabic_separator:
         syllabic_separator = u"."
-    alphabet = alphabet.lower()
-    # Language identification
-    if lang.lower() in ("es", "es_es"):
-        lang = "es_ES"
-        hyphenator = get_hyphenator(lang)
-        module = import_module("stevens.languages.es.castillian")
-        transcriptor = module.Transcriptor(
-            hyphenator=hyphenator,
-            syllabic_separator=syllabic_separator,
-            word_separator=word_separator,
-            alphabet=alphabet,
-            stress_mark=stress_mark,
-        )
-        return transcriptor
+    if isinstance(alphabet, (tuple, list)):
+        alphabet = tuple(name.lower() for name in alphabet)
     else:
+        alphabet = alphabet.lower()
+    dialect = _dialects.get(lang.replace("-", "_").lower())
+    if dialect is None:
         raise NotLanguageSupported(lang)
+    lang = dialect
+    key = (lang, alphabet, syllabic_separator, stress_mark, word_separator,
+           word_cache_size, hyphenation, engine, store, lexicon)
+    if not cached:
+        return build_transcriptor(*key)
+    return _transcriptors.get_or_create(key, lambda: build_transcriptor(*key))
+
+
+def warm_up(langs=("es_ES", ), **kwargs):
+    """
+    Build and register the transcriptors for `langs` ahead of the first call
+
+    :param langs: iterable of ISO 639-1 codes or IETF language tags
+    :param kwargs: any other argument accepted by `get_transcriptor`
+    :return: list of the warmed `Transcriptor` objects
+    """
+    return [get_transcriptor(lang=lang, **kwargs) for lang in langs]
+
+
+def clear_cache():
+    """Drop every registered transcriptor and hyphenator"""
+    _transcriptors.clear()
+    clear_hyphenators()
+
+
+def set_cache_size(maxsize):
+    """Set the maximum number of transcriptors kept in the registry"""
+    _transcriptors.maxsize = maxsize
+
+
+def cache_info():
+    """Return a dictionary with the statistics of the transcriptor registry"""
+    return _transcriptors.stats()
+
+
+def identify(text):
+    """
+    Return the language code of `text` among the supported languages
+
+    Obvious and very short texts are decided by a trigram prefilter, the
+    rest by langid, and results are cached. See `stevens.identification`.
+
+    :raises NotLanguageSupported: if `text` is in another language
+    """
+    from stevens.identification import identify
+    return identify(text)
+
+
+def preload(langs=("es_ES", ), identification=True, **kwargs):
+    """
+    Load up front everything that is otherwise loaded on first use
+
+    Meant for long-running servers, and for parents that fork workers, which
+    would rather pay the cost of imports, models and compiled tables before
+    serving the first request.
+
+    :param langs: iterable of language codes whose transcriptors are built
+    :param identification: boolean to load the langid model, if installed
+    :param kwargs: options passed to `get_transcriptor`
+    """
+    if identification:
+        from stevens.identification import get_identifier
+        get_identifier().load()
+    for lang in langs:
+        # Transcribing once compiles the tables transcriptors build lazily
+        get_transcriptor(lang, **kwargs).transcribe(u"hola")
 
 
 def transcribe(text, lang=None, alphabet="IPA",
@@ -51,17 +152,17 @@ def transcribe(text, lang=None, alphabet="IPA",
 
     :param text: unicode string to transcribe
     :param lang: string with the ISO 639-1 code or IETF language tag of `text`
-    :param alphabet: string with the name of the phonetic alphabet to use
+    :param alphabet: string with the name of the phonetic alphabet to use,
+                     or tuple of names to get a transcription in each one
     :param syllabic_separator: string with the syllabic separator character
     :param stress_mark: string to mark the stress in words
     :param word_separator: string with the word separator character
     :param auto_lang: boolean to perform an automatic language identification
-    :return: string with the phonetic transcription of `text`
+    :return: string with the phonetic transcription of `text`, or tuple of
+             strings if `alphabet` is a tuple
     """
     if auto_lang or not lang:
-        if not langid:
-            raise ImportError("Please, install langid")
-        lang = langid.classify(text)[0]
+        lang = identify(text)
     transcriptor = get_transcriptor(
         lang=lang,
         alphabet=alphabet,
@@ -75,3 +176,92 @@ def transcribe(text, lang=None, alphabet="IPA",
         alphabet=alphabet,
         stress_mark=stress_mark,
     )
+
+
+def _init_worker(options):
+    global _worker_transcriptor
+    _worker_transcriptor = get_transcriptor(**options)
+
+
+def _transcribe_with(transcriptor, texts):
+    transcriptions = [transcriptor.transcribe(text=text) for text in texts]
+    # Pool workers are terminated without running exit handlers
+    if transcriptor.store is not None:
+        transcriptor.store.flush()
+    return transcriptions
+
+
+def _transcribe_batch(texts):
+    return _transcribe_with(_worker_transcriptor, texts)
+
+
+def _batches(texts, size):
+    texts = iter(texts)
+    while True:
+        batch = list(islice(texts, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _transcribe_pool(texts, options, workers, chunksize):
+    import multiprocessing
+    pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(options, ))
+    try:
+        pending = deque()
+        for batch in _batches(texts, chunksize):
+            pending.append(pool.apply_async(_transcribe_batch, (batch, )))
+            if len(pending) > 2 * workers:
+                for transcription in pending.popleft().get():
+                    yield transcription
+        while pending:
+            for transcription in pending.popleft().get():
+                yield transcription
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def transcribe_many(texts, lang="es_ES", alphabet="IPA",
+                    syllabic_separator=u".", stress_mark=u"'",
+                    word_separator=u"|", workers=1, chunksize=256,
+                    store=None):
+    """
+    Lazily get the phonetic transcriptions of `texts`, in order
+
+    With more than one worker, `texts` are sent in batches of `chunksize` to
+    a pool of processes, each one holding its own warm `Transcriptor`. Only a
+    few batches per worker are in flight at any time, so `texts` can be an
+    arbitrarily long iterator.
+
+    :param texts: iterable of unicode strings to transcribe
+    :param lang: string with the ISO 639-1 code or IETF language tag of `texts`
+    :param alphabet: string with the name of the phonetic alphabet to use
+    :param syllabic_separator: string with the syllabic separator character
+    :param stress_mark: string to mark the stress in words
+    :param word_separator: string with the word separator character
+    :param workers: number of worker processes, 1 to transcribe in the calling
+                    process or `None` to use one per CPU
+    :param chunksize: number of texts sent to a worker at once
+    :param store: path to a SQLite file persisting transcribed words, shared
+                  by all the workers
+    :return: iterator of strings with the phonetic transcriptions of `texts`
+    """
+    options = dict(
+        lang=lang,
+        alphabet=alphabet,
+        syllabic_separator=syllabic_separator,
+        word_separator=word_separator,
+        stress_mark=stress_mark,
+        store=store,
+    )
+    # Warming up here raises errors early and lets forked workers inherit it
+    transcriptor = get_transcriptor(**options)
+    if workers is None:
+        import multiprocessing
+        workers = multiprocessing.cpu_count()
+    if workers <= 1:
+        return (transcriptor.transcribe(text=text) for text in texts)
+    return _transcribe_pool(texts, options, workers, chunksize)